@@ -28,18 +28,78 @@ by using the verbose flag and redirecting the output to a file:
 You can pass the verbose flag twice for more verbose output:
 
  accesstests test.accdb -vv
+
+The tests can also run against a local SQLite database, which does not need the Access driver.  Tests that depend on
+Access-only behavior are skipped:
+
+ accesstests --backend sqlite test.db
+
+To run the tests in N worker processes, use the -j option.  Each worker gets its own copy of the database file, so
+pass an empty database (e.g. empty.mdb) that can be copied:
+
+ accesstests empty.accdb -j 4
+
+To measure row throughput of the insert and fetch strategies instead of running the tests, use --benchmark.  The
+results are printed as JSON; with --baseline the run fails if even the fastest of --repeat runs of a strategy is
+slower than the median of a saved result by more than --tolerance (or the strategy used more memory).  Peak memory
+is measured with tracemalloc, so it only counts Python allocations, not the memory of the driver or the database
+engine:
+
+ accesstests test.accdb --benchmark --rows 1000000 --output bench.json
+ accesstests test.accdb --benchmark --rows 1000000 --baseline bench.json
+
+To see how insert and select latency depends on the size of string and binary values, use --sweep.  Values are sized
+densely around each power of two (255/256, 511/512, ...) up to --max-size, so cliffs at the driver's buffer
+boundaries show up in the printed curve.  --output and --baseline work as for --benchmark:
+
+ accesstests test.accdb --sweep --max-size 4194304 --output sweep.json
+
+To find out where the time goes, --timings records each test's wall time split into setUp, body and tearDown and the
+number of execute, commit and fetch calls, prints the slowest tests and saves everything as JSON.  --profile-dir
+also saves a cProfile of every test:
+
+ accesstests test.accdb --timings timings.json --slowest 20 --profile-dir profiles
 """
 
 # Access SQL data types: http://msdn2.microsoft.com/en-us/library/bb208866.aspx
 
 import sys, os, re
+import cProfile
+import json
+import multiprocessing
+import shutil
+import tempfile
 import unittest
+from timeit import default_timer
 from decimal import Decimal
 from datetime import datetime, date, time
-from os.path import abspath
-from testutils import *
+from backends import BACKENDS, ConnectionPool, create_backend
+
+try:
+    from testutils import *
+except ImportError:
+    # testutils comes with the pyodbc sources and is only needed to test a pyodbc build.
+    def add_to_path():
+        # Without the pyodbc sources there is no build directory to add: the installed pyodbc is tested.
+        pass
+
+    def load_tests(testclass, name, *args):
+        if name:
+            if not name.startswith('test_'):
+                name = 'test_%s' % name
+            names = [ name ]
+        else:
+            names = [ method for method in dir(testclass) if method.startswith('test_') ]
+        return unittest.TestSuite([ testclass(name, *args) for name in names ])
+
+if sys.version_info[0] >= 3:
+    # The sqlite backend also runs under Python 3.
+    unicode = str
+    long = int
+    xrange = range
 
-CNXNSTRING = None
+    def buffer(value):
+        return value.encode('ascii')
 
 _TESTSTR = '0123456789-abcdefghijklmnopqrstuvwxyz-'
 
@@ -56,44 +116,193 @@ def _generate_test_string(length):
     if length <= len(_TESTSTR):
         return _TESTSTR[:length]
 
-    c = (length + len(_TESTSTR)-1) / len(_TESTSTR)
+    c = (length + len(_TESTSTR)-1) // len(_TESTSTR)
     v = _TESTSTR * c
     return v[:length]
 
+_FENCEPOSTS = {}
+
+def _fencepost(length):
+    """
+    Returns _generate_test_string(length), built the first time a test asks for it and cached after that, so running a
+    single test with -t doesn't build every fencepost value.
+    """
+    value = _FENCEPOSTS.get(length)
+    if value is None:
+        value = _FENCEPOSTS[length] = _generate_test_string(length)
+    return value
+
+
+class LobPayload(object):
+    """
+    A large test value of `size` characters (or bytes, if `binary`) that is produced in chunks.
+
+    The chunk size is a multiple of len(_TESTSTR), so every chunk is a prefix of the same repeated block and the
+    expected content at any offset is known without building the whole value.  Fetched values are verified chunk by
+    chunk, and a backend that can stream (see Backend.insert_lob) writes the value without it ever being in memory.
+    """
+    CHUNK_SIZE = len(_TESTSTR) * 27594 # about 1 MiB
+
+    def __init__(self, size, binary):
+        self.size   = size
+        self.binary = binary
+        block = _TESTSTR * (self.CHUNK_SIZE // len(_TESTSTR))
+        self._block = binary and block.encode('ascii') or unicode(block)
+
+    def chunks(self):
+        for offset in xrange(0, self.size, self.CHUNK_SIZE):
+            yield self._block[:min(self.CHUNK_SIZE, self.size - offset)]
+
+    def value(self):
+        """
+        Returns the whole value, for drivers that need complete parameters.  Binary values are filled into a single
+        bytearray instead of being joined.
+        """
+        if not self.binary:
+            return u''.join(self.chunks())
+        value = bytearray(self.size)
+        offset = 0
+        for chunk in self.chunks():
+            value[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+        return value
+
+    def mismatch(self, value):
+        """
+        Returns the offset of the first character of `value` that differs from the payload, or None if they are equal.
+
+        `value` can be anything with len() and slicing, e.g. a string, bytes or a sqlite3.Blob.
+        """
+        if len(value) != self.size:
+            return min(len(value), self.size)
+        offset = 0
+        for chunk in self.chunks():
+            actual = value[offset:offset + len(chunk)]
+            if actual != chunk:
+                for i in xrange(len(chunk)):
+                    if actual[i] != chunk[i]:
+                        return offset + i
+            offset += len(chunk)
+        return None
+
 
 class AccessTestCase(unittest.TestCase):
 
     SMALL_FENCEPOST_SIZES = [ 0, 1, 254, 255 ] # text fields <= 255
     LARGE_FENCEPOST_SIZES = [ 256, 270, 304, 508, 510, 511, 512, 1023, 1024, 2047, 2048, 4000, 4095, 4096, 4097, 10 * 1024, 20 * 1024 ]
 
-    ANSI_FENCEPOSTS    = [ _generate_test_string(size) for size in SMALL_FENCEPOST_SIZES ]
-    UNICODE_FENCEPOSTS = [ unicode(s) for s in ANSI_FENCEPOSTS ]
-    IMAGE_FENCEPOSTS   = ANSI_FENCEPOSTS + [ _generate_test_string(size) for size in LARGE_FENCEPOST_SIZES ]
+    # Only the sizes are fixed here; the values come from _fencepost when a test runs.
+    ANSI_FENCEPOST_SIZES  = SMALL_FENCEPOST_SIZES
+    IMAGE_FENCEPOST_SIZES = SMALL_FENCEPOST_SIZES + LARGE_FENCEPOST_SIZES
+
+    # Large object tests, which are skipped above LOB_MAX_SIZE (set with --lob-max-mb).
+    LOB_SIZES    = [ 10 * 1000 * 1000, 100 * 1000 * 1000, 1000 * 1000 * 1000 ]
+    LOB_MAX_SIZE = LOB_SIZES[0]
+
+    # The backends.Backend to run against, set by main().
+    backend = None
+
+    # If True, setUp wraps the connection in a CountingConnection and setUp/tearDown record their duration, for
+    # TimingResult.  Set by main() for --timings.
+    instrumented = False
 
     def __init__(self, method_name):
         unittest.TestCase.__init__(self, method_name)
 
-    def setUp(self):
-        self.cnxn   = pyodbc.connect(CNXNSTRING)
-        self.cursor = self.cnxn.cursor()
-
+    @classmethod
+    def setUpClass(cls):
+        # Connections are shared by all tests of the class and each test runs in a transaction that tearDown rolls
+        # back, so the tables are only dropped here, in case an earlier run was interrupted.
+        cls.pool = ConnectionPool(cls.backend)
+        cnxn = cls.pool.acquire()
+        cursor = cnxn.cursor()
         for i in range(3):
             try:
-                self.cursor.execute("drop table t%d" % i)
-                self.cnxn.commit()
+                cursor.execute("drop table t%d" % i)
+                cnxn.commit()
             except:
                 pass
+        cnxn.rollback()
+        cursor.close()
+
+        # Not every engine can roll back DDL, and a test may commit.  If the schema still differs after the rollback,
+        # the database file is replaced with this copy.
+        cls.schema = cls.backend.tables(cnxn)
+        cls.pool.release(cnxn)
+        cls.template = cls.backend.snapshot()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        os.remove(cls.template)
+
+    def setUp(self):
+        started = default_timer()
+        self.phase_seconds = {}
+        self.round_trips   = {}
+
+        self._pooled = self.pool.acquire()
+        self.backend.begin(self._pooled)
+        if self.instrumented:
+            self.cnxn = CountingConnection(self._pooled, self.round_trips)
+        else:
+            self.cnxn = self._pooled
+        self.cursor = self.cnxn.cursor()
 
-        self.cnxn.rollback()
+        self.phase_seconds['setUp'] = default_timer() - started
 
     def tearDown(self):
+        started = default_timer()
         try:
             self.cursor.close()
-            self.cnxn.close()
         except:
             # If we've already closed the cursor or connection, exceptions are thrown.
             pass
 
+        try:
+            self.cnxn.rollback()
+        except self.backend.module.Error:
+            # The test closed the connection.
+            self.pool.discard(self._pooled)
+            cnxn = self.pool.acquire()
+        else:
+            cnxn = self._pooled
+
+        tables = self.backend.tables(cnxn)
+        restore = tables != self.schema and not self._drop_leaked(cnxn, tables)
+        self.pool.release(cnxn)
+        if restore:
+            self.pool.close()
+            self.backend.restore(self.template)
+
+        self.phase_seconds['tearDown'] = default_timer() - started
+
+    def _drop_leaked(self, cnxn, tables):
+        """
+        Drops the tables a test left behind on the pooled connection, which is much cheaper than closing the pool and
+        copying the template back.  Returns False if that didn't bring the schema back, e.g. a table of the template
+        was dropped or can't be.
+        """
+        cursor = cnxn.cursor()
+        try:
+            for name in tables - self.schema:
+                cursor.execute('drop table %s' % name)
+            cnxn.commit()
+        except self.backend.module.Error:
+            try:
+                cnxn.rollback()
+            except self.backend.module.Error:
+                pass
+            return False
+        finally:
+            cursor.close()
+        return self.backend.tables(cnxn) == self.schema
+
+    def require(self, feature):
+        "Skips the test if the backend doesn't support `feature`."
+        if not self.backend.supports(feature):
+            self.skipTest('%s backend does not support %s' % (self.backend.name, feature))
+
     def test_multiple_bindings(self):
         "More than one bind and select on a cursor"
         self.cursor.execute("create table t1(n int)")
@@ -112,29 +321,32 @@ class AccessTestCase(unittest.TestCase):
         self.cursor.execute("insert into t2 values (?)", datetime.now())
 
     def test_datasources(self):
-        p = pyodbc.dataSources()
+        p = self.backend.data_sources()
         self.assert_(isinstance(p, dict))
 
     def test_getinfo_string(self):
-        value = self.cnxn.getinfo(pyodbc.SQL_CATALOG_NAME_SEPARATOR)
+        value = self.backend.getinfo(self.cnxn, 'SQL_CATALOG_NAME_SEPARATOR')
         self.assert_(isinstance(value, str))
 
     def test_getinfo_bool(self):
-        value = self.cnxn.getinfo(pyodbc.SQL_ACCESSIBLE_TABLES)
+        value = self.backend.getinfo(self.cnxn, 'SQL_ACCESSIBLE_TABLES')
         self.assert_(isinstance(value, bool))
 
     def test_getinfo_int(self):
-        value = self.cnxn.getinfo(pyodbc.SQL_DEFAULT_TXN_ISOLATION)
+        value = self.backend.getinfo(self.cnxn, 'SQL_DEFAULT_TXN_ISOLATION')
         self.assert_(isinstance(value, (int, long)))
 
     def test_getinfo_smallint(self):
-        value = self.cnxn.getinfo(pyodbc.SQL_CONCAT_NULL_BEHAVIOR)
+        value = self.backend.getinfo(self.cnxn, 'SQL_CONCAT_NULL_BEHAVIOR')
         self.assert_(isinstance(value, int))
 
-    def _test_strtype(self, sqltype, value, resulttype=None, colsize=None):
+    def _test_strtype(self, sqltype, value, resulttype=None, colsize=None, timings=None):
         """
         The implementation for string, Unicode, and binary tests.
+
+        If `timings` is a list, the seconds taken by the insert and by the select are appended to it as a tuple.
         """
+        sqltype = self.backend.sqltype(sqltype)
         assert colsize is None or (value is None or colsize >= len(value)), 'colsize=%s value=%s' % (colsize, (value is None) and 'none' or len(value))
 
         if colsize:
@@ -151,8 +363,12 @@ class AccessTestCase(unittest.TestCase):
                 resulttype = type(value)
 
         self.cursor.execute(sql)
+        started = default_timer()
         self.cursor.execute("insert into t1 values(1, ?, ?)", (value, value))
+        inserted = default_timer()
         v = self.cursor.execute("select s1, s2 from t1").fetchone()[0]
+        if timings is not None:
+            timings.append((inserted - started, default_timer() - inserted))
         
         if type(value) is not resulttype:
             # To allow buffer --> db --> bytearray tests, always convert the input to the expected result type before
@@ -174,13 +390,13 @@ class AccessTestCase(unittest.TestCase):
         self._test_strtype('varchar', None, colsize=255)
 
     # Generate a test for each fencepost size: test_varchar_0, etc.
-    def _maketest(value):
+    def _maketest(size):
         def t(self):
-            self._test_strtype('varchar', value, colsize=len(value))
-        t.__doc__ = 'unicode %s' % len(value)
+            self._test_strtype('varchar', unicode(_fencepost(size)), colsize=size)
+        t.__doc__ = 'unicode %s' % size
         return t
-    for value in UNICODE_FENCEPOSTS:
-        locals()['test_unicode_%s' % len(value)] = _maketest(value)
+    for size in ANSI_FENCEPOST_SIZES:
+        locals()['test_unicode_%s' % size] = _maketest(size)
 
     #
     # ansi -> varchar
@@ -189,26 +405,26 @@ class AccessTestCase(unittest.TestCase):
     # Access only stores Unicode text but it should accept ASCII text.
 
     # Generate a test for each fencepost size: test_varchar_0, etc.
-    def _maketest(value):
+    def _maketest(size):
         def t(self):
-            self._test_strtype('varchar', value, colsize=len(value))
-        t.__doc__ = 'ansi %s' % len(value)
+            self._test_strtype('varchar', _fencepost(size), colsize=size)
+        t.__doc__ = 'ansi %s' % size
         return t
-    for value in ANSI_FENCEPOSTS:
-        locals()['test_ansivarchar_%s' % len(value)] = _maketest(value)
+    for size in ANSI_FENCEPOST_SIZES:
+        locals()['test_ansivarchar_%s' % size] = _maketest(size)
 
     #
     # binary
     #
 
     # Generate a test for each fencepost size: test_varchar_0, etc.
-    def _maketest(value):
+    def _maketest(size):
         def t(self):
-            self._test_strtype('varbinary', buffer(value), colsize=len(value), resulttype=pyodbc.BINARY)
-        t.__doc__ = 'binary %s' % len(value)
+            self._test_strtype('varbinary', buffer(_fencepost(size)), colsize=size, resulttype=self.backend.BINARY)
+        t.__doc__ = 'binary %s' % size
         return t
-    for value in ANSI_FENCEPOSTS:
-        locals()['test_binary_%s' % len(value)] = _maketest(value)
+    for size in ANSI_FENCEPOST_SIZES:
+        locals()['test_binary_%s' % size] = _maketest(size)
 
 
     #
@@ -219,13 +435,13 @@ class AccessTestCase(unittest.TestCase):
         self._test_strtype('image', None)
 
     # Generate a test for each fencepost size: test_varchar_0, etc.
-    def _maketest(value):
+    def _maketest(size):
         def t(self):
-            self._test_strtype('image', buffer(value), resulttype=pyodbc.BINARY)
-        t.__doc__ = 'image %s' % len(value)
+            self._test_strtype('image', buffer(_fencepost(size)), resulttype=self.backend.BINARY)
+        t.__doc__ = 'image %s' % size
         return t
-    for value in IMAGE_FENCEPOSTS:
-        locals()['test_image_%s' % len(value)] = _maketest(value)
+    for size in IMAGE_FENCEPOST_SIZES:
+        locals()['test_image_%s' % size] = _maketest(size)
 
     #
     # memo
@@ -235,22 +451,63 @@ class AccessTestCase(unittest.TestCase):
         self._test_strtype('memo', None)
 
     # Generate a test for each fencepost size: test_varchar_0, etc.
-    def _maketest(value):
+    def _maketest(size):
         def t(self):
-            self._test_strtype('memo', unicode(value))
-        t.__doc__ = 'Unicode to memo %s' % len(value)
+            self._test_strtype('memo', unicode(_fencepost(size)))
+        t.__doc__ = 'Unicode to memo %s' % size
         return t
-    for value in IMAGE_FENCEPOSTS:
-        locals()['test_memo_%s' % len(value)] = _maketest(value)
+    for size in IMAGE_FENCEPOST_SIZES:
+        locals()['test_memo_%s' % size] = _maketest(size)
 
     # ansi -> memo
-    def _maketest(value):
+    def _maketest(size):
+        def t(self):
+            self._test_strtype('memo', _fencepost(size))
+        t.__doc__ = 'ANSI to memo %s' % size
+        return t
+    for size in IMAGE_FENCEPOST_SIZES:
+        locals()['test_ansimemo_%s' % size] = _maketest(size)
+
+    #
+    # large objects
+    #
+
+    def _test_lob(self, sqltype, size, binary):
+        """
+        Round trip of a LobPayload.  The fetched value is compared chunk by chunk, so a failure reports the offset where
+        the values start to differ instead of a diff of two huge values.
+        """
+        if size > self.LOB_MAX_SIZE:
+            self.skipTest('%s bytes is above the large object limit (--lob-max-mb)' % size)
+        limit = self.backend.max_lob_size(self.cnxn)
+        if limit is not None and size >= limit:
+            self.skipTest('%s backend values must be smaller than %s bytes' % (self.backend.name, limit))
+
+        payload = LobPayload(size, binary)
+        self.cursor.execute("create table t1(n1 int not null, s1 %s)" % self.backend.sqltype(sqltype))
+        self.backend.insert_lob(self.cursor, 't1', 's1', payload)
+
+        value = self.backend.fetch_lob(self.cursor, 't1', 's1')
+        try:
+            if not binary:
+                self.assertEqual(type(value), unicode)
+            length = len(value)
+            offset = payload.mismatch(value)
+        finally:
+            if hasattr(value, 'close'):
+                value.close()
+
+        self.assertEqual(length, size)
+        self.assertEqual(offset, None, 'the fetched value differs from offset %s' % offset)
+
+    def _maketest(sqltype, size, binary):
         def t(self):
-            self._test_strtype('memo', value)
-        t.__doc__ = 'ANSI to memo %s' % len(value)
+            self._test_lob(sqltype, size, binary)
+        t.__doc__ = '%s large object %s MB' % (sqltype, size // (1000 * 1000))
         return t
-    for value in IMAGE_FENCEPOSTS:
-        locals()['test_ansimemo_%s' % len(value)] = _maketest(value)
+    for size in LOB_SIZES:
+        locals()['test_image_lob_%smb' % (size // (1000 * 1000))] = _maketest('image', size, True)
+        locals()['test_memo_lob_%smb' % (size // (1000 * 1000))] = _maketest('memo', size, False)
 
     def test_subquery_params(self):
         """Ensure parameter markers work in a subquery"""
@@ -283,7 +540,7 @@ class AccessTestCase(unittest.TestCase):
         # Now that the connection is closed, we expect an exception.  (If the code attempts to use
         # the HSTMT, we'll get an access violation instead.)
         self.sql = "select * from t1"
-        self.assertRaises(pyodbc.ProgrammingError, self._exec)
+        self.assertRaises(self.backend.module.ProgrammingError, self._exec)
 
 
     def test_unicode_query(self):
@@ -297,13 +554,14 @@ class AccessTestCase(unittest.TestCase):
         self.assertEquals(row[-1], "1")
 
     def test_version(self):
-        self.assertEquals(3, len(pyodbc.version.split('.'))) # 1.3.1 etc.
+        self.assertEquals(3, len(self.backend.version.split('.'))) # 1.3.1 etc.
 
     #
     # date, time, datetime
     #
 
     def test_datetime(self):
+        self.require('datetime')
         value = datetime(2007, 1, 15, 3, 4, 5)
 
         self.cursor.execute("create table t1(dt datetime)")
@@ -378,6 +636,7 @@ class AccessTestCase(unittest.TestCase):
     #
 
     def test_decimal(self):
+        self.require('decimal')
         value = Decimal('12345.6789')
         self.cursor.execute("create table t1(n numeric(10,4))")
         self.cursor.execute("insert into t1 values(?)", value)
@@ -386,7 +645,8 @@ class AccessTestCase(unittest.TestCase):
         self.assertEqual(v, value)
 
     def test_money(self):
-        self.cursor.execute("create table t1(n money)")
+        self.require('decimal')
+        self.cursor.execute("create table t1(n %s)" % self.backend.sqltype('money'))
         value = Decimal('1234.45')
         self.cursor.execute("insert into t1 values (?)", value)
         result = self.cursor.execute("select n from t1").fetchone()[0]
@@ -394,6 +654,7 @@ class AccessTestCase(unittest.TestCase):
         self.assertEqual(value, result)
 
     def test_negative_decimal_scale(self):
+        self.require('decimal')
         value = Decimal('-10.0010')
         self.cursor.execute("create table t1(d numeric(19,4))")
         self.cursor.execute("insert into t1 values(?)", value)
@@ -406,6 +667,7 @@ class AccessTestCase(unittest.TestCase):
     #
 
     def test_bit(self):
+        self.require('bit')
         self.cursor.execute("create table t1(b bit)")
 
         value = True
@@ -415,6 +677,7 @@ class AccessTestCase(unittest.TestCase):
         self.assertEqual(value, result)
 
     def test_bit_null(self):
+        self.require('bit')
         self.cursor.execute("create table t1(b bit)")
 
         value = None
@@ -428,7 +691,7 @@ class AccessTestCase(unittest.TestCase):
         # really supports Unicode.  For now, we'll have to live with this difference.  All strings in Python 3.x will
         # be Unicode -- pyodbc 3.x will have different defaults.
         value = "de2ac9c6-8676-4b0b-b8a6-217a8580cbee"
-        self.cursor.execute("create table t1(g1 uniqueidentifier)")
+        self.cursor.execute("create table t1(g1 %s)" % self.backend.sqltype('uniqueidentifier'))
         self.cursor.execute("insert into t1 values (?)", value)
         v = self.cursor.execute("select * from t1").fetchone()[0]
         self.assertEqual(type(v), type(value))
@@ -499,9 +762,11 @@ class AccessTestCase(unittest.TestCase):
     def test_lower_case(self):
         "Ensure pyodbc.lowercase forces returned column names to lowercase."
 
+        self.require('lowercase')
+
         # Has to be set before creating the cursor, so we must recreate self.cursor.
 
-        pyodbc.lowercase = True
+        self.backend.module.lowercase = True
         self.cursor = self.cnxn.cursor()
 
         self.cursor.execute("create table t1(Abc int, dEf int)")
@@ -513,7 +778,7 @@ class AccessTestCase(unittest.TestCase):
         self.assertEquals(names, [ "abc", "def" ])
 
         # Put it back so other tests don't fail.
-        pyodbc.lowercase = False
+        self.backend.module.lowercase = False
         
     def test_row_description(self):
         """
@@ -557,7 +822,8 @@ class AccessTestCase(unittest.TestCase):
                    ('error', 'not an int'),
                    (3, 'good') ]
         
-        self.failUnlessRaises(pyodbc.Error, self.cursor.executemany, "insert into t1(a, b) value (?, ?)", params)
+        self.failUnlessRaises(self.backend.module.Error, self.cursor.executemany,
+                              "insert into t1(a, b) value (?, ?)", params)
 
         
     def test_row_slicing(self):
@@ -593,6 +859,7 @@ class AccessTestCase(unittest.TestCase):
 
 
     def test_concatenation(self):
+        self.require('plus_concat')
         v2 = u'0123456789' * 25
         v3 = u'9876543210' * 25
         value = v2 + 'x' + v3
@@ -608,46 +875,669 @@ class AccessTestCase(unittest.TestCase):
     def test_autocommit(self):
         self.assertEqual(self.cnxn.autocommit, False)
 
-        othercnxn = pyodbc.connect(CNXNSTRING, autocommit=True)
+        othercnxn = self.backend.connect(autocommit=True)
         self.assertEqual(othercnxn.autocommit, True)
 
         othercnxn.autocommit = False
         self.assertEqual(othercnxn.autocommit, False)
 
 
+#
+# instrumentation
+#
+
+class CountingCursor(object):
+    """
+    A thin cursor proxy that counts execute, executemany and fetch* calls in `counts`.  Like a pyodbc cursor, execute
+    returns the cursor, so chained fetches are counted too.
+    """
+    def __init__(self, cursor, counts):
+        self._cursor = cursor
+        self._counts = counts
+
+    def _count(self, name):
+        self._counts[name] = self._counts.get(name, 0) + 1
+
+    def execute(self, *args):
+        self._count('execute')
+        self._cursor.execute(*args)
+        return self
+
+    def executemany(self, *args):
+        self._count('executemany')
+        self._cursor.executemany(*args)
+        return self
+
+    def fetchone(self):
+        self._count('fetchone')
+        return self._cursor.fetchone()
+
+    def fetchmany(self, *args):
+        self._count('fetchmany')
+        return self._cursor.fetchmany(*args)
+
+    def fetchall(self):
+        self._count('fetchall')
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class CountingConnection(object):
+    """
+    A connection proxy that counts commits and rollbacks and hands out CountingCursors.
+    """
+    def __init__(self, cnxn, counts):
+        self._cnxn   = cnxn
+        self._counts = counts
+
+    def cursor(self):
+        return CountingCursor(self._cnxn.cursor(), self._counts)
+
+    def commit(self):
+        self._counts['commit'] = self._counts.get('commit', 0) + 1
+        self._cnxn.commit()
+
+    def rollback(self):
+        self._counts['rollback'] = self._counts.get('rollback', 0) + 1
+        self._cnxn.rollback()
+
+    def __getattr__(self, name):
+        return getattr(self._cnxn, name)
+
+
+class _TimingMixin(object):
+    """
+    Records, for each test, its wall time split into setUp, body and tearDown, the round trips counted by an
+    instrumented AccessTestCase and, if `profile_dir` is set, a cProfile saved as <profile_dir>/<test id>.prof.
+    """
+    profile_dir = None
+
+    def startTest(self, test):
+        if not hasattr(self, 'timings'):
+            self.timings = []
+        self._profiler = None
+        if self.profile_dir:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._test_started = default_timer()
+        super(_TimingMixin, self).startTest(test)
+
+    def stopTest(self, test):
+        total = default_timer() - self._test_started
+        profile = None
+        if self._profiler is not None:
+            self._profiler.disable()
+            if not os.path.isdir(self.profile_dir):
+                os.makedirs(self.profile_dir)
+            profile = os.path.join(self.profile_dir, '%s.prof' % test.id())
+            self._profiler.dump_stats(profile)
+
+        phases = getattr(test, 'phase_seconds', {})
+        setup, teardown = phases.get('setUp', 0.0), phases.get('tearDown', 0.0)
+        self.timings.append({
+            'test': test.id(),
+            'total': round(total, 6),
+            'setUp': round(setup, 6),
+            'body': round(max(0.0, total - setup - teardown), 6),
+            'tearDown': round(teardown, 6),
+            'round_trips': dict(getattr(test, 'round_trips', {})),
+            'profile': profile,
+        })
+        super(_TimingMixin, self).stopTest(test)
+
+
+class TimingResult(_TimingMixin, unittest.TextTestResult):
+    pass
+
+
+def format_timings(timings, count):
+    """
+    Returns a table of the `count` slowest tests followed by the time spent in each phase over all tests.
+    """
+    lines = [ '%-52s %9s %9s %9s %9s %7s %6s %6s' % ('test', 'total, s', 'setUp', 'body', 'tearDown', 'execute',
+                                                     'commit', 'fetch') ]
+    for timing in sorted(timings, key=lambda timing: -timing['total'])[:count]:
+        trips = timing['round_trips']
+        fetches = sum(trips.get(name, 0) for name in ('fetchone', 'fetchmany', 'fetchall'))
+        lines.append('%-52s %9.4f %9.4f %9.4f %9.4f %7d %6d %6d' % (
+            timing['test'].split('.')[-1], timing['total'], timing['setUp'], timing['body'], timing['tearDown'],
+            trips.get('execute', 0) + trips.get('executemany', 0), trips.get('commit', 0), fetches))
+    lines.append('all %d tests: setUp %.3f s, body %.3f s, tearDown %.3f s' % (
+        len(timings), sum(t['setUp'] for t in timings), sum(t['body'] for t in timings),
+        sum(t['tearDown'] for t in timings)))
+    return '\n'.join(lines)
+
+
+def save_timings(path, backend, timings):
+    totals = dict((phase, round(sum(t[phase] for t in timings), 6)) for phase in ('total', 'setUp', 'body', 'tearDown'))
+    with open(path, 'w') as f:
+        json.dump({ 'backend': backend.name, 'version': backend.version, 'totals': totals,
+                    'tests': sorted(timings, key=lambda timing: -timing['total']) }, f, indent=2, sort_keys=True)
+
+
+class _OutcomeResult(_TimingMixin, unittest.TestResult):
+    """
+    Records the outcome of each test in a form that a worker process can send back to the parent.
+    """
+    def __init__(self):
+        unittest.TestResult.__init__(self)
+        self.outcomes = []
+        self.timings = []
+
+    def _record(self, test, outcome, detail=None):
+        self.outcomes.append((getattr(test, '_testMethodName', None), str(test), outcome, detail))
+
+    def addSuccess(self, test):
+        unittest.TestResult.addSuccess(self, test)
+        self._record(test, 'success')
+
+    def addFailure(self, test, err):
+        unittest.TestResult.addFailure(self, test, err)
+        self._record(test, 'failure', self.failures[-1][1])
+
+    def addError(self, test, err):
+        unittest.TestResult.addError(self, test, err)
+        self._record(test, 'error', self.errors[-1][1])
+
+    def addSkip(self, test, reason):
+        unittest.TestResult.addSkip(self, test, reason)
+        self._record(test, 'skip', reason)
+
+
+class _MergedResult(unittest.TextTestResult):
+    """
+    A TextTestResult fed with outcomes from worker processes, where failures and errors arrive as formatted tracebacks.
+    """
+    def __init__(self, *args, **kwargs):
+        unittest.TextTestResult.__init__(self, *args, **kwargs)
+        self.timings = []
+
+    def _exc_info_to_string(self, err, test):
+        if isinstance(err, str):
+            return err
+        return unittest.TextTestResult._exc_info_to_string(self, err, test)
+
+
+class _ReportedTest(object):
+    """
+    Stands in for an outcome that doesn't belong to a test method, such as a setUpClass error.
+    """
+    def __init__(self, description):
+        self.description = description
+
+    def __str__(self):
+        return self.description
+
+    def id(self):
+        return self.description
+
+    def shortDescription(self):
+        return None
+
+
+def _init_worker(backend_name, filename, directory, lob_max_size, instrumented, profile_dir):
+    AccessTestCase.LOB_MAX_SIZE = lob_max_size
+    AccessTestCase.instrumented = instrumented
+    _TimingMixin.profile_dir    = profile_dir
+    if backend_name == 'odbc':
+        add_to_path()
+    copy = os.path.join(directory, 'worker-%d%s' % (os.getpid(), os.path.splitext(filename)[1]))
+    if os.path.exists(filename):
+        shutil.copyfile(filename, copy)
+    AccessTestCase.backend = create_backend(backend_name, copy)
+
+
+def _run_shard(names):
+    result = _OutcomeResult()
+    unittest.TestSuite([ AccessTestCase(name) for name in names ]).run(result)
+    return result.outcomes, result.timings
+
+
+def run_parallel(backend_name, filename, names, jobs, verbosity):
+    """
+    Runs the named AccessTestCase methods in `jobs` worker processes and reports them as one TextTestRunner run.
+
+    Every worker works on its own copy of `filename`.  The tests are dealt round-robin into several shards per worker
+    so a worker that gets the slow tests doesn't hold up the others.
+    """
+    shards = [ names[i::jobs * 4] for i in range(jobs * 4) ]
+    shards = [ shard for shard in shards if shard ]
+    directory = tempfile.mkdtemp(prefix='accesstests-')
+
+    def run(result):
+        pool = multiprocessing.Pool(jobs, _init_worker,
+                                    (backend_name, filename, directory, AccessTestCase.LOB_MAX_SIZE,
+                                     AccessTestCase.instrumented, _TimingMixin.profile_dir))
+        try:
+            for outcomes, timings in pool.imap_unordered(_run_shard, shards):
+                result.timings.extend(timings)
+                for name, description, outcome, detail in outcomes:
+                    test = name and AccessTestCase(name) or _ReportedTest(description)
+                    result.startTest(test)
+                    if outcome == 'success':
+                        result.addSuccess(test)
+                    elif outcome == 'failure':
+                        result.addFailure(test, detail)
+                    elif outcome == 'error':
+                        result.addError(test, detail)
+                    else:
+                        result.addSkip(test, detail)
+                    result.stopTest(test)
+        finally:
+            pool.close()
+            pool.join()
+            shutil.rmtree(directory, ignore_errors=True)
+
+    testRunner = unittest.TextTestRunner(verbosity=verbosity, resultclass=_MergedResult)
+    return testRunner.run(run)
+
+
+#
+# benchmark
+#
+
+BENCHMARK_TABLE          = 'bench'
+BENCHMARK_CHUNK_ROWS     = 10000
+BENCHMARK_FETCHMANY_SIZES = [ 10, 100, 1000, 10000 ]
+
+# Slowdowns smaller than this many seconds per strategy are treated as noise when comparing with a baseline.  Two
+# identical sqlite runs of 20000 rows, started one after the other, differ by up to 0.03 s per strategy.
+BENCHMARK_NOISE_SECONDS  = 0.05
+
+BENCHMARK_MEMORY_SOURCE  = 'tracemalloc: Python allocations only, not the memory of the driver or the database engine'
+
+
+def _benchmark_rows(count, start=0):
+    for i in xrange(start, start + count):
+        yield (i, _TESTSTR[:i % len(_TESTSTR)], i * 0.5)
+
+
+def _measure(function, trace_memory, repeat):
+    """
+    Calls `function` `repeat` times and returns (median seconds, fastest seconds, peak KiB of Python allocations or
+    None).
+
+    tracemalloc slows allocation down considerably, so the time and the memory come from separate calls.
+    """
+    timings = []
+    for i in xrange(repeat):
+        started = default_timer()
+        function()
+        timings.append(default_timer() - started)
+
+    peak = None
+    if trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+        try:
+            function()
+            peak = tracemalloc.get_traced_memory()[1] // 1024
+        finally:
+            tracemalloc.stop()
+    return _median(timings), min(timings), peak
+
+
+def run_benchmark(backend, count, trace_memory=True, repeat=5):
+    """
+    Inserts `count` rows with each insert strategy and reads them back with each fetch strategy, `repeat` times each.
+
+    Returns a dictionary (saved as JSON) with the median and fastest time, rows/s (from the median) and the peak
+    memory of every strategy.  The peak comes from tracemalloc, which only sees Python allocations: memory allocated
+    by the driver or by sqlite itself is not counted.
+    """
+    cnxn = backend.connect()
+    cursor = cnxn.cursor()
+    insert = 'insert into %s(id, s, f) values (?, ?, ?)' % BENCHMARK_TABLE
+    select = 'select id, s, f from %s' % BENCHMARK_TABLE
+
+    def recreate():
+        try:
+            cursor.execute('drop table %s' % BENCHMARK_TABLE)
+        except backend.module.Error:
+            pass
+        cursor.execute('create table %s(id int, s varchar(50), f float)' % BENCHMARK_TABLE)
+        cnxn.commit()
+
+    def insert_execute():
+        recreate()
+        for row in _benchmark_rows(count):
+            cursor.execute(insert, row)
+        cnxn.commit()
+
+    def insert_executemany():
+        recreate()
+        cursor.executemany(insert, list(_benchmark_rows(count)))
+        cnxn.commit()
+
+    def insert_executemany_chunked():
+        recreate()
+        for start in xrange(0, count, BENCHMARK_CHUNK_ROWS):
+            cursor.executemany(insert, list(_benchmark_rows(min(BENCHMARK_CHUNK_ROWS, count - start), start)))
+        cnxn.commit()
+
+    def fetch(read):
+        def run():
+            cursor.execute(select)
+            fetched = read()
+            assert fetched == count, 'fetched %s rows, expected %s' % (fetched, count)
+        return run
+
+    def read_fetchone():
+        fetched = 0
+        while cursor.fetchone() is not None:
+            fetched += 1
+        return fetched
+
+    def read_fetchmany(size):
+        def read():
+            fetched = 0
+            while True:
+                rows = cursor.fetchmany(size)
+                if not rows:
+                    return fetched
+                fetched += len(rows)
+        return read
+
+    def read_fetchall():
+        return len(cursor.fetchall())
+
+    def read_iterate():
+        fetched = 0
+        for row in cursor:
+            fetched += 1
+        return fetched
+
+    strategies = [
+        ('insert_execute', insert_execute),
+        ('insert_executemany', insert_executemany),
+        ('insert_executemany_chunked', insert_executemany_chunked),
+        ('fetchone', fetch(read_fetchone)),
+    ]
+    strategies += [ ('fetchmany_%d' % size, fetch(read_fetchmany(size))) for size in BENCHMARK_FETCHMANY_SIZES ]
+    strategies += [ ('fetchall', fetch(read_fetchall)), ('iterate', fetch(read_iterate)) ]
+
+    trace_memory = trace_memory and sys.version_info >= (3, 4)
+    results = {}
+    try:
+        for name, function in strategies:
+            seconds, fastest, peak = _measure(function, trace_memory, repeat)
+            results[name] = {
+                'seconds': round(seconds, 6),
+                'min_seconds': round(fastest, 6),
+                'rows_per_sec': round(count / seconds if seconds else 0.0, 1),
+                'peak_kib': peak,
+            }
+        cursor.execute('drop table %s' % BENCHMARK_TABLE)
+        cnxn.commit()
+    finally:
+        cnxn.close()
+
+    return { 'backend': backend.name, 'version': backend.version, 'rows': count, 'repeat': repeat,
+             'peak_kib_source': trace_memory and BENCHMARK_MEMORY_SOURCE or None, 'strategies': results }
+
+
+def compare_benchmark(results, baseline, tolerance):
+    """
+    Returns a list of regressions: strategies whose fastest time is slower than the baseline's median time (both
+    scaled to this run's number of rows) by more than `tolerance` (a fraction) and BENCHMARK_NOISE_SECONDS, or that
+    used more memory.
+
+    Only the fastest of this run's repeats is compared: a single slow repeat is noise, but a strategy whose best repeat
+    is still slower than the baseline usually is has regressed.  Memory is only compared if both runs used the same
+    number of rows.
+    """
+    regressions = []
+    count = results['rows']
+    same_rows = count == baseline.get('rows')
+    for name in sorted(results['strategies']):
+        current  = results['strategies'][name]
+        previous = baseline.get('strategies', {}).get(name)
+        if previous is None or not baseline.get('rows'):
+            continue
+        # The time the baseline usually took, scaled to this run's number of rows.
+        expected = previous['seconds'] * count / baseline['rows']
+        if (current['min_seconds'] > expected * (1 + tolerance)
+                and current['min_seconds'] - expected > BENCHMARK_NOISE_SECONDS):
+            regressions.append('%s: fastest %.4f s, baseline median %.4f s' % (name, current['min_seconds'], expected))
+        if (same_rows and current['peak_kib'] is not None and previous.get('peak_kib') is not None
+                and current['peak_kib'] > previous['peak_kib'] * (1 + tolerance)):
+            regressions.append('%s: peak %d KiB of Python allocations, baseline %d KiB'
+                               % (name, current['peak_kib'], previous['peak_kib']))
+    return regressions
+
+
+#
+# value-size sweep
+#
+
+# sqltype -> (largest value size, function making the value to insert, keyword arguments for _test_strtype).  Access
+# text and binary columns hold at most 255 characters.
+SWEEP_TYPES = {
+    'varchar':   (255,  lambda s: unicode(s), lambda v: { 'colsize': len(v) }),
+    'varbinary': (255,  buffer,               lambda v: { 'colsize': len(v),
+                                                              'resulttype': AccessTestCase.backend.BINARY }),
+    'memo':      (None, lambda s: unicode(s), lambda v: {}),
+    'image':     (None, buffer,               lambda v: { 'resulttype': AccessTestCase.backend.BINARY }),
+}
+
+SWEEP_OFFSETS = [ -2, -1, 0, 1, 2 ]
+
+# Latency changes smaller than this are treated as noise when comparing with a baseline.
+SWEEP_NOISE_US = 100
+
+
+def sweep_sizes(limit):
+    """
+    Returns the value sizes to measure: 0, 1 and a few sizes on both sides of every power of two from 128 up to `limit`.
+    """
+    sizes = set([ 0, 1 ])
+    boundary = 128
+    while boundary - SWEEP_OFFSETS[-1] <= limit:
+        sizes.update(boundary + offset for offset in SWEEP_OFFSETS)
+        boundary *= 2
+    return sorted(size for size in sizes if size <= limit)
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2.0
+
+
+def run_sweep(backend, sqltypes, max_size, repeat):
+    """
+    Measures insert and select latency of values of each size through _test_strtype, which also checks that the value
+    comes back intact.  Every measurement runs like a test (setUp, _test_strtype, tearDown) and the median of `repeat`
+    measurements is reported.
+    """
+    curves = {}
+    AccessTestCase.setUpClass()
+    case = AccessTestCase('_test_strtype')
+    try:
+        for sqltype in sqltypes:
+            limit, make_value, make_kwargs = SWEEP_TYPES[sqltype]
+            points = []
+            for size in sweep_sizes(min(limit or max_size, max_size)):
+                value = make_value(_generate_test_string(size))
+                timings = []
+                for i in xrange(repeat):
+                    case.setUp()
+                    try:
+                        case._test_strtype(sqltype, value, timings=timings, **make_kwargs(value))
+                    finally:
+                        case.tearDown()
+                points.append({
+                    'size': size,
+                    'insert_us': round(_median([ t[0] for t in timings ]) * 1e6, 1),
+                    'select_us': round(_median([ t[1] for t in timings ]) * 1e6, 1),
+                })
+            curves[sqltype] = points
+    finally:
+        AccessTestCase.tearDownClass()
+    return { 'backend': backend.name, 'version': backend.version, 'repeat': repeat, 'curves': curves }
+
+
+def _find_cliffs(points):
+    """
+    Returns the sizes at which latency at least doubles: for each power of two, the median latency of the measured
+    sizes at or above it is compared with the median of the sizes just below it.
+    """
+    cliffs = set()
+    sizes = [ point['size'] for point in points ]
+    boundary = 128
+    while sizes and boundary <= sizes[-1]:
+        below = [ point for point in points if boundary + SWEEP_OFFSETS[0] <= point['size'] < boundary ]
+        above = [ point for point in points if boundary <= point['size'] <= boundary + SWEEP_OFFSETS[-1] ]
+        if below and above:
+            for key in ('insert_us', 'select_us'):
+                if _median([ p[key] for p in above ]) >= 2 * _median([ p[key] for p in below ]):
+                    cliffs.add(above[0]['size'])
+        boundary *= 2
+    return cliffs
+
+
+def format_sweep(results):
+    """
+    Returns the curves as a table, marking the sizes where latency jumps at a power of two.
+    """
+    lines = []
+    for sqltype in sorted(results['curves']):
+        points = results['curves'][sqltype]
+        cliffs = _find_cliffs(points)
+        lines.append('%-10s %10s %12s %12s' % (sqltype, 'size', 'insert, us', 'select, us'))
+        for point in points:
+            lines.append('%-10s %10d %12.1f %12.1f%s' % ('', point['size'], point['insert_us'], point['select_us'],
+                                                         point['size'] in cliffs and '  <-- cliff' or ''))
+    return '\n'.join(lines)
+
+
+def compare_sweep(results, baseline, tolerance):
+    """
+    Returns a list of points whose insert or select latency grew by more than `tolerance` (a fraction) and by more than
+    SWEEP_NOISE_US compared to `baseline`.
+    """
+    regressions = []
+    for sqltype in sorted(results['curves']):
+        previous = dict((point['size'], point) for point in baseline.get('curves', {}).get(sqltype, []))
+        for point in results['curves'][sqltype]:
+            before = previous.get(point['size'])
+            if before is None:
+                continue
+            for key in ('insert_us', 'select_us'):
+                if point[key] > before[key] * (1 + tolerance) and point[key] - before[key] > SWEEP_NOISE_US:
+                    regressions.append('%s %d %s: %.1f us, baseline %.1f us' % (sqltype, point['size'], key,
+                                                                              point[key], before[key]))
+    return regressions
+
+
+def _save_and_compare(results, options, compare):
+    """
+    Saves `results` to --output and exits with status 1 if `compare` finds regressions against --baseline.
+    """
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if options.baseline:
+        with open(options.baseline) as f:
+            regressions = compare(results, json.load(f), options.tolerance)
+        for regression in regressions:
+            print('REGRESSION %s' % regression)
+        if regressions:
+            sys.exit(1)
+
+
 def main():
     from optparse import OptionParser
     parser = OptionParser(usage=usage)
-    parser.add_option("-v", "--verbose", action="count", help="Increment test verbosity (can be used multiple times)")
+    parser.add_option("-v", "--verbose", action="count", default=0,
+                      help="Increment test verbosity (can be used multiple times)")
     parser.add_option("-d", "--debug", action="store_true", default=False, help="Print debugging items")
     parser.add_option("-t", "--test", help="Run only the named test")
+    parser.add_option("-b", "--backend", default="odbc", choices=sorted(BACKENDS),
+                      help="Database backend: odbc (the Access driver, default) or sqlite")
+    parser.add_option("-j", "--jobs", type="int", default=1,
+                      help="Run the tests in N worker processes, each with its own copy of the database")
+    parser.add_option("--lob-max-mb", type="int", default=10,
+                      help="Run the large object tests up to this size in MB (10, 100 or 1000; default 10)")
+    parser.add_option("--timings", help="Record per-test timings and round trips and save them as JSON to this file")
+    parser.add_option("--slowest", type="int", default=0, help="Print the N slowest tests (implies timing)")
+    parser.add_option("--profile-dir", help="Save a cProfile of each test to this directory (implies timing)")
+    parser.add_option("--benchmark", action="store_true", default=False,
+                      help="Measure insert and fetch throughput instead of running the tests")
+    parser.add_option("--rows", type="int", default=100000, help="Number of rows for --benchmark")
+    parser.add_option("--no-memory", action="store_true", default=False,
+                      help="Skip the (slow) tracemalloc pass of --benchmark")
+    parser.add_option("--sweep", action="store_true", default=False,
+                      help="Measure insert and select latency against value size instead of running the tests")
+    parser.add_option("--sweep-types", default="varchar,varbinary,memo,image",
+                      help="Comma-separated column types for --sweep")
+    parser.add_option("--max-size", type="int", default=4 * 1024 * 1024, help="Largest value size for --sweep")
+    parser.add_option("--repeat", type="int", default=5,
+                      help="Measurements per value size for --sweep and per strategy for --benchmark")
+    parser.add_option("--output", help="Save the --benchmark or --sweep results as JSON to this file")
+    parser.add_option("--baseline", help="Fail if --benchmark or --sweep is slower than the results saved in this file")
+    parser.add_option("--tolerance", type="float", default=0.5,
+                      help="Allowed slowdown relative to --baseline, as a fraction (default 0.5, above the drift "
+                           "between identical runs on a shared machine)")
 
     (options, args) = parser.parse_args()
 
     if len(args) != 1:
         parser.error('dbfile argument required')
+    if options.repeat < 1:
+        parser.error('--repeat must be at least 1')
 
-    if args[0].endswith('.accdb'):
-        driver = 'Microsoft Access Driver (*.mdb, *.accdb)'
-    else:
-        driver = 'Microsoft Access Driver (*.mdb)'
+    if options.backend == 'odbc':
+        # Add the build directory to the path so we're testing the latest build, not the installed version.
+        add_to_path()
 
-    global CNXNSTRING
-    CNXNSTRING = 'DRIVER={%s};DBQ=%s;ExtendedAnsiSQL=1' % (driver, abspath(args[0]))
+    backend = create_backend(options.backend, args[0])
+    AccessTestCase.backend = backend
+    AccessTestCase.LOB_MAX_SIZE = options.lob_max_mb * 1000 * 1000
 
-    cnxn = pyodbc.connect(CNXNSTRING)
-    print_library_info(cnxn)
+    cnxn = backend.connect()
+    backend.print_library_info(cnxn)
     cnxn.close()
 
+    if options.benchmark:
+        results = run_benchmark(backend, options.rows, not options.no_memory, options.repeat)
+        print(json.dumps(results, indent=2, sort_keys=True))
+        _save_and_compare(results, options, compare_benchmark)
+        return
+
+    if options.sweep:
+        sqltypes = [ sqltype.strip() for sqltype in options.sweep_types.split(',') if sqltype.strip() ]
+        for sqltype in sqltypes:
+            if sqltype not in SWEEP_TYPES:
+                parser.error('unknown sweep type %r, available: %s' % (sqltype, ', '.join(sorted(SWEEP_TYPES))))
+        results = run_sweep(backend, sqltypes, options.max_size, options.repeat)
+        print(format_sweep(results))
+        _save_and_compare(results, options, compare_sweep)
+        return
+
     suite = load_tests(AccessTestCase, options.test)
 
-    testRunner = unittest.TextTestRunner(verbosity=options.verbose)
-    result = testRunner.run(suite)
+    timed = bool(options.timings or options.slowest or options.profile_dir)
+    AccessTestCase.instrumented = timed
+    _TimingMixin.profile_dir    = options.profile_dir and os.path.abspath(options.profile_dir)
 
+    if options.jobs > 1:
+        names = [ test._testMethodName for test in suite ]
+        result = run_parallel(options.backend, args[0], names, options.jobs, options.verbose)
+    else:
+        testRunner = unittest.TextTestRunner(verbosity=options.verbose, resultclass=timed and TimingResult or None)
+        result = testRunner.run(suite)
 
-if __name__ == '__main__':
+    if timed:
+        print(format_timings(result.timings, options.slowest or 10))
+        if options.timings:
+            save_timings(options.timings, backend, result.timings)
 
-    # Add the build directory to the path so we're testing the latest build, not the installed version.
-    add_to_path()
-    import pyodbc
+
+if __name__ == '__main__':
     main()
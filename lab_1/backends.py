@@ -0,0 +1,333 @@
+"""
+Database backends for accesstests.
+
+The tests were written for the Microsoft Access ODBC driver, which only exists on Windows.  A backend wraps the parts
+that depend on the driver: the connection string, the Access-specific SQL type names, getinfo/dataSources and the
+features the engine can be expected to support.  With the sqlite backend the string, binary, rowcount, executemany and
+row tests run on machines without the Access driver.
+
+ConnectionPool keeps connections open across tests, and a backend can snapshot the database file so a test that
+changed the schema for good (DDL that isn't transactional, or an explicit commit) can be undone by copying it back.
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from abc import ABCMeta, abstractmethod
+
+# abc.ABC only exists on Python 3, so the base class is built with the metaclass directly.
+ABC = ABCMeta('ABC', (object,), {})
+
+
+class Backend(ABC):
+    """
+    The interface AccessTestCase uses instead of talking to pyodbc directly.  Subclasses must implement connect,
+    data_sources, getinfo and print_library_info.
+
+    `module` is the DB-API module (for Error, ProgrammingError, etc.), `BINARY` is the type binary values are read
+    back as and `version` is the version string of the driver library.
+    """
+    name = None
+
+    # Access type name -> the name to use in DDL for this engine.  Names that are not listed are used as is.
+    TYPE_NAMES = {}
+
+    # Optional behaviors that not every engine has; tests that depend on them call AccessTestCase.require.
+    FEATURES = frozenset()
+
+    module = None
+    BINARY = None
+    version = None
+
+    def __init__(self, filename):
+        self.filename = os.path.abspath(filename)
+
+    @abstractmethod
+    def connect(self, autocommit=False):
+        pass
+
+    def sqltype(self, name):
+        return self.TYPE_NAMES.get(name, name)
+
+    def supports(self, feature):
+        return feature in self.FEATURES
+
+    @abstractmethod
+    def data_sources(self):
+        pass
+
+    @abstractmethod
+    def getinfo(self, cnxn, name):
+        """
+        Returns the value of the ODBC getinfo item `name`, e.g. 'SQL_CATALOG_NAME_SEPARATOR'.
+        """
+        pass
+
+    @abstractmethod
+    def print_library_info(self, cnxn):
+        pass
+
+    def begin(self, cnxn):
+        """
+        Starts the transaction a test runs in.  With autocommit off ODBC is always in a transaction, so by default
+        there is nothing to do.
+        """
+        pass
+
+    def tables(self, cnxn):
+        """
+        Returns the set of user table names, used to tell whether a test left anything behind.
+        """
+        cursor = cnxn.cursor()
+        try:
+            return set(row.table_name for row in cursor.tables(tableType='TABLE'))
+        finally:
+            cursor.close()
+
+    def snapshot(self):
+        """
+        Copies the database file to a temporary template and returns its path.
+        """
+        fd, template = tempfile.mkstemp(prefix='template-', suffix=os.path.splitext(self.filename)[1])
+        os.close(fd)
+        shutil.copyfile(self.filename, template)
+        return template
+
+    def restore(self, template):
+        """
+        Replaces the database file with the template.  All connections to it must be closed.
+        """
+        shutil.copyfile(template, self.filename)
+
+    def insert_lob(self, cursor, table, column, payload):
+        """
+        Inserts a row (1, payload) into `table`, which has the columns n1 and `column`.  DB-API parameters must be
+        complete values, so by default the payload is materialized.
+        """
+        value = payload.value()
+        if payload.binary and not isinstance(value, self.BINARY):
+            value = self.BINARY(value)
+        cursor.execute('insert into %s(n1, %s) values(1, ?)' % (table, column), value)
+
+    def max_lob_size(self, cnxn):
+        """
+        Returns the size a single value must stay below, or None if the engine has no limit of its own.
+        """
+        return None
+
+    def fetch_lob(self, cursor, table, column):
+        """
+        Returns the value of `column` in the single row of `table`, or an object that reads it in slices and must be
+        closed.
+        """
+        return cursor.execute('select %s from %s' % (column, table)).fetchone()[0]
+
+
+class ConnectionPool(object):
+    """
+    Keeps connections open between tests so each test doesn't pay for connecting.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+        self.opened = 0
+        self._idle = []
+
+    def acquire(self):
+        if self._idle:
+            return self._idle.pop()
+        self.opened += 1
+        return self.backend.connect()
+
+    def release(self, cnxn):
+        """
+        Returns a connection to the pool.  The caller must have ended its transaction.
+        """
+        self._idle.append(cnxn)
+
+    def discard(self, cnxn):
+        try:
+            cnxn.close()
+        except self.backend.module.Error:
+            # Already closed.
+            pass
+
+    def close(self):
+        while self._idle:
+            self.discard(self._idle.pop())
+
+
+class OdbcBackend(Backend):
+    """
+    The Microsoft Access ODBC driver through pyodbc.
+    """
+    name = 'odbc'
+    FEATURES = frozenset([ 'datetime', 'decimal', 'bit', 'lowercase', 'plus_concat' ])
+
+    def __init__(self, filename):
+        Backend.__init__(self, filename)
+        import pyodbc
+        self.module  = pyodbc
+        self.BINARY  = pyodbc.BINARY
+        self.version = pyodbc.version
+
+        if filename.endswith('.accdb'):
+            driver = 'Microsoft Access Driver (*.mdb, *.accdb)'
+        else:
+            driver = 'Microsoft Access Driver (*.mdb)'
+        self.connection_string = 'DRIVER={%s};DBQ=%s;ExtendedAnsiSQL=1' % (driver, self.filename)
+
+    def connect(self, autocommit=False):
+        return self.module.connect(self.connection_string, autocommit=autocommit)
+
+    def data_sources(self):
+        return self.module.dataSources()
+
+    def getinfo(self, cnxn, name):
+        return cnxn.getinfo(getattr(self.module, name))
+
+    def print_library_info(self, cnxn):
+        from testutils import print_library_info
+        print_library_info(cnxn)
+
+
+class Row(tuple):
+    """
+    A tuple that behaves like pyodbc.Row where the tests rely on it: it carries the description of the cursor that
+    produced it, and slicing the whole row returns the row itself.
+    """
+    def __new__(cls, values, description):
+        row = tuple.__new__(cls, values)
+        row.cursor_description = description
+        return row
+
+    def __getitem__(self, index):
+        if isinstance(index, slice) and index.indices(len(self)) == (0, len(self), 1):
+            return self
+        return tuple.__getitem__(self, index)
+
+    def __getslice__(self, start, stop):
+        # Python 2 slices tuples through __getslice__.
+        return self.__getitem__(slice(start, stop))
+
+
+def _make_row(cursor, values):
+    return Row(values, cursor.description)
+
+
+class SqliteCursor(sqlite3.Cursor):
+    """
+    Accepts parameters the way pyodbc does: either a single sequence or one positional argument per marker.
+    """
+    def execute(self, sql, *params):
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = params[0]
+        return sqlite3.Cursor.execute(self, sql, params)
+
+
+class SqliteConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        sqlite3.Connection.__init__(self, *args, **kwargs)
+        self.row_factory = _make_row
+
+    def cursor(self, factory=None):
+        return sqlite3.Connection.cursor(self, factory or SqliteCursor)
+
+    @property
+    def autocommit(self):
+        return self.isolation_level is None
+
+    @autocommit.setter
+    def autocommit(self, value):
+        self.isolation_level = None if value else ''
+
+
+class SqliteBackend(Backend):
+    """
+    A local sqlite3 database standing in for Access.
+
+    SQLite picks a column's affinity from its declared type name, so the Access names are mapped to names that give
+    the same storage class (e.g. memo would otherwise get NUMERIC affinity and turn '0' into 0).
+    """
+    name = 'sqlite'
+    TYPE_NAMES = {
+        'varchar': 'varchar',
+        'memo': 'text',
+        'varbinary': 'blob',
+        'image': 'blob',
+        'money': 'numeric',
+        'uniqueidentifier': 'char(36)',
+    }
+
+    # Fixed answers for the getinfo items the tests ask about, using the ODBC constant values.
+    GETINFO = {
+        'SQL_CATALOG_NAME_SEPARATOR': '.',
+        'SQL_ACCESSIBLE_TABLES': True,
+        'SQL_DEFAULT_TXN_ISOLATION': 8, # SQL_TXN_SERIALIZABLE
+        'SQL_CONCAT_NULL_BEHAVIOR': 0,  # SQL_CB_NULL
+        'SQL_DBMS_NAME': 'SQLite',
+        'SQL_DBMS_VER': sqlite3.sqlite_version,
+    }
+
+    module  = sqlite3
+    BINARY  = bytes if sys.version_info[0] >= 3 else buffer
+    version = sqlite3.sqlite_version
+
+    def connect(self, autocommit=False):
+        return sqlite3.connect(self.filename, factory=SqliteConnection, isolation_level=None if autocommit else '')
+
+    def data_sources(self):
+        return { os.path.basename(self.filename): 'SQLite %s' % sqlite3.sqlite_version }
+
+    def getinfo(self, cnxn, name):
+        return self.GETINFO[name]
+
+    def begin(self, cnxn):
+        # sqlite3 only opens a transaction implicitly before DML, so DDL would be committed right away.
+        cnxn.execute('begin')
+
+    def tables(self, cnxn):
+        return set(row[0] for row in cnxn.execute("select name from sqlite_master where type = 'table'"))
+
+    def max_lob_size(self, cnxn):
+        # SQLITE_LIMIT_LENGTH, 10**9 unless SQLite was compiled with another limit.
+        if hasattr(cnxn, 'getlimit'):
+            return cnxn.getlimit(sqlite3.SQLITE_LIMIT_LENGTH)
+        return 1000 * 1000 * 1000
+
+    def insert_lob(self, cursor, table, column, payload):
+        if not payload.binary or not hasattr(cursor.connection, 'blobopen'):
+            return Backend.insert_lob(self, cursor, table, column, payload)
+        # Python 3.11+ has incremental blob I/O: reserve the space with zeroblob and write the payload chunk by chunk.
+        cursor.execute('insert into %s(n1, %s) values(1, zeroblob(?))' % (table, column), payload.size)
+        blob = cursor.connection.blobopen(table, column, cursor.lastrowid)
+        try:
+            for chunk in payload.chunks():
+                blob.write(chunk)
+        finally:
+            blob.close()
+
+    def fetch_lob(self, cursor, table, column):
+        if not hasattr(cursor.connection, 'blobopen'):
+            return Backend.fetch_lob(self, cursor, table, column)
+        rowid, kind = cursor.execute('select rowid, typeof(%s) from %s' % (column, table)).fetchone()
+        if kind != 'blob':
+            return Backend.fetch_lob(self, cursor, table, column)
+        return cursor.connection.blobopen(table, column, rowid, readonly=True)
+
+    def print_library_info(self, cnxn):
+        print('python:  %s' % sys.version)
+        print('sqlite:  %s %s' % (sqlite3.sqlite_version, self.filename))
+
+
+BACKENDS = {
+    'odbc': OdbcBackend,
+    'sqlite': SqliteBackend,
+}
+
+
+def create_backend(name, filename):
+    if name not in BACKENDS:
+        raise ValueError('unknown backend %r, available: %s' % (name, ', '.join(sorted(BACKENDS))))
+    return BACKENDS[name](filename)
@@ -0,0 +1,17 @@
+"""
+accesstests and backends are plain modules next to this directory, so lab_1 is put on sys.path.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import SqliteBackend  # noqa: E402
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SqliteBackend(str(tmp_path / 'test.db'))
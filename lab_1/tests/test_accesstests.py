@@ -0,0 +1,199 @@
+import io
+import os
+import sqlite3
+import unittest
+
+import pytest
+
+import accesstests
+
+
+def _case_class(backend, **methods):
+    """
+    An AccessTestCase subclass with only the given test methods, bound to `backend`.  It is built inside the tests so
+    pytest doesn't collect it (or the full AccessTestCase) on its own.
+    """
+    methods['backend'] = backend
+    return type('Case', (accesstests.AccessTestCase,), methods)
+
+
+def _run(case_class, names):
+    result = unittest.TestResult()
+    unittest.TestSuite([ case_class(name) for name in names ]).run(result)
+    assert not result.errors and not result.failures, result.errors + result.failures
+    return result
+
+
+def test_no_state_leaks_between_tests(backend):
+    cnxn = backend.connect(autocommit=True)
+    cnxn.execute('create table keep(n int)')
+    cnxn.close()
+    seen = []
+
+    def rolled_back(self):
+        self.cursor.execute('create table t1(n int)')
+        self.cursor.execute('insert into keep values(1)')
+
+    def committed(self):
+        # Commits a new table, which tearDown drops on the pooled connection.
+        self.cursor.execute('create table t1(n int)')
+        self.cnxn.commit()
+
+    def dropped_template_table(self):
+        # A table of the template is gone for good, so tearDown restores the template.
+        self.cursor.execute('drop table keep')
+        self.cnxn.commit()
+
+    def closed_connection(self):
+        self.cursor.execute('create table t2(n int)')
+        self.cnxn.commit()
+        self.cnxn.close()
+
+    def check(self):
+        seen.append((self.backend.tables(self.cnxn), self.cursor.execute('select count(*) from keep').fetchone()[0]))
+
+    case_class = _case_class(backend, test_rolled_back=rolled_back, test_committed=committed,
+                             test_dropped_template_table=dropped_template_table,
+                             test_closed_connection=closed_connection, test_check=check)
+    names = [ 'test_rolled_back', 'test_committed', 'test_dropped_template_table', 'test_closed_connection' ]
+    # The suite runs setUpClass and tearDownClass itself.
+    _run(case_class, [ name for leak in names for name in (leak, 'test_check') ])
+    assert seen == [ (set([ 'keep' ]), 0) ] * len(names)
+    # Besides the first connection, only restoring the template and the closed connection needed new ones.
+    assert case_class.pool.opened == 3
+
+
+def _curve(limit, insert_us=None, select_us=None):
+    """
+    Synthetic sweep points for the sizes run_sweep would measure up to `limit`, 10 us each unless the given functions
+    return something else for a size.
+    """
+    return [ { 'size': size,
+               'insert_us': insert_us(size) if insert_us else 10.0,
+               'select_us': select_us(size) if select_us else 10.0 }
+             for size in accesstests.sweep_sizes(limit) ]
+
+
+def test_find_cliffs():
+    assert accesstests._find_cliffs(_curve(4096)) == set()
+    assert accesstests._find_cliffs([]) == set()
+
+    # Latency doubles from 512 bytes on, so the cliff is at the first measured size at the boundary.
+    select_cliff = _curve(4096, select_us=lambda size: 25.0 if size >= 512 else 10.0)
+    assert accesstests._find_cliffs(select_cliff) == set([ 512 ])
+    insert_cliffs = _curve(4096, insert_us=lambda size: 10.0 * 2 ** (size >= 256) * 2 ** (size >= 2048))
+    assert accesstests._find_cliffs(insert_cliffs) == set([ 256, 2048 ])
+
+    # Growth just short of doubling, or a single slow point off a boundary, is not a cliff.
+    assert accesstests._find_cliffs(_curve(4096, select_us=lambda size: 19.0 if size >= 1024 else 10.0)) == set()
+    assert accesstests._find_cliffs(_curve(4096, insert_us=lambda size: 50.0 if size == 1026 else 10.0)) == set()
+
+    # Without sizes below the boundary there is nothing to compare with.
+    points = [ point for point in select_cliff if not 510 <= point['size'] < 512 ]
+    assert accesstests._find_cliffs(points) == set()
+
+
+def test_format_sweep_marks_cliffs():
+    results = { 'curves': { 'image': _curve(1024, select_us=lambda size: 30.0 if size >= 256 else 10.0) } }
+    marked = [ line.split()[0] for line in accesstests.format_sweep(results).splitlines() if 'cliff' in line ]
+    assert marked == [ '256' ]
+
+
+CHUNK_SIZE = accesstests.LobPayload.CHUNK_SIZE
+
+# The fencepost sizes of the tests plus the sizes around the chunk boundaries of LobPayload.
+PAYLOAD_SIZES = sorted(set(accesstests.AccessTestCase.IMAGE_FENCEPOST_SIZES +
+                           [ CHUNK_SIZE - 1, CHUNK_SIZE, CHUNK_SIZE + 1, 2 * CHUNK_SIZE + 7 ]))
+
+
+@pytest.mark.parametrize('size', accesstests.AccessTestCase.IMAGE_FENCEPOST_SIZES)
+def test_fencepost(size):
+    value = accesstests._fencepost(size)
+    assert value == accesstests._generate_test_string(size) and len(value) == size
+    # Built once and cached after that.
+    assert accesstests._fencepost(size) is value
+
+
+@pytest.mark.parametrize('binary', [ False, True ], ids=[ 'text', 'binary' ])
+@pytest.mark.parametrize('size', PAYLOAD_SIZES)
+def test_lob_payload(size, binary):
+    expected = accesstests._generate_test_string(size)
+    if binary:
+        expected = expected.encode('ascii')
+    payload = accesstests.LobPayload(size, binary)
+    value = payload.value()
+    assert value == expected and (bytearray if binary else str) is type(value)
+    assert all(len(chunk) <= CHUNK_SIZE for chunk in payload.chunks())
+    assert payload.mismatch(expected) is None
+    if size:
+        assert payload.mismatch(expected[:-1]) == size - 1
+        corrupted = expected[:size // 2] + (b'#' if binary else '#') + expected[size // 2 + 1:]
+        assert payload.mismatch(corrupted) == size // 2
+
+
+@pytest.mark.parametrize('sqltype, binary', [ ('image', True), ('memo', False) ])
+@pytest.mark.parametrize('size', PAYLOAD_SIZES)
+def test_lob_round_trip(backend, sqltype, binary, size):
+    payload = accesstests.LobPayload(size, binary)
+    cnxn = backend.connect()
+    cursor = cnxn.cursor()
+    cursor.execute('create table t1(n1 int not null, s1 %s)' % backend.sqltype(sqltype))
+    backend.insert_lob(cursor, 't1', 's1', payload)
+    value = backend.fetch_lob(cursor, 't1', 's1')
+    try:
+        if binary and hasattr(cnxn, 'blobopen'):
+            # Python 3.11+ streams blobs in and out through sqlite3.Blob.
+            assert isinstance(value, sqlite3.Blob)
+        assert len(value) == size and payload.mismatch(value) is None
+        # The whole value is also byte-identical to the materialized payload.
+        if binary:
+            assert bytes(value[:]) == bytes(payload.value())
+        else:
+            assert value == payload.value()
+    finally:
+        if hasattr(value, 'close'):
+            value.close()
+        cnxn.close()
+
+
+def test_counting_connection(backend):
+    counts = {}
+    cnxn = accesstests.CountingConnection(backend.connect(), counts)
+    cursor = cnxn.cursor()
+    cursor.execute('create table t1(n int)')
+    cursor.executemany('insert into t1 values(?)', [ (i,) for i in range(5) ])
+    assert cursor.rowcount == 5
+    cnxn.commit()
+    # execute returns the proxy, so chained fetches are counted as well.
+    assert cursor.execute('select count(*) from t1').fetchone()[0] == 5
+    cursor.execute('select n from t1 order by n')
+    assert len(cursor.fetchmany(2)) == 2 and len(cursor.fetchall()) == 3
+    cursor.execute('select n from t1')
+    assert len(list(cursor)) == 5
+    cursor.execute('delete from t1')
+    cnxn.rollback()
+    assert counts == { 'execute': 5, 'executemany': 1, 'fetchone': 1, 'fetchmany': 1, 'fetchall': 1,
+                       'commit': 1, 'rollback': 1 }
+    cnxn.close()
+
+
+def test_timing_result(backend, tmp_path):
+    def statements(self):
+        self.cursor.execute('create table t1(n int)')
+        self.cursor.execute('insert into t1 values(?)', 1)
+        self.cursor.execute('select n from t1').fetchall()
+        self.cnxn.commit()
+
+    case_class = _case_class(backend, instrumented=True, test_statements=statements)
+    result = accesstests.TimingResult(io.StringIO(), False, 0)
+    result.profile_dir = str(tmp_path / 'profiles')
+    unittest.TestSuite([ case_class('test_statements') ]).run(result)
+    assert result.wasSuccessful()
+
+    [ timing ] = result.timings
+    assert timing['test'].endswith('Case.test_statements')
+    # tearDown rolls back through the counting connection; dropping the committed table uses the pooled one.
+    assert timing['round_trips'] == { 'execute': 3, 'fetchall': 1, 'commit': 1, 'rollback': 1 }
+    assert timing['setUp'] >= 0 and timing['body'] >= 0 and timing['tearDown'] > 0
+    assert timing['setUp'] + timing['body'] + timing['tearDown'] == pytest.approx(timing['total'], abs=1e-5)
+    assert os.path.isfile(timing['profile'])
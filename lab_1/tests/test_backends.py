@@ -0,0 +1,109 @@
+import sqlite3
+
+import pytest
+
+from backends import BACKENDS, Backend, ConnectionPool, Row, SqliteBackend, create_backend
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        Backend('test.db')
+
+    class Partial(Backend):
+        def connect(self, autocommit=False):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial('test.db')
+
+
+def test_create_backend(tmp_path):
+    filename = str(tmp_path / 'test.db')
+    backend = create_backend('sqlite', filename)
+    assert isinstance(backend, SqliteBackend) and backend.name == 'sqlite'
+    assert sorted(BACKENDS) == [ 'odbc', 'sqlite' ]
+    with pytest.raises(ValueError, match='unknown backend'):
+        create_backend('oracle', filename)
+
+
+def test_create_odbc_backend_without_pyodbc(tmp_path):
+    try:
+        import pyodbc  # noqa: F401
+    except ImportError:
+        with pytest.raises(ImportError):
+            create_backend('odbc', str(tmp_path / 'test.accdb'))
+    else:
+        backend = create_backend('odbc', str(tmp_path / 'test.accdb'))
+        assert 'Microsoft Access Driver (*.mdb, *.accdb)' in backend.connection_string
+
+
+def test_sqlite_types_and_info(backend):
+    assert backend.sqltype('memo') == 'text'
+    assert backend.sqltype('image') == 'blob'
+    assert backend.sqltype('int') == 'int'
+    assert not backend.supports('datetime')
+    assert backend.getinfo(None, 'SQL_DBMS_NAME') == 'SQLite'
+    assert backend.data_sources() == { 'test.db': 'SQLite %s' % sqlite3.sqlite_version }
+
+
+def test_sqlite_cursor_and_rows(backend):
+    cnxn = backend.connect()
+    cursor = cnxn.cursor()
+    cursor.execute('create table t1(a int, b %s)' % backend.sqltype('memo'))
+    # Parameters are passed either one per marker or as a single sequence, as in pyodbc.
+    cursor.execute('insert into t1 values(?, ?)', 1, '0')
+    cursor.execute('insert into t1 values(?, ?)', (2, 'x'))
+    rows = cursor.execute('select a, b from t1 order by a').fetchall()
+    assert rows == [ (1, '0'), (2, 'x') ]
+    row = rows[0]
+    assert isinstance(row, Row) and row[:] is row and row[1:] == ('0',)
+    assert [ column[0] for column in row.cursor_description ] == [ 'a', 'b' ]
+    cnxn.close()
+
+
+def test_sqlite_transactions(backend):
+    cnxn = backend.connect()
+    assert not cnxn.autocommit
+    backend.begin(cnxn)
+    cnxn.execute('create table t1(a int)')
+    assert backend.tables(cnxn) == set([ 't1' ])
+    # DDL runs in the transaction begin opened, so a rollback undoes it.
+    cnxn.rollback()
+    assert backend.tables(cnxn) == set()
+    cnxn.autocommit = True
+    assert cnxn.autocommit
+    cnxn.execute('create table t2(a int)')
+    cnxn.close()
+    cnxn = backend.connect(autocommit=True)
+    assert backend.tables(cnxn) == set([ 't2' ])
+    cnxn.close()
+
+
+def test_snapshot_restore(backend):
+    cnxn = backend.connect(autocommit=True)
+    cnxn.execute('create table t1(a int)')
+    cnxn.close()
+    template = backend.snapshot()
+    cnxn = backend.connect(autocommit=True)
+    cnxn.execute('drop table t1')
+    cnxn.execute('create table t2(a int)')
+    cnxn.close()
+    backend.restore(template)
+    cnxn = backend.connect()
+    assert backend.tables(cnxn) == set([ 't1' ])
+    cnxn.close()
+
+
+def test_connection_pool(backend):
+    pool = ConnectionPool(backend)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first and pool.opened == 1
+    second = pool.acquire()
+    assert second is not first and pool.opened == 2
+    pool.release(first)
+    pool.discard(second)
+    pool.discard(second)
+    pool.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        first.execute('select 1')
@@ -0,0 +1,209 @@
+"""
+Асинхронная пакетная валидация множества файлов вариантов.
+
+Файлы читаются конкурентно кусками по chunk_rows строк (чтение вынесено в потоки через asyncio.to_thread),
+куски проверяются в общем ограниченном пуле процессов. Число кусков в работе ограничено семафором:
+если пул не успевает, чтение приостанавливается (backpressure), и память не растет.
+Как только проверены все куски файла, его result.json записывается через serialize_result,
+не дожидаясь остальных файлов. Куски большого файла проверяются параллельно, поэтому общее время
+определяется самым тяжелым файлом, а не суммой по всем.
+
+Ошибка в одном файле (например, невалидный utf-8) не прерывает пакет: она попадает в сводку этого файла.
+Файлы без номера варианта в имени и файлы с повторяющимся номером не проверяются, чтобы результаты
+не перезаписывали друг друга.
+"""
+
+import argparse
+import asyncio
+import csv
+import glob
+import io
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from checksum import calculate_checksum, serialize_result
+from patterns import row_validator
+from rowset import RowSet
+from validation import DELIMITER, ENCODING, validate_rows
+
+DEFAULT_CHUNK_ROWS = 50000
+
+
+@lru_cache(maxsize=64)
+def _cached_validator(field_types: Tuple[str, ...]):
+    return row_validator(field_types)
+
+
+def _validate_chunk(data: bytes, field_types: Tuple[str, ...], encoding: str, delimiter: str) -> RowSet:
+    """
+    Проверяет кусок строк в дочернем процессе.
+
+    :return: локальные номера невалидных строк куска
+    """
+    reader = csv.reader(io.StringIO(data.decode(encoding), newline=""), delimiter=delimiter)
+    return validate_rows(reader, _cached_validator(field_types))
+
+
+def _read_chunk(file, chunk_rows: int) -> Tuple[bytes, int]:
+    lines = []
+    for _ in range(chunk_rows):
+        line = file.readline()
+        if not line:
+            break
+        lines.append(line)
+    return b"".join(lines), len(lines)
+
+
+def variant_of(path: str) -> Optional[int]:
+    """
+    :param path: путь к файлу варианта, например data/42.csv или variant_42.csv
+    :return: номер варианта - последнее число в имени файла, либо None
+    """
+    numbers = re.findall(r"\d+", os.path.splitext(os.path.basename(path))[0])
+    return int(numbers[-1]) if numbers else None
+
+
+def discover(root: str, pattern: str = "*.csv") -> List[str]:
+    """
+    :param root: каталог с файлами вариантов
+    :param pattern: маска имен файлов
+    :return: отсортированный список найденных файлов (рекурсивно)
+    """
+    return sorted(glob.glob(os.path.join(root, "**", pattern), recursive=True))
+
+
+async def validate_file(path: str, executor: ProcessPoolExecutor, pending: asyncio.Semaphore, output_dir: str,
+                        chunk_rows: int = DEFAULT_CHUNK_ROWS, encoding: str = ENCODING,
+                        delimiter: str = DELIMITER) -> Dict[str, object]:
+    """
+    Валидирует один файл и записывает его result.json в output_dir/<вариант>/.
+
+    :param path: путь к csv-файлу
+    :param executor: общий пул процессов
+    :param pending: семафор, ограничивающий число кусков в работе
+    :param output_dir: каталог для результатов
+    :param chunk_rows: число строк в куске
+    :param encoding: кодировка файла
+    :param delimiter: разделитель столбцов
+    :return: сводка по файлу
+    :raises ValueError: если в имени файла нет номера варианта
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    variant = variant_of(path)
+    if variant is None:
+        raise ValueError("в имени файла нет номера варианта")
+    tasks: List[Tuple[int, asyncio.Future]] = []
+    rows = 0
+    with open(path, "rb") as file:
+        header = await asyncio.to_thread(file.readline)
+        field_types = tuple(next(csv.reader([header.decode(encoding)], delimiter=delimiter), []))
+        while True:
+            await pending.acquire()
+            try:
+                data, count = await asyncio.to_thread(_read_chunk, file, chunk_rows)
+            except BaseException:
+                pending.release()
+                raise
+            if not count:
+                pending.release()
+                break
+            future = loop.run_in_executor(executor, _validate_chunk, data, field_types, encoding, delimiter)
+            future.add_done_callback(lambda _: pending.release())
+            tasks.append((rows, future))
+            rows += count
+
+    # Дожидаемся всех кусков, даже если какой-то упал, чтобы их ошибки не остались необработанными.
+    chunks = await asyncio.gather(*(future for _, future in tasks), return_exceptions=True)
+    invalid = RowSet(size_hint=rows)
+    for (offset, _), chunk in zip(tasks, chunks):
+        if isinstance(chunk, BaseException):
+            raise chunk
+        invalid.update(offset + row_number for row_number in chunk)
+    checksum = calculate_checksum(invalid)
+    target_dir = os.path.join(output_dir, str(variant))
+    os.makedirs(target_dir, exist_ok=True)
+    await asyncio.to_thread(serialize_result, variant, checksum, 1, os.path.join(target_dir, "result.json"))
+    return {
+        "path": path,
+        "variant": variant,
+        "rows": rows,
+        "invalid_rows": len(invalid),
+        "checksum": checksum,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+async def run_batch(paths: Sequence[str], output_dir: str, workers: Optional[int] = None,
+                    max_pending: Optional[int] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> List[Dict[str, object]]:
+    """
+    Валидирует все файлы конкурентно.
+
+    :param paths: пути к csv-файлам
+    :param output_dir: каталог для результатов
+    :param workers: число процессов, по умолчанию os.cpu_count()
+    :param max_pending: максимум кусков в работе, по умолчанию удвоенное число процессов
+    :param chunk_rows: число строк в куске
+    :return: сводки по файлам в порядке paths; у непроверенных файлов вместо результата поле error
+    """
+    by_variant: Dict[int, List[str]] = {}
+    for path in paths:
+        by_variant.setdefault(variant_of(path), []).append(path)
+    summaries: List[Optional[Dict[str, object]]] = [None] * len(paths)
+    accepted = []
+    for index, path in enumerate(paths):
+        variant = variant_of(path)
+        duplicates = by_variant[variant]
+        if variant is not None and len(duplicates) > 1:
+            summaries[index] = {"path": path, "variant": variant,
+                                "error": "вариант %d у нескольких файлов: %s" % (variant, ", ".join(duplicates))}
+        else:
+            accepted.append(index)
+
+    workers = workers or os.cpu_count() or 1
+    pending = asyncio.Semaphore(max_pending or 2 * workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = await asyncio.gather(*(validate_file(paths[index], executor, pending, output_dir, chunk_rows)
+                                         for index in accepted), return_exceptions=True)
+    for index, result in zip(accepted, results):
+        if isinstance(result, Exception):
+            result = {"path": paths[index], "variant": variant_of(paths[index]),
+                      "error": "%s: %s" % (type(result).__name__, result)}
+        elif isinstance(result, BaseException):
+            raise result
+        summaries[index] = result
+    return summaries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пакетная валидация файлов вариантов лабораторной 3")
+    parser.add_argument("root", help="каталог с csv-файлами вариантов")
+    parser.add_argument("-o", "--output", default="results", help="каталог для result.json по вариантам")
+    parser.add_argument("--pattern", default="*.csv", help="маска имен файлов")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="число процессов")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="строк в одном куске")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summaries = asyncio.run(run_batch(discover(args.root, args.pattern), args.output, args.workers,
+                                      chunk_rows=args.chunk_rows))
+    failed = 0
+    for summary in summaries:
+        if "error" in summary:
+            failed += 1
+            print("%-40s variant=%-6s error: %s" % (summary["path"], summary["variant"], summary["error"]))
+            continue
+        print("%-40s variant=%-6s invalid=%-8d %s %.2fs" % (summary["path"], summary["variant"],
+                                                            summary["invalid_rows"], summary["checksum"],
+                                                            summary["seconds"]))
+    print("files: %d, failed: %d, wall time: %.2fs" % (len(summaries), failed, time.perf_counter() - started))
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Бенчмарк движков валидации лабораторной на синтетических данных из generator.
+
+Каждый движок запускается в отдельном процессе, чтобы пиковое потребление памяти (RSS) не смешивалось.
+Для каждого движка измеряются строки в секунду (по лучшему из нескольких прогонов), пиковый RSS
+и время calculate_checksum, результат сохраняется в json, чтобы отслеживать регрессии между версиями.
+Кроме того проверяется, что все движки нашли одни и те же невалидные строки (совпадают контрольные суммы)
+и что ускоренные движки из NOT_SLOWER_THAN не медленнее своего эталона.
+Упавший движок не прерывает сравнение остальных: в отчет записывается его ошибка.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from checksum import calculate_checksum
+from columnar import validate_columnar
+from generator import generate_csv
+from mmap_reader import validate_mmap
+from patterns import row_validator
+from semantic import semantic_row_validator
+from sharded import validate_sharded
+from validation import read_header, validate_csv
+from verdict_cache import cached_row_validator
+
+
+ENGINES: Dict[str, Callable] = {
+    "rows": lambda path, types: validate_csv(path, row_validator(types, fused=False)),
+    "fused": lambda path, types: validate_csv(path, row_validator(types)),
+    "cached": lambda path, types: validate_csv(path, cached_row_validator(types)),
+    "semantic": lambda path, types: validate_csv(path, semantic_row_validator(types)),
+    "mmap": lambda path, types: validate_mmap(path, types),
+    "sharded": lambda path, types: validate_sharded(path, row_validator(types)),
+    "columnar": validate_columnar,
+}
+
+# Движок, с контрольной суммой которого сверяются остальные; если его нет в отчете, берется первый отработавший.
+REFERENCE_ENGINE = "rows"
+
+# Движок -> движок, медленнее которого он быть не должен.
+NOT_SLOWER_THAN: Dict[str, str] = {
+    "columnar": "rows",
+}
+# Допуск на шум замеров: лучшее время движка может превышать время эталона не больше чем на эту долю.
+# На одном общем ядре лучшие из пяти прогонов одного и того же движка расходятся до ~20%.
+SLOWDOWN_TOLERANCE = 0.25
+
+
+def _peak_rss_kib() -> Optional[int]:
+    """Пиковый RSS текущего процесса и его дочерних процессов в КиБ (на Linux ru_maxrss уже в КиБ)."""
+    if resource is None:
+        return None
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1024 if sys.platform == "darwin" else 1
+    return max(own, children) // scale
+
+
+def _run_engine(name: str, path: str, repeat: int) -> Dict[str, object]:
+    """
+    Замеряет один движок. Выполняется в отдельном процессе.
+
+    Движок прогоняется repeat раз и берется лучшее время, чтобы первый прогон с ленивыми импортами
+    и прогревом кешей (у pandas он заметен) не решал исход сравнения.
+    """
+    field_types = read_header(path)
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        invalid = ENGINES[name](path, field_types)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    validated = time.perf_counter()
+    checksum = calculate_checksum(invalid)
+    finished = time.perf_counter()
+    return {
+        "validate_seconds": round(best, 4),
+        "checksum_seconds": round(finished - validated, 4),
+        "invalid_rows": len(invalid),
+        "checksum": checksum,
+        "peak_rss_kib": _peak_rss_kib(),
+    }
+
+
+def run_benchmark(path: str, rows: int, engines: List[str], repeat: int = 5) -> Dict[str, object]:
+    """
+    Прогоняет движки на одном файле.
+
+    :param path: путь к csv-файлу
+    :param rows: число строк данных в файле
+    :param engines: имена движков из ENGINES
+    :param repeat: сколько раз прогонять каждый движок
+    :return: словарь с окружением и метриками по каждому движку
+    """
+    if repeat <= 0:
+        raise ValueError("repeat должен быть положительным")
+    results: Dict[str, object] = {}
+    for name in engines:
+        try:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                metrics = executor.submit(_run_engine, name, path, repeat).result()
+        except ImportError as error:
+            results[name] = {"skipped": str(error)}
+            continue
+        except Exception as error:
+            results[name] = {"error": "%s: %s" % (type(error).__name__, error)}
+            continue
+        seconds = metrics["validate_seconds"]
+        metrics["rows_per_second"] = round(rows / seconds) if seconds else None
+        results[name] = metrics
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "file": os.path.basename(path),
+        "file_bytes": os.path.getsize(path),
+        "rows": rows,
+        "repeat": repeat,
+        "engines": results,
+    }
+
+
+def _completed(metrics: Optional[Dict[str, object]]) -> bool:
+    """Отработал ли движок: он есть в отчете, не пропущен и не упал."""
+    return bool(metrics) and "skipped" not in metrics and "error" not in metrics
+
+
+def find_mismatches(report: Dict[str, object]) -> List[str]:
+    """
+    Сверяет контрольные суммы движков отчета с эталонным REFERENCE_ENGINE. Пропущенные и упавшие движки не сравниваются.
+
+    :param report: результат run_benchmark
+    :return: описания расхождений, пустой список - все движки нашли одни и те же строки
+    """
+    engines = {name: metrics for name, metrics in report["engines"].items() if _completed(metrics)}
+    if not engines:
+        return []
+    reference = REFERENCE_ENGINE if REFERENCE_ENGINE in engines else next(iter(engines))
+    expected = engines[reference]
+    return ["%s расходится с %s: %s невалидных строк против %s" % (
+                name, reference, metrics["invalid_rows"], expected["invalid_rows"])
+            for name, metrics in engines.items() if metrics["checksum"] != expected["checksum"]]
+
+
+def find_slowdowns(report: Dict[str, object]) -> List[str]:
+    """
+    Сверяет движки отчета с эталонами из NOT_SLOWER_THAN. Пропущенные и упавшие движки не сравниваются.
+
+    :param report: результат run_benchmark
+    :return: описания нарушений, пустой список - все в порядке
+    """
+    engines = report["engines"]
+    slowdowns = []
+    for name, baseline in NOT_SLOWER_THAN.items():
+        metrics, reference = engines.get(name), engines.get(baseline)
+        if not _completed(metrics) or not _completed(reference):
+            continue
+        if metrics["validate_seconds"] > reference["validate_seconds"] * (1 + SLOWDOWN_TOLERANCE):
+            slowdowns.append("%s медленнее %s: %s с против %s с" % (
+                name, baseline, metrics["validate_seconds"], reference["validate_seconds"]))
+    return slowdowns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк движков валидации лабораторной 3")
+    parser.add_argument("path", help="csv-файл; если его нет, он будет сгенерирован")
+    parser.add_argument("-n", "--rows", type=int, default=10000, help="число строк при генерации")
+    parser.add_argument("--seed", type=int, default=0, help="зерно генератора")
+    parser.add_argument("--invalid-rate", type=float, default=0.01, help="доля искаженных ячеек в столбце")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="движки через запятую")
+    parser.add_argument("--repeat", type=int, default=5, help="прогонов каждого движка, берется лучший")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="куда сохранить результаты")
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        with open(args.path, "rb") as file:
+            rows = sum(1 for _ in file) - 1
+    else:
+        generate_csv(args.path, args.rows, invalid_rate=args.invalid_rate, seed=args.seed)
+        rows = args.rows
+
+    report = run_benchmark(args.path, rows, args.engines.split(","), args.repeat)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+
+    print("%-10s %12s %12s %12s %14s" % ("engine", "rows/s", "validate, s", "checksum, s", "peak RSS, KiB"))
+    for name, metrics in report["engines"].items():
+        if "skipped" in metrics:
+            print("%-10s skipped: %s" % (name, metrics["skipped"]))
+            continue
+        if "error" in metrics:
+            print("%-10s error: %s" % (name, metrics["error"]))
+            continue
+        print("%-10s %12s %12s %12s %14s" % (name, metrics["rows_per_second"], metrics["validate_seconds"],
+                                             metrics["checksum_seconds"], metrics["peak_rss_kib"]))
+
+    errors = [name for name, metrics in report["engines"].items() if "error" in metrics]
+    mismatches = find_mismatches(report)
+    for mismatch in mismatches:
+        print("MISMATCH: %s" % mismatch)
+    slowdowns = find_slowdowns(report)
+    for slowdown in slowdowns:
+        print("SLOWDOWN: %s" % slowdown)
+    if errors or mismatches or slowdowns:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
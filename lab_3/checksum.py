@@ -1,13 +1,20 @@
+import os
 import json
+import heapq
+import struct
 import hashlib
-from typing import List
+import tempfile
+import threading
+from array import array
+from itertools import islice
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 """
 В этом модуле обитают функции, необходимые для автоматизированной проверки результатов ваших трудов.
 """
 
 
-def calculate_checksum(row_numbers: List[int]) -> str:
+def calculate_checksum(row_numbers: Union[List[int], Iterable[int]]) -> str:
     """
     Вычисляет md5 хеш от списка целочисленных значений.
 
@@ -19,26 +26,317 @@ def calculate_checksum(row_numbers: List[int]) -> str:
     Хотя что-то мне подсказывает, что обязательно найдется человек, у которого с этим возникнут проблемы.
     Которому я отвечу, что все написано в докстринге ¯\_(ツ)_/¯
 
+    Вместо списка можно передать RowSet (или любую коллекцию с атрибутом sorted_unique = True): она уже
+    упорядочена, поэтому хеш считается потоково, без сортировки и копирования. Список сортируется на месте,
+    остальные коллекции (кортежи, множества, генераторы) - в новый список.
+
     :param row_numbers: список целочисленных номеров строк csv-файла, на которых были найдены ошибки валидации
     :return: md5 хеш для проверки через github action
     """
-    row_numbers.sort()
+    if _is_sorted_unique(row_numbers):
+        hasher = hashlib.md5()
+        _update_sorted_json(hasher, row_numbers, 1 << 14)
+        return hasher.hexdigest()
+    if isinstance(row_numbers, list):
+        row_numbers.sort()
+    else:
+        row_numbers = sorted(row_numbers)
     return hashlib.md5(json.dumps(row_numbers).encode('utf-8')).hexdigest()
 
 
-def serialize_result(variant: int, checksum: str) -> None:
+def _is_sorted_unique(row_numbers) -> bool:
+    """
+    Коллекции, которые итерируются по возрастанию без повторов (например, rowset.RowSet), сообщают об этом
+    атрибутом sorted_unique. Модуль не импортирует rowset, чтобы его можно было скопировать и использовать отдельно.
+    """
+    return not isinstance(row_numbers, list) and getattr(row_numbers, "sorted_unique", False) is True
+
+
+def _update_sorted_json(hasher, row_numbers: Iterable[int], chunk_size: int) -> None:
+    """
+    Скармливает хешеру json-представление уже отсортированной последовательности чисел порциями.
+
+    Результат побайтово совпадает с json.dumps(list(row_numbers)), но сам список целиком в памяти не строится.
+
+    :param hasher: объект из hashlib, которому передаются байты
+    :param row_numbers: отсортированная последовательность номеров строк
+    :param chunk_size: сколько чисел кодировать за одно обращение к хешеру
+    """
+    iterator = iter(row_numbers)
+    separator = ""
+    hasher.update(b"[")
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        hasher.update((separator + ", ".join(map(str, chunk))).encode("utf-8"))
+        separator = ", "
+    hasher.update(b"]")
+
+
+class ChecksumAccumulator:
+    """
+    Потоковый аналог calculate_checksum для очень больших наборов номеров строк.
+
+    Номера можно добавлять по одному или пачками, в любом порядке и из нескольких потоков.
+    В памяти держится не более run_size чисел: заполненный буфер сортируется и сбрасывается
+    во временный файл, а при подсчете хеша отсортированные куски сливаются через heapq.merge.
+    Дубликаты сохраняются, поэтому результат всегда совпадает с calculate_checksum от того же набора.
+    """
+
+    def __init__(self, run_size: int = 1 << 20, chunk_size: int = 1 << 14) -> None:
+        """
+        :param run_size: максимальное число номеров, хранимых в памяти до сброса на диск
+        :param chunk_size: размер порции при кодировании json и чтении кусков с диска
+        """
+        if run_size <= 0 or chunk_size <= 0:
+            raise ValueError("run_size и chunk_size должны быть положительными")
+        self._run_size = run_size
+        self._chunk_size = chunk_size
+        self._buffer = array("q")
+        self._runs: List[BinaryIO] = []
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> "ChecksumAccumulator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add(self, row_number: int) -> None:
+        """
+        Добавляет один номер строки.
+
+        :param row_number: номер невалидной строки (нумерация с 0, см. calculate_checksum)
+        """
+        with self._lock:
+            self._buffer.append(row_number)
+            self._count += 1
+            if len(self._buffer) >= self._run_size:
+                self._spill()
+
+    def update(self, row_numbers: Iterable[int]) -> None:
+        """
+        Добавляет пачку номеров строк. Переданная коллекция не изменяется.
+
+        :param row_numbers: произвольная итерируемая последовательность номеров
+        """
+        iterator = iter(row_numbers)
+        while True:
+            chunk = array("q", islice(iterator, self._chunk_size))
+            if not chunk:
+                break
+            with self._lock:
+                self._buffer.extend(chunk)
+                self._count += len(chunk)
+                if len(self._buffer) >= self._run_size:
+                    self._spill()
+
+    def merge(self, other: "ChecksumAccumulator") -> None:
+        """
+        Вливает в аккумулятор номера, собранные другим аккумулятором (например, другим воркером).
+
+        :param other: аккумулятор-источник, он остается без изменений
+        """
+        self.update(other._iter_sorted())
+
+    def hexdigest(self) -> str:
+        """
+        Вычисляет md5 тем же способом, что и calculate_checksum. Может вызываться повторно.
+
+        :return: md5 хеш для проверки через github action
+        """
+        hasher = hashlib.md5()
+        with self._lock:
+            _update_sorted_json(hasher, self._iter_sorted(), self._chunk_size)
+        return hasher.hexdigest()
+
+    def close(self) -> None:
+        """Удаляет временные файлы с отсортированными кусками."""
+        with self._lock:
+            for run in self._runs:
+                run.close()
+            self._runs = []
+            self._buffer = array("q")
+            self._count = 0
+
+    def _spill(self) -> None:
+        run = tempfile.TemporaryFile()
+        array("q", sorted(self._buffer)).tofile(run)
+        self._runs.append(run)
+        self._buffer = array("q")
+
+    def _read_run(self, run: BinaryIO) -> Iterator[int]:
+        run.seek(0)
+        item_size = self._buffer.itemsize
+        while True:
+            data = run.read(self._chunk_size * item_size)
+            if not data:
+                break
+            chunk = array("q")
+            chunk.frombytes(data)
+            yield from chunk
+
+    def _iter_sorted(self) -> Iterator[int]:
+        buffered = sorted(self._buffer)
+        return heapq.merge(buffered, *(self._read_run(run) for run in self._runs))
+
+
+CHECKSUM_V2_BLOCK_ROWS = 1 << 16
+_V2_PREFIX = b"prog-instruments-labs/lab_3/checksum/v2"
+
+
+class MergeableChecksum:
+    """
+    Контрольная сумма версии 2, которую можно собирать по частям.
+
+    Множество номеров строк кодируется диапазонами [начало, конец) и делится на блоки по CHECKSUM_V2_BLOCK_ROWS строк.
+    От диапазонов каждого непустого блока считается blake2b, итоговая сумма - blake2b от хешей блоков
+    в порядке их номеров. Поэтому куски, посчитанные разными воркерами, объединяются через merge без общей
+    сортировки всех номеров: сливаются только диапазоны пограничных блоков.
+
+    В отличие от версии 1, повторы номеров не учитываются: сумма зависит только от множества строк.
+    """
+
+    def __init__(self) -> None:
+        self._ranges: Dict[int, List[Tuple[int, int]]] = {}
+        self._sealed: Dict[int, bytes] = {}
+
+    def add_range(self, start: int, end: int) -> None:
+        """
+        Добавляет диапазон номеров строк [start, end).
+
+        :param start: первый номер диапазона
+        :param end: номер, следующий за последним
+        """
+        if start < 0 or end < start:
+            raise ValueError("некорректный диапазон: [%d, %d)" % (start, end))
+        while start < end:
+            block = start // CHECKSUM_V2_BLOCK_ROWS
+            if block in self._sealed:
+                raise ValueError("блок %d уже закрыт" % block)
+            block_end = min(end, (block + 1) * CHECKSUM_V2_BLOCK_ROWS)
+            self._ranges.setdefault(block, []).append((start, block_end))
+            start = block_end
+
+    def update(self, row_numbers: Iterable[int]) -> None:
+        """
+        Добавляет номера строк, по возможности упорядоченные: соседние номера склеиваются в диапазоны.
+
+        :param row_numbers: номера строк
+        """
+        start = end = None
+        for row_number in row_numbers:
+            if row_number == end:
+                end += 1
+                continue
+            if start is not None:
+                self.add_range(start, end)
+            start, end = row_number, row_number + 1
+        if start is not None:
+            self.add_range(start, end)
+
+    def seal(self, below: int, above: int = 0) -> None:
+        """
+        Закрывает блоки, целиком лежащие в [above, below): их диапазоны заменяются хешем, и память освобождается.
+        Вызывать, только если строк из этих блоков больше не будет (в том числе от других воркеров),
+        например, для блоков, полностью попавших в кусок файла текущего воркера.
+
+        :param below: номер строки, до которого все данные уже переданы
+        :param above: первый номер строки, за который отвечает эта сумма
+        """
+        for block in [block for block in self._ranges
+                      if block * CHECKSUM_V2_BLOCK_ROWS >= above and (block + 1) * CHECKSUM_V2_BLOCK_ROWS <= below]:
+            self._sealed[block] = self._block_digest(block, self._ranges.pop(block))
+
+    def merge(self, other: "MergeableChecksum") -> None:
+        """
+        Вливает сумму, посчитанную по другому куску строк.
+
+        :param other: сумма-источник; ее закрытые блоки не должны пересекаться с блоками этой суммы
+        """
+        for block, digest in other._sealed.items():
+            if block in self._sealed or block in self._ranges:
+                raise ValueError("блок %d присутствует в обеих суммах" % block)
+            self._sealed[block] = digest
+        for block, ranges in other._ranges.items():
+            if block in self._sealed:
+                raise ValueError("блок %d уже закрыт" % block)
+            self._ranges.setdefault(block, []).extend(ranges)
+
+    @staticmethod
+    def _block_digest(block: int, ranges: List[Tuple[int, int]]) -> bytes:
+        base = block * CHECKSUM_V2_BLOCK_ROWS
+        hasher = hashlib.blake2b(struct.pack("<Q", block), digest_size=32)
+        current_start = current_end = None
+        for start, end in sorted(ranges):
+            if current_end is not None and start <= current_end:
+                current_end = max(current_end, end)
+                continue
+            if current_end is not None:
+                hasher.update(struct.pack("<II", current_start - base, current_end - base))
+            current_start, current_end = start, end
+        if current_end is not None:
+            hasher.update(struct.pack("<II", current_start - base, current_end - base))
+        return hasher.digest()
+
+    def hexdigest(self) -> str:
+        """
+        :return: контрольная сумма версии 2 (32 шестнадцатеричных символа)
+        """
+        digests = dict(self._sealed)
+        for block, ranges in self._ranges.items():
+            digests[block] = self._block_digest(block, ranges)
+        hasher = hashlib.blake2b(_V2_PREFIX, digest_size=16)
+        for block in sorted(digests):
+            hasher.update(struct.pack("<Q", block))
+            hasher.update(digests[block])
+        return hasher.hexdigest()
+
+
+def calculate_checksum_v2(row_numbers: Iterable[int]) -> str:
+    """
+    Вычисляет контрольную сумму версии 2, см. MergeableChecksum. Переданная коллекция не изменяется.
+
+    Github action проверяет только версию 1 (calculate_checksum), так что для сдачи лабы нужна именно она.
+
+    :param row_numbers: номера строк csv-файла с ошибками валидации (нумерация та же, что и в calculate_checksum)
+    :return: контрольная сумма версии 2
+    """
+    checksum = MergeableChecksum()
+    checksum.update(row_numbers if _is_sorted_unique(row_numbers) else sorted(set(row_numbers)))
+    return checksum.hexdigest()
+
+
+CHECKSUM_VERSIONS = {1: calculate_checksum, 2: calculate_checksum_v2}
+
+
+def serialize_result(variant: int, checksum: str, checksum_version: int = 1, path: Optional[str] = None) -> None:
     """
-    Метод для сериализации результатов лабораторной пишите сами.
-    Вам нужно заполнить данными - номером варианта и контрольной суммой - файл, лежащий в папке с лабораторной.
+    Метод для сериализации результатов лабораторной.
+    Заполняет данными - номером варианта и контрольной суммой - файл, лежащий в папке с лабораторной.
     Файл называется, очевидно, result.json.
 
     ВНИМАНИЕ, ВАЖНО! На json натравлен github action, который проверяет корректность выполнения лабораторной.
     Так что не перемещайте, не переименовывайте и не изменяйте его структуру, если планируете успешно сдать лабу.
+    Action читает только поля variant и checksum и понимает только контрольную сумму версии 1.
 
     :param variant: номер вашего варианта
-    :param checksum: контрольная сумма, вычисленная через calculate_checksum()
+    :param checksum: контрольная сумма, вычисленная через calculate_checksum() (или calculate_checksum_v2())
+    :param checksum_version: версия контрольной суммы, записывается в поле checksum_version
+    :param path: куда записать результат, по умолчанию - result.json рядом с этим модулем
     """
-    pass
+    if checksum_version not in CHECKSUM_VERSIONS:
+        raise ValueError("неизвестная версия контрольной суммы: %r" % checksum_version)
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "result.json")
+    result = {"variant": str(variant), "checksum": checksum, "checksum_version": checksum_version}
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(result, file, indent=2)
 
 
 if __name__ == "__main__":
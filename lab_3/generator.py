@@ -0,0 +1,146 @@
+"""
+Генератор синтетических csv-файлов в формате лабораторной для тестов производительности.
+
+Файл пишется потоково, поэтому размер ограничен только диском: от 10 тысяч до сотен миллионов строк.
+Генерация детерминирована: одинаковые seed и параметры дают побайтово одинаковый файл.
+Искаженные значения гарантированно не проходят регулярки из patterns.
+"""
+
+import argparse
+import csv
+import random
+import uuid
+from typing import Callable, Dict, List, Optional, Sequence
+
+from checksum import calculate_checksum
+from patterns import FIELD_PATTERNS, get_pattern
+from rowset import RowSet
+from validation import DELIMITER, ENCODING
+
+_STATUSES = ["200 OK", "201 Created", "204 No Content", "226 IM Used", "301 Moved Permanently", "304 Not Modified",
+             "400 Bad Request", "403 Forbidden", "404 Not Found", "418 I'm a teapot", "500 Internal Server Error",
+             "502 Bad Gateway", "503 Service Unavailable"]
+_OCCUPATIONS = ["Web-программист", "Слесарь-механик", "Ассистент менеджера по продажам", "Врач", "Бухгалтер",
+                "Инженер-конструктор", "Data Scientist", "Учитель", "Пилот", "Повар", "SMM-менеджер"]
+_BLOOD_TYPES = ["A+", "A−", "B+", "B−", "AB+", "AB−", "O+", "O−"]
+_LOCALES = ["ru", "en", "es-uy", "xh", "de-ch", "fr", "pt-br", "zh-cn", "kk", "uk"]
+_DOMAINS = ["protonmail.com", "gmail.com", "yandex.ru", "sub.domain.ru", "mail.ru"]
+_WORDS = ["operators", "relate", "finger", "hobby", "summit", "ocean", "vector", "nickel"]
+
+_JUNK = "abcXYZ019 .,;:-_/\\|!?#$%&*()[]{}<>@+=~`'ЖЯ"
+
+DISTORTIONS = ("replace", "insert", "truncate", "mixed")
+
+
+def _digits(rng: random.Random, count: int) -> str:
+    return "".join(rng.choice("0123456789") for _ in range(count))
+
+
+VALUE_GENERATORS: Dict[str, Callable[[random.Random], str]] = {
+    "email": lambda rng: "%s%s%d@%s" % (rng.choice(_WORDS), rng.choice(["", ".", "_"]), rng.randrange(10000),
+                                        rng.choice(_DOMAINS)),
+    "telephone": lambda rng: "+7-(%s)-%s-%s-%s" % (_digits(rng, 3), _digits(rng, 3), _digits(rng, 2), _digits(rng, 2)),
+    "http_status_message": lambda rng: rng.choice(_STATUSES),
+    "height": lambda rng: "%.2f" % rng.uniform(1.4, 2.1),
+    "snils": lambda rng: _digits(rng, 11),
+    "inn": lambda rng: _digits(rng, 12),
+    "passport": lambda rng: "%s %s %s" % (_digits(rng, 2), _digits(rng, 2), _digits(rng, 6)),
+    "identifier": lambda rng: "%s-%s/%s" % (_digits(rng, 2), _digits(rng, 2), _digits(rng, 2)),
+    "ip_v4": lambda rng: ".".join(str(rng.randrange(256)) for _ in range(4)),
+    "occupation": lambda rng: rng.choice(_OCCUPATIONS),
+    "longitude": lambda rng: "%.6f" % rng.uniform(-180, 180),
+    "latitude": lambda rng: "%.6f" % rng.uniform(-90, 90),
+    "hex_color": lambda rng: "#%06x" % rng.randrange(1 << 24),
+    "blood_type": lambda rng: rng.choice(_BLOOD_TYPES),
+    "isbn": lambda rng: "%s-%s-%s-%s-%s" % (_digits(rng, 3), _digits(rng, 1), _digits(rng, 5), _digits(rng, 3),
+                                            _digits(rng, 1)),
+    "issn": lambda rng: "%s-%s" % (_digits(rng, 4), _digits(rng, 4)),
+    "locale_code": lambda rng: rng.choice(_LOCALES),
+    "uuid": lambda rng: str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+    "time": lambda rng: "%02d:%02d:%02d.%06d" % (rng.randrange(24), rng.randrange(60), rng.randrange(60),
+                                                 rng.randrange(1000000)),
+    "date": lambda rng: "%04d-%02d-%02d" % (rng.randrange(1950, 2030), rng.randrange(1, 13), rng.randrange(1, 29)),
+}
+
+
+def distort(value: str, field_type: str, rng: random.Random, style: str = "mixed", attempts: int = 20) -> str:
+    """
+    Искажает значение так, чтобы оно перестало проходить регулярку своего типа.
+
+    :param value: исходное валидное значение
+    :param field_type: тип поля
+    :param rng: генератор случайных чисел
+    :param style: replace - замена символа, insert - вставка мусора, truncate - обрезка, mixed - случайный выбор
+    :param attempts: сколько раз пытаться, прежде чем вернуть пустую строку (она невалидна для всех типов)
+    :return: невалидное значение
+    """
+    if style not in DISTORTIONS:
+        raise ValueError("неизвестный способ искажения: %r, доступны: %s" % (style, ", ".join(DISTORTIONS)))
+    regex = get_pattern(field_type)
+    for _ in range(attempts):
+        current = rng.choice(DISTORTIONS[:-1]) if style == "mixed" else style
+        position = rng.randrange(len(value) + 1)
+        if current == "replace" and value:
+            position = min(position, len(value) - 1)
+            candidate = value[:position] + rng.choice(_JUNK) + value[position + 1:]
+        elif current == "truncate" and value:
+            candidate = value[:position] if position < len(value) else value[:-1]
+        else:
+            candidate = value[:position] + rng.choice(_JUNK) + value[position:]
+        if regex.fullmatch(candidate) is None:
+            return candidate
+    return ""
+
+
+def generate_csv(path: str, rows: int, field_types: Optional[Sequence[str]] = None, invalid_rate: float = 0.01,
+                 distortion: str = "mixed", seed: int = 0, encoding: str = ENCODING,
+                 delimiter: str = DELIMITER) -> RowSet:
+    """
+    Пишет синтетический csv-файл.
+
+    :param path: куда записать файл
+    :param rows: число строк данных
+    :param field_types: типы столбцов, по умолчанию - 10 случайных типов из README (выбор зависит от seed)
+    :param invalid_rate: доля искаженных ячеек в каждом столбце (в лабораторной это 0.01)
+    :param distortion: способ искажения, см. distort
+    :param seed: зерно генератора
+    :param encoding: кодировка файла
+    :param delimiter: разделитель столбцов
+    :return: эталонное множество номеров невалидных строк
+    """
+    rng = random.Random(seed)
+    types: List[str] = list(field_types) if field_types else rng.sample(sorted(FIELD_PATTERNS), 10)
+    generators = [VALUE_GENERATORS[field_type] for field_type in types]
+    invalid = RowSet(size_hint=rows)
+    with open(path, "w", encoding=encoding, newline="") as file:
+        writer = csv.writer(file, delimiter=delimiter, quoting=csv.QUOTE_ALL)
+        writer.writerow(types)
+        for row_number in range(rows):
+            row = []
+            for field_type, generate in zip(types, generators):
+                value = generate(rng)
+                if rng.random() < invalid_rate:
+                    value = distort(value, field_type, rng, distortion)
+                    invalid.add(row_number)
+                row.append(value)
+            writer.writerow(row)
+    return invalid
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Генератор синтетических csv-файлов для лабораторной 3")
+    parser.add_argument("path", help="куда записать csv-файл")
+    parser.add_argument("-n", "--rows", type=int, default=10000, help="число строк данных")
+    parser.add_argument("--types", help="типы столбцов через запятую, по умолчанию 10 случайных")
+    parser.add_argument("--invalid-rate", type=float, default=0.01, help="доля искаженных ячеек в столбце")
+    parser.add_argument("--distortion", choices=DISTORTIONS, default="mixed", help="способ искажения")
+    parser.add_argument("--seed", type=int, default=0, help="зерно генератора")
+    args = parser.parse_args()
+
+    field_types = args.types.split(",") if args.types else None
+    invalid = generate_csv(args.path, args.rows, field_types, args.invalid_rate, args.distortion, args.seed)
+    print("invalid rows: %d, checksum: %s" % (len(invalid), calculate_checksum(invalid)))
+
+
+if __name__ == "__main__":
+    main()
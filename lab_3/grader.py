@@ -0,0 +1,138 @@
+"""
+Локальная пакетная проверка result.json, аналогичная github action result_check.yml.
+
+Эталонные контрольные суммы загружаются один раз в словарь "вариант -> сумма", поэтому проверка
+одной работы - это поиск по словарю, а не перебор всего массива. Файлы result.json ищутся
+рекурсивно по дереву каталогов и проверяются параллельно, итог сохраняется в json-отчет.
+
+Вместо секрета CHECKSUMS используется локальный файл: либо в формате секрета (суммы через пробел
+или перевод строки, можно в скобках bash-массива), либо json - списком или словарем "вариант": "сумма".
+Как и в github action, вариант - это позиция элемента массива, в том числе заглушки вместо суммы,
+а номер варианта из result.json сравнивается с позицией как строка ("01" не совпадает с 1).
+"""
+
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+_VARIANT = re.compile(r"[1-9][0-9]*")
+
+
+def _split_bash_array(text: str) -> List[str]:
+    """
+    Элементы bash-массива в том порядке, в котором их перебирает ${array[*]}: скобки и кавычки отбрасываются,
+    элементы разделяются пробельными символами.
+    """
+    text = text.strip()
+    if text.startswith("(") and text.endswith(")"):
+        text = text[1:-1]
+    return [token.strip("'\"") for token in text.split()]
+
+
+def load_checksums(path: str) -> Dict[int, str]:
+    """
+    Строит индекс эталонных сумм. Варианты нумеруются с 1, суммы сравниваются без приведения регистра,
+    как в github action.
+
+    :param path: путь к файлу с эталонными суммами
+    :return: словарь "номер варианта -> контрольная сумма"
+    :raises ValueError: если ключ json-словаря не номер варианта
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        text = file.read()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if not isinstance(data, (dict, list)):
+        data = _split_bash_array(text)
+    if isinstance(data, dict):
+        for variant in data:
+            if not _VARIANT.fullmatch(variant):
+                raise ValueError("%s: %r не номер варианта (ожидается целое число от 1 без ведущих нулей)"
+                                 % (path, variant))
+        return {int(variant): str(checksum) for variant, checksum in data.items()}
+    return {variant: str(checksum) for variant, checksum in enumerate(data, 1)}
+
+
+def find_results(root: str, filename: str = "result.json") -> Iterator[str]:
+    """
+    :param root: корень дерева с работами
+    :param filename: имя файла с результатом
+    :return: пути ко всем найденным файлам с результатом
+    """
+    for directory, _, files in os.walk(root):
+        if filename in files:
+            yield os.path.join(directory, filename)
+
+
+def grade_file(path: str, checksums: Dict[int, str]) -> Dict[str, object]:
+    """
+    Проверяет один result.json.
+
+    :param path: путь к файлу
+    :param checksums: индекс эталонных сумм
+    :return: запись отчета со статусом correct, wrong, unknown_variant или invalid
+    """
+    entry: Dict[str, object] = {"path": path}
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            result = json.load(file)
+        variant = result["variant"]
+        checksum = str(result["checksum"])
+        if isinstance(variant, bool) or not isinstance(variant, (int, str)):
+            raise TypeError("variant должен быть числом или строкой, а не %r" % (variant,))
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        entry.update(status="invalid", error=str(error))
+        return entry
+    entry.update(variant=variant, checksum=checksum)
+    # github action сравнивает номер варианта с позицией в массиве как строки.
+    variant = str(variant)
+    expected: Optional[str] = checksums.get(int(variant)) if _VARIANT.fullmatch(variant) else None
+    if expected is None:
+        entry["status"] = "unknown_variant"
+    elif expected == checksum:
+        entry["status"] = "correct"
+    else:
+        entry.update(status="wrong", expected=expected)
+    return entry
+
+
+def grade_tree(root: str, checksums: Dict[int, str], workers: Optional[int] = None) -> Dict[str, object]:
+    """
+    Проверяет все result.json в дереве каталогов.
+
+    :param root: корень дерева с работами
+    :param checksums: индекс эталонных сумм
+    :param workers: число потоков чтения файлов
+    :return: отчет со сводкой по статусам и записями по каждому файлу
+    """
+    paths = sorted(find_results(root))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        entries: List[Dict[str, object]] = list(executor.map(lambda path: grade_file(path, checksums), paths))
+    summary: Dict[str, int] = {}
+    for entry in entries:
+        summary[entry["status"]] = summary.get(entry["status"], 0) + 1
+    return {"total": len(entries), "summary": summary, "results": entries}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пакетная проверка result.json лабораторной 3")
+    parser.add_argument("root", help="каталог, в котором рекурсивно ищутся result.json")
+    parser.add_argument("-c", "--checksums", required=True, help="файл с эталонными суммами")
+    parser.add_argument("-o", "--output", default="grading_report.json", help="куда сохранить отчет")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="число потоков")
+    args = parser.parse_args()
+
+    report = grade_tree(args.root, load_checksums(args.checksums), args.workers)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, ensure_ascii=False)
+    summary = ", ".join("%s: %d" % item for item in sorted(report["summary"].items()))
+    print("checked: %d, %s" % (report["total"], summary))
+
+
+if __name__ == "__main__":
+    main()
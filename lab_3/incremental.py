@@ -0,0 +1,148 @@
+"""
+Инкрементальная перепроверка больших csv-файлов с помощью индекса рядом с файлом (<имя>.idx).
+
+Строки данных делятся на блоки фиксированного размера. Для каждого блока в индексе хранятся
+байтовое смещение начала, хеш содержимого и локальные номера невалидных строк.
+При следующем запуске заново проверяются только блоки с изменившимся хешем и новые блоки,
+а результаты остальных берутся из индекса. Для файлов, которые в основном дописываются в конец,
+стоимость запуска пропорциональна объему изменений, а не размеру файла.
+"""
+
+import csv
+import hashlib
+import io
+import os
+import pickle
+from typing import List, Optional, Tuple
+
+from checksum import calculate_checksum
+from result_cache import atomic_write, ruleset_fingerprint
+from rowset import RowSet
+from validation import DELIMITER, ENCODING, validate_rows
+
+INDEX_FORMAT = 1
+DEFAULT_BLOCK_ROWS = 65536
+
+
+class _Block:
+    """Запись индекса об одном блоке строк."""
+
+    __slots__ = ("offset", "rows", "digest", "invalid")
+
+    def __init__(self, offset: int, rows: int, digest: bytes, invalid: RowSet) -> None:
+        self.offset = offset
+        self.rows = rows
+        self.digest = digest
+        self.invalid = invalid
+
+
+def index_path(path: str) -> str:
+    """
+    :param path: путь к csv-файлу
+    :return: путь к файлу индекса рядом с ним
+    """
+    return path + ".idx"
+
+
+def _read_blocks(file, block_rows: int):
+    """
+    Читает файл блоками по block_rows строк.
+
+    :return: итератор троек (смещение блока, байты блока, число строк)
+    """
+    offset = file.tell()
+    while True:
+        lines = []
+        for _ in range(block_rows):
+            line = file.readline()
+            if not line:
+                break
+            lines.append(line)
+        if not lines:
+            return
+        data = b"".join(lines)
+        yield offset, data, len(lines)
+        offset += len(data)
+
+
+def _load_index(path: str, fingerprint: str, block_rows: int) -> List[_Block]:
+    try:
+        with open(index_path(path), "rb") as file:
+            index = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return []
+    if (index.get("format"), index.get("ruleset"), index.get("block_rows")) != (INDEX_FORMAT, fingerprint, block_rows):
+        return []
+    return [_Block(*block) for block in index["blocks"]]
+
+
+def _save_index(path: str, fingerprint: str, block_rows: int, blocks: List[_Block]) -> None:
+    index = {
+        "format": INDEX_FORMAT,
+        "ruleset": fingerprint,
+        "block_rows": block_rows,
+        "blocks": [(block.offset, block.rows, block.digest, block.invalid) for block in blocks],
+    }
+    atomic_write(index_path(path), pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def validate_incremental(path: str, validator, block_rows: int = DEFAULT_BLOCK_ROWS, assume_append: bool = False,
+                         encoding: str = ENCODING, delimiter: str = DELIMITER) -> Tuple[RowSet, int]:
+    """
+    Валидирует файл, перепроверяя только изменившиеся и новые блоки, и обновляет индекс.
+
+    По умолчанию хешируются все блоки файла (это намного дешевле валидации). С assume_append=True
+    файл считается дописываемым: перечитывается только последний блок из индекса и все, что за ним,
+    так что стоимость запуска зависит только от объема дописанного. Правки в середине файла
+    в этом режиме не обнаруживаются.
+
+    Если изменились правила валидатора или размер блока, индекс строится заново.
+    Записи в кавычках с переводами строк внутри не поддерживаются: блоки режутся по строкам файла.
+
+    :param path: путь к csv-файлу
+    :param validator: валидатор строки
+    :param block_rows: число строк в блоке
+    :param assume_append: доверять блокам индекса перед последним, не перечитывая их
+    :param encoding: кодировка файла
+    :param delimiter: разделитель столбцов
+    :return: множество невалидных строк (глобальная нумерация) и число перепроверенных блоков
+    """
+    fingerprint = ruleset_fingerprint(validator)
+    known = _load_index(path, fingerprint, block_rows)
+    blocks: List[_Block] = []
+    revalidated = 0
+    with open(path, "rb") as file:
+        file.readline()
+        if assume_append and known and known[-1].offset <= os.path.getsize(path):
+            blocks = known[:-1]
+            file.seek(known[-1].offset)
+        for number, (offset, data, rows) in enumerate(_read_blocks(file, block_rows), len(blocks)):
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            previous: Optional[_Block] = known[number] if number < len(known) else None
+            if previous is not None and previous.digest == digest and previous.rows == rows:
+                previous.offset = offset
+                blocks.append(previous)
+                continue
+            reader = csv.reader(io.StringIO(data.decode(encoding), newline=""), delimiter=delimiter)
+            blocks.append(_Block(offset, rows, digest, validate_rows(reader, validator)))
+            revalidated += 1
+    if revalidated or len(blocks) != len(known):
+        _save_index(path, fingerprint, block_rows, blocks)
+
+    invalid = RowSet(size_hint=sum(block.rows for block in blocks))
+    first_row = 0
+    for block in blocks:
+        invalid |= block.invalid.shifted(first_row)
+        first_row += block.rows
+    return invalid, revalidated
+
+
+def checksum_incremental(path: str, validator, block_rows: int = DEFAULT_BLOCK_ROWS, **kwargs) -> str:
+    """
+    :param path: путь к csv-файлу
+    :param validator: валидатор строки
+    :param block_rows: число строк в блоке
+    :return: контрольная сумма, совпадающая с полным проходом
+    """
+    invalid, _ = validate_incremental(path, validator, block_rows, **kwargs)
+    return calculate_checksum(invalid)
@@ -0,0 +1,245 @@
+"""
+Валидация csv-файла на уровне байтов: файл отображается в память через mmap, по нему строится индекс
+начал строк, а предкомпилированные bytes-регулярки применяются прямо к отображению (через pos/endpos),
+без декодирования строк в str.
+
+До str декодируются только строки, не прошедшие быстрый байтовый путь: по ним выносится окончательный
+вердикт обычным построчным валидатором, а значения ячеек можно вывести в отчет.
+Поддерживается кодировка utf-8.
+"""
+
+import csv
+import mmap
+import re
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from patterns import FIELD_PATTERNS, row_validator
+from rowset import RowSet
+from validation import DELIMITER
+
+# Кириллица в utf-8: А-Я и а-п - это \xd0\x90-\xd0\xbf, р-я - \xd1\x80-\xd1\x8f, Ё - \xd0\x81, ё - \xd1\x91.
+_LETTER = rb"(?:[A-Za-z]|\xd0[\x81\x90-\xbf]|\xd1[\x80-\x8f\x91])"
+
+BYTES_FIELD_PATTERNS: Dict[str, bytes] = {
+    "occupation": _LETTER + rb"+(?:[ -]" + _LETTER + rb"+)*",
+    # Знак минус U+2212 в utf-8 занимает три байта.
+    "blood_type": rb"(?:AB|A|B|O)(?:\+|\xe2\x88\x92)",
+}
+
+
+def bytes_pattern(field_type: str) -> bytes:
+    """
+    :param field_type: название типа поля из README
+    :return: bytes-регулярка, которая на utf-8 представлении ячейки не мягче str-регулярки из реестра
+    """
+    if field_type in BYTES_FIELD_PATTERNS:
+        return BYTES_FIELD_PATTERNS[field_type]
+    pattern = FIELD_PATTERNS[field_type]
+    if not pattern.isascii():
+        raise ValueError("для типа %r нужна отдельная bytes-регулярка" % field_type)
+    return pattern.encode("ascii")
+
+
+def count_lines(buffer, chunk_size: int = 1 << 20) -> int:
+    """
+    Считает строки буфера так же, как их делит MmapCsv (последняя строка без перевода строки тоже считается),
+    через bytes.count по кускам, без построения индекса.
+
+    :param buffer: mmap или bytes
+    :param chunk_size: размер куска, копируемого из отображения за раз
+    :return: число строк вместе с заголовком
+    """
+    size = len(buffer)
+    lines = sum(buffer[start:start + chunk_size].count(b"\n") for start in range(0, size, chunk_size))
+    if size and buffer[size - 1:size] != b"\n":
+        lines += 1
+    return lines
+
+
+def iter_spans(buffer, position: int = 0) -> Iterator[Tuple[int, int]]:
+    """
+    Лениво перебирает строки буфера без индекса.
+
+    :param buffer: mmap или bytes
+    :param position: смещение начала первой строки
+    :return: итератор пар (начало, конец) строк без символов перевода строки
+    """
+    size = len(buffer)
+    find = buffer.find
+    while position < size:
+        newline = find(b"\n", position)
+        next_position = size if newline == -1 else newline + 1
+        end = size if newline == -1 else newline
+        if end > position and buffer[end - 1:end] == b"\r":
+            end -= 1
+        yield position, end
+        position = next_position
+
+
+def decode_line(buffer, start: int, end: int, encoding: str = "utf-8", delimiter: str = DELIMITER) -> List[str]:
+    """
+    Декодирует и разбирает одну строку буфера.
+
+    :return: значения ячеек
+    """
+    text = bytes(buffer[start:end]).decode(encoding)
+    return next(csv.reader([text], delimiter=delimiter), [])
+
+
+class MmapCsv:
+    """
+    Отображенный в память csv-файл с индексом смещений строк данных.
+
+    Индекс хранится в array("Q") - 8 байт на строку: только начала строк, конец строки - это начало
+    следующей без перевода строки. Сами строки в память не копируются.
+    """
+
+    def __init__(self, path: str, encoding: str = "utf-8", delimiter: str = DELIMITER) -> None:
+        """
+        :param path: путь к csv-файлу
+        :param encoding: кодировка, используемая только для заголовка и строк, требующих декодирования
+        :param delimiter: разделитель столбцов
+        """
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Пустой файл нельзя отобразить в память.
+            self._map = b""
+        # Начала строк данных и в конце - размер файла, поэтому строк данных на одну меньше, чем элементов.
+        self._starts = array("Q")
+        self._build_index()
+        header_end = self._line_end(0, self._starts[0])
+        self.header: List[str] = self.decode_row(0, header_end) if header_end else []
+
+    def __enter__(self) -> "MmapCsv":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._starts) - 1
+
+    def close(self) -> None:
+        """Закрывает отображение и файл."""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def _build_index(self) -> None:
+        data = self._map
+        size = len(data)
+        find = data.find
+        append = self._starts.append
+        # Первая строка - заголовок, строки данных начинаются после ее перевода строки.
+        newline = find(b"\n")
+        while newline != -1 and newline + 1 < size:
+            append(newline + 1)
+            newline = find(b"\n", newline + 1)
+        append(size)
+
+    def _line_end(self, start: int, next_start: int) -> int:
+        end = next_start
+        if end > start and self._map[end - 1] in b"\n":
+            end -= 1
+        if end > start and self._map[end - 1] in b"\r":
+            end -= 1
+        return end
+
+    @property
+    def buffer(self):
+        """Отображение файла, к которому можно применять bytes-регулярки с pos/endpos."""
+        return self._map
+
+    def span(self, row_number: int) -> Tuple[int, int]:
+        """
+        :param row_number: номер строки данных (с 0, без заголовка)
+        :return: смещения начала и конца строки без символов перевода строки
+        """
+        if row_number < 0:
+            row_number += len(self)
+        if not 0 <= row_number < len(self):
+            raise IndexError("номер строки вне диапазона")
+        start = self._starts[row_number]
+        return start, self._line_end(start, self._starts[row_number + 1])
+
+    def line(self, row_number: int) -> memoryview:
+        """
+        :param row_number: номер строки данных
+        :return: memoryview на байты строки без копирования
+        """
+        start, end = self.span(row_number)
+        return memoryview(self._map)[start:end]
+
+    def spans(self) -> Iterator[Tuple[int, int]]:
+        """Перебирает пары (начало, конец) всех строк данных."""
+        line_end = self._line_end
+        starts = iter(self._starts)
+        start = next(starts)
+        for next_start in starts:
+            yield start, line_end(start, next_start)
+            start = next_start
+
+    def decode_row(self, start: int, end: int) -> List[str]:
+        """
+        Декодирует и разбирает одну строку. Используется только для строк, требующих отчета.
+
+        :return: значения ячеек
+        """
+        return decode_line(self._map, start, end, self.encoding, self.delimiter)
+
+
+class BytesRowValidator:
+    """
+    Склеенная bytes-регулярка для строки целиком: ячейки в кавычках или без, через разделитель.
+
+    Совпадение - достаточное условие валидности строки. Строки без совпадения проверяются
+    str-валидатором из patterns, который и выносит окончательный вердикт.
+    """
+
+    def __init__(self, field_types: Sequence[str], delimiter: str = DELIMITER) -> None:
+        """
+        :param field_types: названия типов полей в порядке столбцов
+        :param delimiter: разделитель столбцов
+        """
+        cells = []
+        for field_type in field_types:
+            pattern = bytes_pattern(field_type)
+            cells.append(rb'(?:"(?:%s)"|(?:%s))' % (pattern, pattern))
+        self.field_types = list(field_types)
+        self.fused = re.compile(re.escape(delimiter.encode("ascii")).join(cells))
+        self.fallback = row_validator(field_types)
+
+    def match(self, buffer, start: int, end: int) -> bool:
+        """
+        :param buffer: объект с буферным протоколом (mmap, bytes)
+        :param start: начало строки в буфере
+        :param end: конец строки в буфере
+        :return: True, если строка целиком совпала с быстрой регуляркой
+        """
+        return self.fused.fullmatch(buffer, start, end) is not None
+
+
+def validate_mmap(path: str, field_types: Optional[Sequence[str]] = None, delimiter: str = DELIMITER) -> RowSet:
+    """
+    Валидирует файл без декодирования валидных строк.
+
+    :param path: путь к csv-файлу в utf-8
+    :param field_types: типы столбцов, по умолчанию берутся из заголовка файла
+    :param delimiter: разделитель столбцов
+    :return: множество номеров невалидных строк, как у validation.validate_csv
+    """
+    with MmapCsv(path, delimiter=delimiter) as table:
+        validator = BytesRowValidator(field_types or table.header, delimiter)
+        buffer = table.buffer
+        fused_match = validator.fused.fullmatch
+        fallback = validator.fallback
+        invalid = RowSet(size_hint=len(table))
+        for row_number, (start, end) in enumerate(table.spans()):
+            if fused_match(buffer, start, end) is None and not fallback(table.decode_row(start, end)):
+                invalid.add(row_number)
+        return invalid
@@ -0,0 +1,110 @@
+"""
+Реестр предкомпилированных регулярных выражений для всех 20 типов полей из README лабораторной
+и построчный валидатор, склеивающий регулярки столбцов в одно выражение.
+"""
+
+import re
+from itertools import compress
+from operator import not_, or_
+from typing import Dict, Iterator, Pattern, Sequence
+
+from validation import PatternRowValidator
+
+_OCTET = r"(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)"
+_LETTER = r"[A-Za-zА-ЯЁа-яё]"
+
+FIELD_PATTERNS: Dict[str, str] = {
+    "email": r"[A-Za-z0-9]+(?:[._][A-Za-z0-9]+)*@[A-Za-z0-9]+(?:\.[A-Za-z0-9]+)+",
+    "telephone": r"\+7-\(\d{3}\)-\d{3}-\d{2}-\d{2}",
+    "http_status_message": r"[1-5]\d{2} [A-Za-z][A-Za-z' -]*",
+    "height": r"[0-2]\.\d{2}",
+    "snils": r"\d{11}",
+    "inn": r"\d{12}",
+    "passport": r"\d{2} \d{2} \d{6}",
+    "identifier": r"\d{2}-\d{2}/\d{2}",
+    "ip_v4": r"(?:%s\.){3}%s" % (_OCTET, _OCTET),
+    "occupation": r"%s+(?:[ -]%s+)*" % (_LETTER, _LETTER),
+    "longitude": r"-?(?:180(?:\.0+)?|(?:1[0-7]\d|[1-9]?\d)(?:\.\d+)?)",
+    "latitude": r"-?(?:90(?:\.0+)?|[1-8]?\d(?:\.\d+)?)",
+    "hex_color": r"#[0-9a-fA-F]{6}",
+    "blood_type": "(?:AB|A|B|O)[+−]",
+    "isbn": r"(?:\d{3}-)?\d-\d{5}-\d{3}-\d",
+    "issn": r"\d{4}-\d{3}[\dX]",
+    "locale_code": r"[a-z]{2,3}(?:-[a-z0-9]{2,4})*",
+    "uuid": r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
+    "time": r"(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d\.\d{6}",
+    "date": r"\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12]\d|3[01])",
+}
+
+VALIDATORS: Dict[str, Pattern] = {name: re.compile(pattern) for name, pattern in FIELD_PATTERNS.items()}
+
+# Ширина регулярки среди пересекающихся типов: тип с большим числом принимает значения типов с меньшим.
+# height ⊂ latitude ⊂ longitude (по форме значений), locale_code ⊂ occupation, остальные типы не пересекаются.
+# По ней schema разрешает ничьи, когда выборка файла не различает типы.
+FIELD_BREADTH: Dict[str, int] = {name: 0 for name in FIELD_PATTERNS}
+FIELD_BREADTH.update({"latitude": 1, "longitude": 2, "occupation": 1})
+
+_SEPARATOR = "\x1f"
+
+
+def get_pattern(field_type: str) -> Pattern:
+    """
+    :param field_type: название типа поля из README, например "email" или "ip_v4"
+    :return: предкомпилированная регулярка для полного совпадения со значением ячейки
+    """
+    try:
+        return VALIDATORS[field_type]
+    except KeyError:
+        raise KeyError("неизвестный тип поля: %r, доступны: %s" % (field_type, ", ".join(FIELD_PATTERNS))) from None
+
+
+class FusedRowValidator(PatternRowValidator):
+    """
+    Проверяет всю строку одним вызовом fullmatch.
+
+    Ячейки склеиваются через управляющий символ \\x1f, а регулярки столбцов - в одно выражение с тем же разделителем.
+    Если склеенная строка подошла, строка валидна. Если нет, выполняется обычная поячеечная проверка:
+    она и выносит окончательный вердикт, и позволяет узнать, какие именно столбцы ошибочны.
+    Регулярки столбцов не должны допускать символ \\x1f (у регулярок из реестра это так).
+    """
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        """
+        :param patterns: регулярные выражения для столбцов в порядке их следования в файле
+        """
+        super().__init__(patterns)
+        self._fused = re.compile(_SEPARATOR.join("(?:%s)" % pattern for pattern in self.patterns))
+
+    def __call__(self, row: Sequence[str]) -> bool:
+        """
+        :param row: значения ячеек одной строки
+        :return: True, если строка валидна
+        """
+        if len(row) == len(self.patterns) and self._fused.fullmatch(_SEPARATOR.join(row)) is not None:
+            return True
+        return super().__call__(row)
+
+    def invalid_indices(self, rows: Sequence[Sequence[str]]) -> Iterator[int]:
+        """
+        Проверяет пачку строк. Склейка и быстрый путь идут через map, без вызова __call__ на каждую строку,
+        поячеечно проверяются только строки, не прошедшие склеенную регулярку.
+
+        :param rows: значения ячеек строк пачки
+        :return: индексы невалидных строк в rows по возрастанию
+        """
+        # Проверка ширины нужна и здесь: ячейка с \x1f внутри склеивается так же, как две соседние ячейки.
+        failed = map(not_, map(self._fused.fullmatch, map(_SEPARATOR.join, rows)))
+        suspects = compress(range(len(rows)), map(or_, map(len(self.patterns).__ne__, map(len, rows)), failed))
+        return (index for index in suspects if not PatternRowValidator.__call__(self, rows[index]))
+
+
+def row_validator(field_types: Sequence[str], fused: bool = True) -> PatternRowValidator:
+    """
+    Собирает валидатор строки по списку типов столбцов (обычно это заголовок csv-файла).
+
+    :param field_types: названия типов полей в порядке столбцов
+    :param fused: склеивать ли регулярки столбцов в одно выражение
+    :return: валидатор, пригодный для validation.validate_csv и sharded.validate_sharded
+    """
+    patterns = [get_pattern(field_type).pattern for field_type in field_types]
+    return FusedRowValidator(patterns) if fused else PatternRowValidator(patterns)
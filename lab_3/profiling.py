@@ -0,0 +1,271 @@
+"""
+Профилирование валидации по столбцам и защита от катастрофических откатов регулярок.
+
+ProfilingRowValidator проверяет каждую ячейку строки и для каждого столбца копит число вызовов,
+суммарное время, выборку задержек для p50/p99 и самые медленные значения.
+Для ячейки можно задать бюджет времени: по его истечении сопоставление прерывается
+(через SIGALRM, модуль re проверяет сигналы во время сопоставления), а ячейка либо считается
+невалидной и попадает в отчет (flag), либо выбрасывается MatchTimeout (abort).
+Прерывание работает в главном потоке на Unix; в остальных случаях медленные ячейки только отмечаются.
+"""
+
+import argparse
+import heapq
+import json
+import random
+import signal
+import threading
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence
+
+from patterns import get_pattern
+from validation import read_header, rules_fingerprint, validate_csv
+
+_CAN_INTERRUPT = hasattr(signal, "setitimer")
+
+
+class MatchTimeout(Exception):
+    """Сопоставление ячейки не уложилось в бюджет времени."""
+
+    def __init__(self, column: str, value: str, budget: float) -> None:
+        super().__init__("столбец %s: значение %r не проверено за %.3f с" % (column, value[:80], budget))
+        self.column = column
+        self.value = value
+        self.budget = budget
+
+
+class _Interrupted(Exception):
+    pass
+
+
+# Вердикт еще не получен: проверку прервал таймер.
+_PENDING = object()
+
+
+def _raise_interrupted(signum, frame) -> None:
+    raise _Interrupted()
+
+
+class ColumnProfile:
+    """
+    Статистика одного столбца.
+    """
+
+    def __init__(self, name: str, sample_size: int = 10000, slowest: int = 5, seed: int = 0) -> None:
+        """
+        :param name: название столбца
+        :param sample_size: размер равномерной выборки задержек для подсчета перцентилей
+        :param slowest: сколько самых медленных значений хранить
+        :param seed: зерно для выборки
+        """
+        self.name = name
+        self.calls = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.timeouts: List[str] = []
+        self._sample_size = sample_size
+        self._sample = array("d")
+        self._slowest_count = slowest
+        self._slowest: List[tuple] = []
+        self._random = random.Random(seed)
+
+    def record(self, seconds: float, value: str, valid: bool) -> None:
+        """
+        :param seconds: время проверки ячейки
+        :param value: значение ячейки
+        :param valid: вердикт
+        """
+        self.calls += 1
+        self.total_seconds += seconds
+        if not valid:
+            self.failures += 1
+        if len(self._sample) < self._sample_size:
+            self._sample.append(seconds)
+        else:
+            slot = self._random.randrange(self.calls)
+            if slot < self._sample_size:
+                self._sample[slot] = seconds
+        if len(self._slowest) < self._slowest_count:
+            heapq.heappush(self._slowest, (seconds, value))
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (seconds, value))
+
+    def percentile(self, quantile: float) -> float:
+        """
+        :param quantile: квантиль от 0 до 1
+        :return: задержка проверки ячейки в секундах
+        """
+        if not self._sample:
+            return 0.0
+        ordered = sorted(self._sample)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+    def stats(self) -> Dict[str, object]:
+        """
+        :return: статистика столбца в виде словаря для json
+        """
+        return {
+            "column": self.name,
+            "calls": self.calls,
+            "failures": self.failures,
+            "total_seconds": round(self.total_seconds, 6),
+            "p50_us": round(self.percentile(0.5) * 1e6, 3),
+            "p99_us": round(self.percentile(0.99) * 1e6, 3),
+            "slowest": [{"seconds": round(seconds, 6), "value": value}
+                        for seconds, value in sorted(self._slowest, reverse=True)],
+            "timeouts": self.timeouts,
+        }
+
+
+class ProfilingRowValidator:
+    """
+    Построчный валидатор с профилированием по столбцам. Совместим с validation.validate_csv.
+
+    В отличие от обычных валидаторов проверяет все ячейки строки, чтобы статистика была полной.
+    """
+
+    def __init__(self, field_types: Sequence[str], checkers: Optional[Sequence[Callable[[str], bool]]] = None,
+                 cell_budget: Optional[float] = None, on_timeout: str = "flag", sample_size: int = 10000,
+                 slowest: int = 5) -> None:
+        """
+        :param field_types: названия столбцов (типов полей) в порядке их следования
+        :param checkers: функции проверки ячеек, по умолчанию - регулярки из patterns
+        :param cell_budget: бюджет времени на одну ячейку в секундах, None - без ограничения
+        :param on_timeout: flag - считать ячейку невалидной и отметить, abort - выбросить MatchTimeout
+        :param sample_size: размер выборки задержек на столбец
+        :param slowest: сколько самых медленных значений хранить на столбец
+        """
+        if on_timeout not in ("flag", "abort"):
+            raise ValueError("on_timeout должен быть flag или abort")
+        self.field_types = list(field_types)
+        self._default_checkers = checkers is None
+        if checkers is None:
+            checkers = [self._regex_checker(field_type) for field_type in self.field_types]
+        self.checkers = list(checkers)
+        self.cell_budget = cell_budget
+        self.on_timeout = on_timeout
+        self.profiles = [ColumnProfile(name, sample_size, slowest, index)
+                         for index, name in enumerate(self.field_types)]
+
+    @staticmethod
+    def _regex_checker(field_type: str) -> Callable[[str], bool]:
+        fullmatch = get_pattern(field_type).fullmatch
+        return lambda value: fullmatch(value) is not None
+
+    def fingerprint(self) -> str:
+        """
+        Пользовательские проверки описываются только именами функций: при изменении их кода
+        нужно увеличить validation.RULESET_VERSION. Бюджет входит в отпечаток, потому что при on_timeout=flag
+        от него зависят вердикты.
+
+        :return: отпечаток правил: класс, регулярки или имена проверок столбцов и бюджет на ячейку
+        """
+        if self._default_checkers:
+            checkers = [get_pattern(field_type).pattern for field_type in self.field_types]
+        else:
+            checkers = ["%s.%s" % (getattr(checker, "__module__", None),
+                                   getattr(checker, "__qualname__", type(checker).__qualname__))
+                        for checker in self.checkers]
+        return rules_fingerprint(self, [checkers, self.cell_budget, self.on_timeout])
+
+    def _interruptible(self) -> bool:
+        return (self.cell_budget is not None and _CAN_INTERRUPT
+                and threading.current_thread() is threading.main_thread())
+
+    def __call__(self, row: Sequence[str]) -> bool:
+        """
+        :param row: значения ячеек одной строки
+        :return: True, если строка валидна
+        """
+        valid = len(row) == len(self.checkers)
+        interruptible = self._interruptible()
+        if interruptible:
+            previous = signal.signal(signal.SIGALRM, _raise_interrupted)
+        try:
+            for checker, profile, cell in zip(self.checkers, self.profiles, row):
+                valid = self._check(checker, profile, cell, interruptible) and valid
+        finally:
+            if interruptible:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous)
+        return valid
+
+    def _check(self, checker, profile: ColumnProfile, cell: str, interruptible: bool) -> bool:
+        """
+        Ячейка, не уложившаяся в бюджет, невалидна независимо от вердикта проверки: и когда проверку прервал
+        таймер, и когда прервать ее нельзя и превышение видно только по замеру времени.
+        """
+        started = time.perf_counter()
+        verdict = _PENDING
+        try:
+            try:
+                if interruptible:
+                    signal.setitimer(signal.ITIMER_REAL, self.cell_budget)
+                verdict = checker(cell)
+            finally:
+                # Таймер снимается и тогда, когда проверка упала с собственной ошибкой.
+                if interruptible:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+        except _Interrupted:
+            # Если таймер сработал уже после возврата из проверки, вердикт получен, а превышение бюджета
+            # определится по времени ниже.
+            pass
+        elapsed = time.perf_counter() - started
+        if verdict is _PENDING or (self.cell_budget is not None and elapsed > self.cell_budget):
+            profile.timeouts.append(cell)
+            if self.on_timeout == "abort":
+                raise MatchTimeout(profile.name, cell, self.cell_budget)
+            verdict = False
+        profile.record(elapsed, cell, bool(verdict))
+        return bool(verdict)
+
+    def report(self) -> Dict[str, object]:
+        """
+        :return: статистика по всем столбцам, отсортированная по суммарному времени
+        """
+        columns = sorted((profile.stats() for profile in self.profiles), key=lambda stats: -stats["total_seconds"])
+        return {"cell_budget": self.cell_budget, "columns": columns}
+
+    def format_table(self) -> str:
+        """
+        :return: человекочитаемая таблица со статистикой по столбцам
+        """
+        lines = ["%-22s %10s %9s %10s %9s %9s %8s" % ("column", "calls", "failures", "total, s", "p50, us",
+                                                      "p99, us", "timeouts")]
+        for stats in self.report()["columns"]:
+            lines.append("%-22s %10d %9d %10.4f %9.2f %9.2f %8d" % (
+                stats["column"], stats["calls"], stats["failures"], stats["total_seconds"], stats["p50_us"],
+                stats["p99_us"], len(stats["timeouts"])))
+            if stats["slowest"]:
+                slowest = stats["slowest"][0]
+                lines.append("    slowest: %r (%.1f us)" % (slowest["value"][:60], slowest["seconds"] * 1e6))
+        return "\n".join(lines)
+
+    def save_json(self, path: str) -> None:
+        """
+        :param path: куда сохранить отчет
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, indent=2, ensure_ascii=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Профилирование регулярок лабораторной 3 по столбцам")
+    parser.add_argument("path", help="csv-файл")
+    parser.add_argument("--budget", type=float, default=None, help="бюджет времени на ячейку, с")
+    parser.add_argument("--abort", action="store_true", help="прерывать проверку при превышении бюджета")
+    parser.add_argument("--json", default=None, help="куда сохранить отчет в json")
+    args = parser.parse_args()
+
+    validator = ProfilingRowValidator(read_header(args.path), cell_budget=args.budget,
+                                      on_timeout="abort" if args.abort else "flag")
+    invalid = validate_csv(args.path, validator)
+    print(validator.format_table())
+    print("invalid rows: %d" % len(invalid))
+    if args.json:
+        validator.save_json(args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Потоковый отчет о невалидных строках с указанием ошибочных столбцов.
+
+Каждая невалидная строка пишется в файл сразу, как только найдена, через буферизованный writer,
+поэтому память не зависит от числа ошибок. Счетчики ошибок по столбцам копятся на лету
+и при закрытии отчета сохраняются рядом в <отчет>.summary.json.
+
+Форматы:
+* jsonl - одна строка json на невалидную строку: номер, названия ошибочных столбцов и их исходные значения;
+* csv - по строке на каждую ошибочную ячейку: номер строки, столбец, значение (удобно грузить в pandas).
+"""
+
+import csv
+import json
+from typing import Dict, List, Optional, Sequence
+
+from patterns import row_validator
+from rowset import RowSet
+from validation import DELIMITER, ENCODING
+
+FORMATS = ("jsonl", "csv")
+
+
+class InvalidRowReport:
+    """
+    Файл отчета о невалидных строках.
+    """
+
+    def __init__(self, path: str, column_names: Sequence[str], fmt: str = "jsonl",
+                 buffer_size: int = 1 << 20) -> None:
+        """
+        :param path: куда писать отчет
+        :param column_names: названия столбцов csv-файла
+        :param fmt: формат отчета, jsonl или csv
+        :param buffer_size: размер буфера записи в байтах
+        """
+        if fmt not in FORMATS:
+            raise ValueError("неизвестный формат отчета: %r, доступны: %s" % (fmt, ", ".join(FORMATS)))
+        self.path = path
+        self.fmt = fmt
+        self.column_names = list(column_names)
+        self.counts: Dict[str, int] = {name: 0 for name in self.column_names}
+        self.column_count_errors = 0
+        self.rows_written = 0
+        self._file = open(path, "w", encoding="utf-8", newline="", buffering=buffer_size)
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(["row", "column", "value"])
+
+    def __enter__(self) -> "InvalidRowReport":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, row_number: int, row: Sequence[str], failing: Sequence[int]) -> None:
+        """
+        Записывает одну невалидную строку.
+
+        :param row_number: номер строки (нумерация как в calculate_checksum)
+        :param row: исходные значения ячеек
+        :param failing: индексы ошибочных столбцов
+        """
+        self.rows_written += 1
+        wrong_length = len(row) != len(self.column_names)
+        if wrong_length:
+            self.column_count_errors += 1
+        names = [self.column_names[index] for index in failing if index < len(self.column_names)]
+        for name in names:
+            self.counts[name] += 1
+        if self._csv is not None:
+            for index in failing:
+                if index < len(self.column_names):
+                    self._csv.writerow([row_number, self.column_names[index], row[index] if index < len(row) else ""])
+            if wrong_length:
+                self._csv.writerow([row_number, "", json.dumps(list(row), ensure_ascii=False)])
+            return
+        record: Dict[str, object] = {
+            "row": row_number,
+            "columns": names,
+            "values": {self.column_names[index]: row[index] for index in failing if index < len(row)},
+        }
+        if wrong_length:
+            record["raw"] = list(row)
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+
+    def summary(self) -> Dict[str, object]:
+        """
+        :return: число записанных строк и счетчики ошибок по столбцам
+        """
+        return {"invalid_rows": self.rows_written, "column_count_errors": self.column_count_errors,
+                "errors_by_column": dict(self.counts)}
+
+    def close(self) -> None:
+        """Сбрасывает буфер, закрывает отчет и сохраняет сводку."""
+        if self._file.closed:
+            return
+        self._file.close()
+        with open(self.path + ".summary.json", "w", encoding="utf-8") as file:
+            json.dump(self.summary(), file, indent=2, ensure_ascii=False)
+
+
+def validate_with_report(path: str, report_path: str, field_types: Optional[Sequence[str]] = None, validator=None,
+                         fmt: str = "jsonl", encoding: str = ENCODING, delimiter: str = DELIMITER) -> RowSet:
+    """
+    Однопроходная валидация с потоковой записью отчета.
+
+    Валидатор должен уметь назвать ошибочные столбцы (метод failing_columns), как валидаторы
+    из validation, patterns, verdict_cache и semantic.
+
+    :param path: путь к csv-файлу
+    :param report_path: куда писать отчет
+    :param field_types: типы столбцов, по умолчанию - из заголовка
+    :param validator: валидатор строки, по умолчанию собирается по field_types из patterns
+    :param fmt: формат отчета, jsonl или csv
+    :param encoding: кодировка файла
+    :param delimiter: разделитель столбцов
+    :return: множество номеров невалидных строк
+    :raises TypeError: если у валидатора нет метода failing_columns
+    """
+    if validator is not None and not callable(getattr(validator, "failing_columns", None)):
+        raise TypeError("валидатор %r не умеет называть ошибочные столбцы (нет метода failing_columns)"
+                        % (validator,))
+    invalid = RowSet()
+    with open(path, "r", encoding=encoding, newline="") as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        header: List[str] = next(reader, [])
+        types = list(field_types or header)
+        validator = validator or row_validator(types)
+        with InvalidRowReport(report_path, header or types, fmt) as report:
+            for row_number, row in enumerate(reader):
+                if not validator(row):
+                    invalid.add(row_number)
+                    report.write(row_number, row, validator.failing_columns(row))
+    return invalid
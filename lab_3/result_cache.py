@@ -0,0 +1,196 @@
+"""
+Постоянный кэш результатов валидации на диске с адресацией по содержимому.
+
+Ключ записи - хеш содержимого csv-файла плюс отпечаток правил, которыми файл проверялся:
+его возвращает метод fingerprint() валидатора (класс, тексты регулярок или параметры и validation.RULESET_VERSION).
+Изменение регулярки одного типа поля затрагивает только записи файлов, в которых есть столбец этого типа,
+а изменение кода проверок требует увеличить RULESET_VERSION. Значение - множество невалидных строк
+и контрольная сумма.
+
+Записи пишутся атомарно (временный файл + os.replace), при превышении лимита размера
+удаляются давно не использованные записи. Чтобы не перехешировать неизменившийся файл,
+хеш содержимого запоминается по пути, размеру и времени изменения файла; в этом индексе хранятся
+не больше max_files недавно использованных путей.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from typing import Callable, Dict, Optional, Tuple
+
+from checksum import calculate_checksum
+from rowset import RowSet
+from validation import validate_csv
+
+CACHE_FORMAT = 1
+_INDEX_NAME = "file_hashes.json"
+_SUFFIX = ".result"
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    """
+    :param path: путь к файлу
+    :param block_size: размер блока чтения
+    :return: blake2b-хеш содержимого файла
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def ruleset_fingerprint(validator) -> str:
+    """
+    :param validator: валидатор строки с методом fingerprint() (все валидаторы лабораторной его реализуют)
+    :return: короткий хеш правил валидатора
+    :raises TypeError: если у валидатора нет fingerprint() и его результаты нельзя кэшировать
+    """
+    fingerprint = getattr(validator, "fingerprint", None)
+    if fingerprint is None:
+        raise TypeError("у валидатора %r нет метода fingerprint(), его результаты нельзя кэшировать" % (validator,))
+    return fingerprint()
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """
+    Записывает файл целиком или не записывает вовсе: данные пишутся во временный файл рядом и переименовываются.
+
+    :param path: путь к файлу
+    :param data: содержимое
+    """
+    directory = os.path.dirname(path)
+    descriptor, temporary = tempfile.mkstemp(dir=directory or ".", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+class ResultCache:
+    """
+    Кэш результатов валидации в каталоге directory.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024, max_files: int = 4096) -> None:
+        """
+        :param directory: каталог кэша, создается при необходимости
+        :param max_bytes: предельный суммарный размер записей
+        :param max_files: сколько путей хранить в индексе хешей содержимого, лишние вытесняются по LRU
+        """
+        if max_files <= 0:
+            raise ValueError("max_files должен быть положительным")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, _INDEX_NAME)
+        self._hashes: Dict[str, list] = self._load_index()
+
+    def _load_index(self) -> Dict[str, list]:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def content_hash(self, path: str) -> str:
+        """
+        Хеш содержимого файла; повторно файл читается, только если изменились его размер или время изменения.
+
+        :param path: путь к csv-файлу
+        :return: хеш содержимого
+        """
+        stat = os.stat(path)
+        absolute = os.path.abspath(path)
+        # Путь переносится в конец индекса: в начале остаются давно не использованные.
+        known = self._hashes.pop(absolute, None)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            self._hashes[absolute] = known
+            return known[2]
+        digest = file_digest(path)
+        self._hashes[absolute] = [stat.st_size, stat.st_mtime_ns, digest]
+        while len(self._hashes) > self.max_files:
+            del self._hashes[next(iter(self._hashes))]
+        atomic_write(self._index_path, json.dumps(self._hashes).encode("utf-8"))
+        return digest
+
+    def key(self, path: str, validator) -> str:
+        """
+        :param path: путь к csv-файлу
+        :param validator: валидатор строки
+        :return: ключ записи кэша
+        """
+        return "%s-%s" % (self.content_hash(path), ruleset_fingerprint(validator))
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[Tuple[RowSet, str]]:
+        """
+        :param key: ключ записи
+        :return: множество невалидных строк и контрольная сумма либо None, если записи нет
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "rb") as file:
+                entry = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if entry.get("format") != CACHE_FORMAT:
+            return None
+        os.utime(entry_path)
+        return entry["invalid"], entry["checksum"]
+
+    def put(self, key: str, invalid: RowSet) -> str:
+        """
+        Сохраняет результат и при необходимости вытесняет старые записи.
+
+        :param key: ключ записи
+        :param invalid: множество невалидных строк
+        :return: контрольная сумма
+        """
+        checksum = calculate_checksum(invalid)
+        entry = {"format": CACHE_FORMAT, "invalid": invalid, "checksum": checksum}
+        atomic_write(self._entry_path(key), pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+        self.evict()
+        return checksum
+
+    def evict(self) -> None:
+        """Удаляет давно не использованные записи, пока суммарный размер превышает max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(_SUFFIX):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime_ns, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def validate(self, path: str, validator, engine: Callable[..., RowSet] = validate_csv) -> Tuple[RowSet, str]:
+        """
+        Возвращает результат из кэша либо валидирует файл и сохраняет результат.
+
+        :param path: путь к csv-файлу
+        :param validator: валидатор строки
+        :param engine: функция валидации с сигнатурой (path, validator) -> RowSet
+        :return: множество невалидных строк и контрольная сумма
+        """
+        key = self.key(path, validator)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        invalid = engine(path, validator)
+        return invalid, self.put(key, invalid)
@@ -0,0 +1,167 @@
+"""
+Компактное множество номеров невалидных строк на основе битовой карты.
+
+Список из python int обходится примерно в 36 байт на номер, битовая карта - в 1 бит на каждую строку файла.
+Итерация по множеству всегда идет в порядке возрастания, поэтому его можно передавать
+в calculate_checksum напрямую, без сортировки и без промежуточного списка.
+"""
+
+from typing import Iterable, Iterator, Optional
+
+_BIT_POSITIONS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+class RowSet:
+    """
+    Множество неотрицательных номеров строк, хранящееся в bytearray (бит i отвечает за строку i).
+    """
+
+    __slots__ = ("_bits", "_count")
+
+    # Итерация идет по возрастанию и без повторов: calculate_checksum хеширует такие коллекции потоково.
+    sorted_unique = True
+
+    def __init__(self, row_numbers: Optional[Iterable[int]] = None, size_hint: int = 0) -> None:
+        """
+        :param row_numbers: начальные номера строк
+        :param size_hint: ожидаемое число строк в файле, чтобы выделить память под карту сразу
+        """
+        self._bits = bytearray((size_hint + 7) // 8)
+        self._count = 0
+        if row_numbers is not None:
+            self.update(row_numbers)
+
+    @classmethod
+    def _from_bits(cls, bits: bytearray) -> "RowSet":
+        result = cls()
+        result._bits = bits
+        result._count = int.from_bytes(bits, "little").bit_count()
+        return result
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def __contains__(self, row_number: object) -> bool:
+        if not isinstance(row_number, int) or row_number < 0:
+            return False
+        index = row_number >> 3
+        return index < len(self._bits) and bool(self._bits[index] >> (row_number & 7) & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for index, byte in enumerate(self._bits):
+            if byte:
+                base = index << 3
+                for bit in _BIT_POSITIONS[byte]:
+                    yield base + bit
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RowSet):
+            return NotImplemented
+        return self._count == other._count and self._bits.rstrip(b"\0") == other._bits.rstrip(b"\0")
+
+    def __repr__(self) -> str:
+        return "RowSet(%d rows)" % self._count
+
+    def __getstate__(self):
+        return bytes(self._bits)
+
+    def __setstate__(self, state) -> None:
+        self._bits = bytearray(state)
+        self._count = int.from_bytes(self._bits, "little").bit_count()
+
+    def add(self, row_number: int) -> None:
+        """
+        Добавляет номер строки в множество.
+
+        :param row_number: неотрицательный номер строки
+        """
+        if row_number < 0:
+            raise ValueError("номер строки не может быть отрицательным: %d" % row_number)
+        index = row_number >> 3
+        if index >= len(self._bits):
+            self._bits.extend(bytes(max(index + 1 - len(self._bits), len(self._bits))))
+        mask = 1 << (row_number & 7)
+        if not self._bits[index] & mask:
+            self._bits[index] |= mask
+            self._count += 1
+
+    def discard(self, row_number: int) -> None:
+        """
+        Удаляет номер строки, если он есть в множестве.
+
+        :param row_number: номер строки
+        """
+        if row_number in self:
+            self._bits[row_number >> 3] &= ~(1 << (row_number & 7)) & 0xFF
+            self._count -= 1
+
+    def update(self, row_numbers: Iterable[int]) -> None:
+        """
+        Добавляет в множество все номера из последовательности.
+
+        :param row_numbers: номера строк, в любом порядке
+        """
+        if isinstance(row_numbers, RowSet):
+            self |= row_numbers
+            return
+        for row_number in row_numbers:
+            self.add(row_number)
+
+    def union(self, other: "RowSet") -> "RowSet":
+        """
+        :param other: другое множество строк (например, результат проверки другого столбца)
+        :return: новое множество со строками из обоих множеств
+        """
+        return self | other
+
+    def intersection(self, other: "RowSet") -> "RowSet":
+        """
+        :param other: другое множество строк
+        :return: новое множество со строками, присутствующими в обоих множествах
+        """
+        return self & other
+
+    def __or__(self, other: "RowSet") -> "RowSet":
+        if not isinstance(other, RowSet):
+            return NotImplemented
+        size = max(len(self._bits), len(other._bits))
+        value = int.from_bytes(self._bits, "little") | int.from_bytes(other._bits, "little")
+        return RowSet._from_bits(bytearray(value.to_bytes(size, "little")))
+
+    def __and__(self, other: "RowSet") -> "RowSet":
+        if not isinstance(other, RowSet):
+            return NotImplemented
+        size = min(len(self._bits), len(other._bits))
+        value = int.from_bytes(self._bits[:size], "little") & int.from_bytes(other._bits[:size], "little")
+        return RowSet._from_bits(bytearray(value.to_bytes(size, "little")))
+
+    def __ior__(self, other: "RowSet") -> "RowSet":
+        if not isinstance(other, RowSet):
+            return NotImplemented
+        merged = self | other
+        self._bits, self._count = merged._bits, merged._count
+        return self
+
+    def __iand__(self, other: "RowSet") -> "RowSet":
+        if not isinstance(other, RowSet):
+            return NotImplemented
+        common = self & other
+        self._bits, self._count = common._bits, common._count
+        return self
+
+    def shifted(self, offset: int) -> "RowSet":
+        """
+        Возвращает копию множества, в которой все номера сдвинуты на offset строк вперед.
+
+        Удобно для перевода локальных номеров строк куска файла в глобальную нумерацию.
+
+        :param offset: неотрицательный сдвиг
+        :return: новое множество
+        """
+        if offset < 0:
+            raise ValueError("сдвиг не может быть отрицательным: %d" % offset)
+        value = int.from_bytes(self._bits, "little") << offset
+        return RowSet._from_bits(bytearray(value.to_bytes((len(self._bits) * 8 + offset + 7) // 8, "little")))
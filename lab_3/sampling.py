@@ -0,0 +1,197 @@
+"""
+Быстрые ответы без полного прохода по очень большим файлам.
+
+* first_invalid_rows - построчная проверка с ранним выходом после первых N ошибок
+  (номера совпадают с началом результата полного прохода);
+* exceeds_invalid_rate - выясняет, превышает ли доля невалидных строк порог, останавливаясь,
+  как только ответ известен наверняка;
+* estimate_invalid - оценка доли и числа невалидных строк (в том числе по столбцам)
+  по случайной выборке строк с доверительными интервалами Уилсона.
+
+Все режимы используют те же валидаторы, что и полный проход (patterns.row_validator).
+"""
+
+import csv
+import math
+import mmap
+import os
+import random
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from mmap_reader import BytesRowValidator, MmapCsv, count_lines, decode_line, iter_spans
+from patterns import row_validator
+from validation import DELIMITER, ENCODING, read_header
+
+
+def first_invalid_rows(path: str, limit: int, validator=None, encoding: str = ENCODING,
+                       delimiter: str = DELIMITER) -> List[int]:
+    """
+    :param path: путь к csv-файлу
+    :param limit: после скольких невалидных строк остановиться
+    :param validator: валидатор строки, по умолчанию - по заголовку файла
+    :param encoding: кодировка файла
+    :param delimiter: разделитель столбцов
+    :return: номера первых limit невалидных строк (или всех, если их меньше)
+    """
+    found: List[int] = []
+    with open(path, "r", encoding=encoding, newline="") as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        header = next(reader, [])
+        validator = validator or row_validator(header)
+        for row_number, row in enumerate(reader):
+            if not validator(row):
+                found.append(row_number)
+                if len(found) >= limit:
+                    break
+    return found
+
+
+def exceeds_invalid_rate(path: str, threshold: float, validator=None, encoding: str = ENCODING,
+                         delimiter: str = DELIMITER) -> Tuple[bool, int]:
+    """
+    Точно отвечает, больше ли доля невалидных строк порога, по возможности не дочитывая файл.
+
+    Число строк считается по переводам строк в отображенном файле (без индекса строк), затем строки
+    читаются лениво; проход останавливается, как только невалидных строк стало больше порога
+    или оставшихся строк не хватит, чтобы его превысить.
+
+    :param path: путь к csv-файлу
+    :param threshold: порог доли невалидных строк, от 0 до 1
+    :param validator: валидатор строки, по умолчанию - по заголовку файла
+    :param encoding: кодировка файла
+    :param delimiter: разделитель столбцов
+    :return: ответ и число проверенных строк
+    """
+    checked = 0
+    with open(path, "rb") as file:
+        try:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Пустой файл нельзя отобразить в память.
+            return False, checked
+        with buffer:
+            total = max(0, count_lines(buffer) - 1)
+            spans = iter_spans(buffer)
+            header_span = next(spans, None)
+            fast_match = None
+            if validator is None:
+                # Без явного валидатора можно сначала проверять строку байтовой регуляркой, как в validate_mmap.
+                header = decode_line(buffer, *header_span, encoding, delimiter) if header_span else []
+                bytes_validator = BytesRowValidator(header, delimiter)
+                validator, fast_match = bytes_validator.fallback, bytes_validator.fused.fullmatch
+            limit = math.floor(threshold * total)
+            invalid = 0
+            for start, end in spans:
+                checked += 1
+                if fast_match is not None and fast_match(buffer, start, end) is not None:
+                    pass
+                elif not validator(decode_line(buffer, start, end, encoding, delimiter)):
+                    invalid += 1
+                    if invalid > limit:
+                        return True, checked
+                if invalid + (total - checked) <= limit:
+                    return False, checked
+    return False, checked
+
+
+def _wilson(successes: int, trials: int, confidence: float) -> Tuple[float, float]:
+    if not trials:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    center = (rate + z * z / (2 * trials)) / denominator
+    spread = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - spread), min(1.0, center + spread)
+
+
+def _estimate(successes: int, trials: int, total: float, confidence: float) -> Dict[str, float]:
+    low, high = _wilson(successes, trials, confidence)
+    return {
+        "sampled_invalid": successes,
+        "rate": successes / trials if trials else 0.0,
+        "rate_low": low,
+        "rate_high": high,
+        "count": round(total * successes / trials) if trials else 0,
+        "count_low": math.floor(total * low),
+        "count_high": math.ceil(total * high),
+    }
+
+
+def _seek_sample(path: str, sample_size: int, rng: random.Random, encoding: str,
+                 delimiter: str) -> Tuple[List[List[str]], float]:
+    """
+    Выборка строк через случайные смещения в файле без построения индекса.
+
+    Строка попадает в выборку с вероятностью, пропорциональной длине предыдущей строки; у файлов
+    лабораторной длины строк близки, поэтому смещение оценки мало.
+
+    :return: строки выборки и оценка общего числа строк
+    """
+    size = os.path.getsize(path)
+    rows: List[List[str]] = []
+    sampled_bytes = 0
+    with open(path, "rb") as file:
+        file.readline()
+        data_start = file.tell()
+        if data_start >= size:
+            return rows, 0
+        for _ in range(sample_size):
+            file.seek(rng.randrange(data_start - 1, size))
+            file.readline()
+            line = file.readline()
+            if not line:
+                continue
+            sampled_bytes += len(line)
+            rows.append(next(csv.reader([line.decode(encoding)], delimiter=delimiter), []))
+    total = (size - data_start) / (sampled_bytes / len(rows)) if rows else 0
+    return rows, total
+
+
+def estimate_invalid(path: str, sample_size: int = 10000, seed: int = 0, confidence: float = 0.95,
+                     field_types: Optional[Sequence[str]] = None, use_index: bool = False,
+                     encoding: str = ENCODING, delimiter: str = DELIMITER) -> Dict[str, object]:
+    """
+    Оценивает долю и число невалидных строк и ячеек по каждому столбцу по случайной выборке.
+
+    :param path: путь к csv-файлу
+    :param sample_size: размер выборки
+    :param seed: зерно генератора, одинаковое зерно дает одинаковую выборку
+    :param confidence: уровень доверия интервалов
+    :param field_types: типы столбцов, по умолчанию - из заголовка
+    :param use_index: строить индекс строк через MmapCsv (точная равномерная выборка и точное число строк)
+                      вместо случайных смещений в файле
+    :param encoding: кодировка файла
+    :param delimiter: разделитель столбцов
+    :return: оценка для строк целиком и для каждого столбца
+    """
+    rng = random.Random(seed)
+    if use_index:
+        with MmapCsv(path, encoding, delimiter) as table:
+            total: float = len(table)
+            header = table.header
+            picked = rng.sample(range(len(table)), min(sample_size, len(table)))
+            rows = [table.decode_row(*table.span(row_number)) for row_number in sorted(picked)]
+    else:
+        header = read_header(path, encoding, delimiter)
+        rows, total = _seek_sample(path, sample_size, rng, encoding, delimiter)
+
+    types = list(field_types or header)
+    validator = row_validator(types)
+    invalid_rows = 0
+    by_column = [0] * len(types)
+    for row in rows:
+        if not validator(row):
+            invalid_rows += 1
+            for index in validator.failing_columns(row):
+                by_column[index] += 1
+    return {
+        "sampled_rows": len(rows),
+        "total_rows": round(total),
+        "exact_total": use_index,
+        "confidence": confidence,
+        "rows": _estimate(invalid_rows, len(rows), total, confidence),
+        "columns": {name: _estimate(count, len(rows), total, confidence)
+                    for name, count in zip(header or types, by_column)},
+    }
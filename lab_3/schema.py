@@ -0,0 +1,179 @@
+"""
+Вывод схемы csv-файла по выборке строк: какой из 20 типов полей README лежит в каждом столбце.
+
+Строки берутся из начала файла и со случайных смещений (seek + переход на начало следующей строки),
+каждое значение проверяется всеми регулярками реестра, и для столбца выбирается тип с наибольшей
+долей совпадений. Уверенность - эта доля. Если два типа подходят почти одинаково хорошо
+(например, широта всегда проходит проверку долготы), используется тип из заголовка столбца,
+а если заголовок не помогает - самый узкий из подходящих типов, и столбец помечается как неоднозначный.
+
+Результат кэшируется по сигнатуре заголовка и параметрам вывода (margin, strict), так что для файлов
+с тем же набором столбцов выборка повторно не делается. Полный проход затем запускает ровно один валидатор на столбец.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import random
+from typing import Dict, List, Optional, Sequence
+
+from patterns import FIELD_BREADTH, VALIDATORS, row_validator
+from validation import DELIMITER, ENCODING
+
+
+class InferredSchema:
+    """
+    Результат вывода схемы.
+    """
+
+    def __init__(self, field_types: Sequence[str], confidence: Sequence[float],
+                 ambiguous: Optional[Dict[int, List[str]]] = None, sampled_rows: int = 0) -> None:
+        """
+        :param field_types: выбранный тип для каждого столбца
+        :param confidence: доля значений выборки, совпавших с выбранным типом
+        :param ambiguous: индекс столбца -> типы, которые подошли почти одинаково хорошо
+        :param sampled_rows: размер выборки
+        """
+        self.field_types = list(field_types)
+        self.confidence = list(confidence)
+        self.ambiguous = dict(ambiguous or {})
+        self.sampled_rows = sampled_rows
+
+    def validator(self, fused: bool = True):
+        """
+        :param fused: склеивать ли регулярки столбцов в одно выражение
+        :return: валидатор строки с одной регуляркой на столбец
+        """
+        return row_validator(self.field_types, fused)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "field_types": self.field_types,
+            "confidence": self.confidence,
+            "ambiguous": {str(index): types for index, types in self.ambiguous.items()},
+            "sampled_rows": self.sampled_rows,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "InferredSchema":
+        ambiguous = {int(index): types for index, types in data.get("ambiguous", {}).items()}
+        return cls(data["field_types"], data["confidence"], ambiguous, data.get("sampled_rows", 0))
+
+
+def header_signature(header: Sequence[str]) -> str:
+    """
+    :param header: названия столбцов
+    :return: короткий хеш заголовка для ключа кэша
+    """
+    return hashlib.blake2b("\x1f".join(header).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def schema_signature(header: Sequence[str], margin: float, strict: bool) -> str:
+    """
+    От margin и strict зависит результат вывода для того же заголовка, поэтому они входят в ключ кэша.
+
+    :param header: названия столбцов
+    :param margin: порог неоднозначности infer_schema
+    :param strict: режим strict infer_schema
+    :return: ключ кэша схем
+    """
+    return "%s-%s-%s" % (header_signature(header), repr(float(margin)), "strict" if strict else "lenient")
+
+
+def sample_rows(path: str, head: int = 200, random_rows: int = 800, seed: int = 0, encoding: str = ENCODING,
+                delimiter: str = DELIMITER) -> List[List[str]]:
+    """
+    Берет строки из начала файла и со случайных смещений.
+
+    :param path: путь к csv-файлу
+    :param head: сколько строк взять подряд после заголовка
+    :param random_rows: сколько строк взять со случайных смещений
+    :param seed: зерно генератора смещений
+    :param encoding: кодировка файла, совместимая с ASCII
+    :param delimiter: разделитель столбцов
+    :return: выборка строк (без заголовка)
+    """
+    rng = random.Random(seed)
+    lines: List[bytes] = []
+    size = os.path.getsize(path)
+    with open(path, "rb") as file:
+        file.readline()
+        data_start = file.tell()
+        for _ in range(head):
+            line = file.readline()
+            if not line:
+                break
+            lines.append(line)
+        head_end = file.tell()
+        if head_end < size:
+            for _ in range(random_rows):
+                file.seek(rng.randrange(head_end, size))
+                file.readline()
+                line = file.readline()
+                if line:
+                    lines.append(line)
+    if data_start >= size:
+        return []
+    text = [line.decode(encoding, errors="replace") for line in lines]
+    return [row for row in csv.reader(text, delimiter=delimiter) if row]
+
+
+def infer_schema(path: str, header: Optional[Sequence[str]] = None, margin: float = 0.02,
+                 cache_dir: Optional[str] = None, strict: bool = False, encoding: str = ENCODING,
+                 delimiter: str = DELIMITER, **sample_options) -> InferredSchema:
+    """
+    Определяет тип каждого столбца по выборке строк.
+
+    :param path: путь к csv-файлу
+    :param header: названия столбцов, по умолчанию - из первой строки файла
+    :param margin: если доли совпадений двух типов отличаются меньше чем на margin, столбец считается неоднозначным
+    :param cache_dir: каталог кэша схем по сигнатуре заголовка и параметрам, None - без кэша на диске
+    :param strict: выбрасывать ValueError, если неоднозначность не удалось разрешить по заголовку
+    :param encoding: кодировка файла
+    :param delimiter: разделитель столбцов
+    :param sample_options: параметры sample_rows (head, random_rows, seed)
+    :return: выведенная схема
+    """
+    if header is None:
+        with open(path, "r", encoding=encoding, newline="") as file:
+            header = next(csv.reader(file, delimiter=delimiter), [])
+    cache_path = None
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = os.path.join(cache_dir, "schema-%s.json" % schema_signature(header, margin, strict))
+        if os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as file:
+                return InferredSchema.from_dict(json.load(file))
+
+    rows = sample_rows(path, encoding=encoding, delimiter=delimiter, **sample_options)
+    field_types: List[str] = []
+    confidence: List[float] = []
+    ambiguous: Dict[int, List[str]] = {}
+    breadth = {field_type: sum(1 for row in rows for value in row if regex.fullmatch(value) is not None)
+               for field_type, regex in VALIDATORS.items()}
+    for index, name in enumerate(header):
+        values = [row[index] for row in rows if index < len(row)]
+        scores = {field_type: sum(1 for value in values if regex.fullmatch(value) is not None) / max(1, len(values))
+                  for field_type, regex in VALIDATORS.items()}
+        best = max(scores.values())
+        candidates = [field_type for field_type, score in scores.items() if score == best or best - score < margin]
+        if len(candidates) == 1:
+            chosen = candidates[0]
+        elif name in candidates:
+            chosen = name
+        else:
+            # Из равноценных типов берем самый узкий: он совпадает с наименьшим числом ячеек во всей выборке,
+            # а при равенстве - по ширине регулярок среди пересекающихся типов (patterns.FIELD_BREADTH).
+            chosen = min(candidates, key=lambda field_type: (breadth[field_type], FIELD_BREADTH[field_type]))
+            ambiguous[index] = candidates
+            if strict:
+                raise ValueError("столбец %d (%s): не удалось выбрать тип из %s" % (index, name, ", ".join(candidates)))
+        field_types.append(chosen)
+        confidence.append(round(scores[chosen], 4))
+
+    schema = InferredSchema(field_types, confidence, ambiguous, len(rows))
+    if cache_path is not None:
+        with open(cache_path, "w", encoding="utf-8") as file:
+            json.dump(schema.to_dict(), file, indent=2, ensure_ascii=False)
+    return schema
@@ -0,0 +1,226 @@
+"""
+Семантические валидаторы: дешевая регулярка проверяет только форму значения, а диапазоны
+(октеты IPv4, широта и долгота, часы/минуты/секунды, месяц и день, рост) проверяются арифметикой.
+Так длинные альтернации из реестра не разбирают искаженные значения с откатами.
+
+Дополнительно доступна проверка контрольных цифр ISBN, ISSN, СНИЛС и ИНН. По умолчанию она выключена:
+в условиях лабораторной контрольные цифры не проверяются, и вердикты совпадают с регулярками из patterns.
+Цифры в значениях ожидаются ASCII, как во всех данных лабораторной.
+"""
+
+import re
+from typing import Callable, Dict, List, Sequence
+
+from patterns import get_pattern
+from validation import rules_fingerprint
+
+_IP_V4 = re.compile(r"([0-9]{1,3})\.([0-9]{1,3})\.([0-9]{1,3})\.([0-9]{1,3})")
+_COORDINATE = re.compile(r"-?([0-9]{1,3})(?:\.([0-9]+))?")
+_TIME = re.compile(r"([0-9]{2}):([0-9]{2}):([0-9]{2})\.[0-9]{6}")
+_DATE = re.compile(r"[0-9]{4}-([0-9]{2})-([0-9]{2})")
+_HEIGHT = re.compile(r"([0-9])\.[0-9]{2}")
+_DIGITS = re.compile(r"[0-9X]")
+
+_INN_WEIGHTS_11 = (7, 2, 4, 10, 3, 5, 9, 4, 6, 8)
+_INN_WEIGHTS_12 = (3, 7, 2, 4, 10, 3, 5, 9, 4, 6, 8)
+
+
+def _canonical_number(digits: str) -> bool:
+    """Число без ведущих нулей, как требуют альтернации вида [1-9]?\\d."""
+    return len(digits) == 1 or digits[0] != "0"
+
+
+def _within(match, limit: int) -> bool:
+    """Целая часть координаты не больше limit, а при равенстве дробная часть состоит из нулей."""
+    integer, fraction = match.group(1), match.group(2)
+    if not _canonical_number(integer):
+        return False
+    value = int(integer)
+    return value < limit or (value == limit and not (fraction or "").strip("0"))
+
+
+def _check_ip_v4(value: str) -> bool:
+    match = _IP_V4.fullmatch(value)
+    return match is not None and all(_canonical_number(octet) and int(octet) <= 255 for octet in match.groups())
+
+
+def _check_latitude(value: str) -> bool:
+    match = _COORDINATE.fullmatch(value)
+    return match is not None and len(match.group(1)) <= 2 and _within(match, 90)
+
+
+def _check_longitude(value: str) -> bool:
+    match = _COORDINATE.fullmatch(value)
+    return match is not None and _within(match, 180)
+
+
+def _check_time(value: str) -> bool:
+    match = _TIME.fullmatch(value)
+    return match is not None and int(match.group(1)) < 24 and int(match.group(2)) < 60 and int(match.group(3)) < 60
+
+
+def _check_date(value: str) -> bool:
+    match = _DATE.fullmatch(value)
+    return match is not None and 1 <= int(match.group(1)) <= 12 and 1 <= int(match.group(2)) <= 31
+
+
+def _check_height(value: str) -> bool:
+    match = _HEIGHT.fullmatch(value)
+    return match is not None and int(match.group(1)) < 3
+
+
+RANGE_CHECKS: Dict[str, Callable[[str], bool]] = {
+    "ip_v4": _check_ip_v4,
+    "latitude": _check_latitude,
+    "longitude": _check_longitude,
+    "time": _check_time,
+    "date": _check_date,
+    "height": _check_height,
+}
+
+
+def isbn_check_digit_ok(value: str) -> bool:
+    """
+    :param value: ISBN-10 или ISBN-13, дефисы допускаются
+    :return: True, если контрольная цифра верна
+    """
+    digits = [10 if char == "X" else int(char) for char in _DIGITS.findall(value)]
+    if len(digits) == 13:
+        return sum(digit * (3 if index % 2 else 1) for index, digit in enumerate(digits)) % 10 == 0
+    if len(digits) == 10:
+        return sum(digit * (10 - index) for index, digit in enumerate(digits)) % 11 == 0
+    return False
+
+
+def issn_check_digit_ok(value: str) -> bool:
+    """
+    :param value: ISSN в виде NNNN-NNNC
+    :return: True, если контрольная цифра верна
+    """
+    digits = [10 if char == "X" else int(char) for char in _DIGITS.findall(value)]
+    if len(digits) != 8:
+        return False
+    return sum(digit * (8 - index) for index, digit in enumerate(digits[:7])) % 11 == (11 - digits[7]) % 11
+
+
+def snils_check_digit_ok(value: str) -> bool:
+    """
+    :param value: СНИЛС из 11 цифр подряд
+    :return: True, если две последние цифры совпадают с контрольным числом
+    """
+    if len(value) != 11 or not value.isdigit():
+        return False
+    total = sum(int(digit) * (9 - index) for index, digit in enumerate(value[:9]))
+    control = total % 101 if total > 101 else total
+    return (0 if control in (100, 101) else control) == int(value[9:])
+
+
+def inn_check_digit_ok(value: str) -> bool:
+    """
+    :param value: ИНН физического лица из 12 цифр
+    :return: True, если обе контрольные цифры верны
+    """
+    if len(value) != 12 or not value.isdigit():
+        return False
+    digits = [int(digit) for digit in value]
+    first = sum(weight * digit for weight, digit in zip(_INN_WEIGHTS_11, digits)) % 11 % 10
+    second = sum(weight * digit for weight, digit in zip(_INN_WEIGHTS_12, digits)) % 11 % 10
+    return first == digits[10] and second == digits[11]
+
+
+CHECK_DIGITS: Dict[str, Callable[[str], bool]] = {
+    "isbn": isbn_check_digit_ok,
+    "issn": issn_check_digit_ok,
+    "snils": snils_check_digit_ok,
+    "inn": inn_check_digit_ok,
+}
+
+
+def value_checker(field_type: str, check_digits: bool = False) -> Callable[[str], bool]:
+    """
+    Возвращает функцию проверки одного значения: арифметическую для типов с диапазонами
+    и регулярку из реестра для остальных, при необходимости - с проверкой контрольных цифр.
+
+    :param field_type: название типа поля из README
+    :param check_digits: проверять ли контрольные цифры ISBN, ISSN, СНИЛС и ИНН
+    :return: функция, возвращающая True для валидного значения
+    """
+    if field_type in RANGE_CHECKS:
+        return RANGE_CHECKS[field_type]
+    fullmatch = get_pattern(field_type).fullmatch
+    if check_digits and field_type in CHECK_DIGITS:
+        check_digit_ok = CHECK_DIGITS[field_type]
+        return lambda value: fullmatch(value) is not None and check_digit_ok(value)
+    return lambda value: fullmatch(value) is not None
+
+
+def validate_batch(field_type: str, values: Sequence[str], check_digits: bool = False) -> List[bool]:
+    """
+    Проверяет пачку значений одного столбца.
+
+    :param field_type: название типа поля из README
+    :param values: значения ячеек столбца
+    :param check_digits: проверять ли контрольные цифры
+    :return: вердикты в порядке значений
+    """
+    return list(map(value_checker(field_type, check_digits), values))
+
+
+class SemanticRowValidator:
+    """
+    Построчный валидатор на семантических проверках. Совместим с validation.validate_csv
+    и sharded.validate_sharded (при сериализации сохраняются только типы столбцов и флаг).
+    """
+
+    def __init__(self, field_types: Sequence[str], check_digits: bool = False) -> None:
+        """
+        :param field_types: названия типов полей в порядке столбцов
+        :param check_digits: проверять ли контрольные цифры ISBN, ISSN, СНИЛС и ИНН
+        """
+        self.field_types = list(field_types)
+        self.check_digits = check_digits
+        self._checkers = [value_checker(field_type, check_digits) for field_type in self.field_types]
+
+    def __getstate__(self):
+        return self.field_types, self.check_digits
+
+    def __setstate__(self, state) -> None:
+        self.__init__(*state)
+
+    def fingerprint(self) -> str:
+        """
+        Код проверок в отпечаток не входит: при его изменении увеличивается validation.RULESET_VERSION.
+
+        :return: отпечаток правил: класс, типы столбцов и флаг проверки контрольных цифр
+        """
+        return rules_fingerprint(self, [self.field_types, self.check_digits])
+
+    def __call__(self, row: Sequence[str]) -> bool:
+        """
+        :param row: значения ячеек одной строки
+        :return: True, если строка валидна
+        """
+        if len(row) != len(self._checkers):
+            return False
+        for checker, cell in zip(self._checkers, row):
+            if not checker(cell):
+                return False
+        return True
+
+    def failing_columns(self, row: Sequence[str]) -> List[int]:
+        """
+        :param row: значения ячеек одной строки
+        :return: индексы столбцов, значения которых не прошли проверку
+        """
+        failing = [index for index, (checker, cell) in enumerate(zip(self._checkers, row)) if not checker(cell)]
+        failing.extend(range(len(row), len(self._checkers)))
+        return failing
+
+
+def semantic_row_validator(field_types: Sequence[str], check_digits: bool = False) -> SemanticRowValidator:
+    """
+    :param field_types: названия типов полей в порядке столбцов
+    :param check_digits: проверять ли контрольные цифры
+    :return: валидатор строки
+    """
+    return SemanticRowValidator(field_types, check_digits)
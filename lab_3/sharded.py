@@ -0,0 +1,131 @@
+"""
+Многопроцессная валидация csv-файла: файл режется на байтовые диапазоны по границам записей,
+диапазоны проверяются в ProcessPoolExecutor, а локальные номера строк переводятся в глобальные.
+
+Кодировка файла должна быть совместима с ASCII (utf-8, cp1251): границы кусков ищутся по байту b"\\n".
+Поэтому записи с переводом строки внутри ячейки в кавычках режут куски неверно. Такие записи обнаруживаются
+при проверке кусков (строк файла прочитано больше, чем записей), и тогда файл целиком проверяется
+однопроцессным validate_csv.
+"""
+
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from checksum import calculate_checksum
+from rowset import RowSet
+from validation import DELIMITER, ENCODING, validate_csv, validate_rows
+
+
+def _skip_to_line_start(file, offset: int) -> int:
+    """
+    Сдвигает смещение на начало следующей записи (сразу за ближайшим переводом строки).
+    """
+    if offset == 0:
+        return 0
+    file.seek(offset - 1)
+    file.readline()
+    return file.tell()
+
+
+def plan_shards(path: str, shard_count: int) -> List[Tuple[int, int]]:
+    """
+    Делит файл на непересекающиеся байтовые диапазоны, выровненные по границам строк.
+
+    Заголовок в диапазоны не попадает. Пустые диапазоны (если файл меньше числа кусков) отбрасываются.
+
+    :param path: путь к csv-файлу
+    :param shard_count: желаемое число кусков
+    :return: список пар (начало, конец) в байтах
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as file:
+        file.readline()
+        data_start = file.tell()
+        step = max(1, (size - data_start) // max(1, shard_count))
+        bounds = [data_start]
+        for index in range(1, shard_count):
+            bound = _skip_to_line_start(file, min(size, data_start + index * step))
+            if bound > bounds[-1]:
+                bounds.append(bound)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+class _RowCounter:
+    """Обертка над итератором строк, подсчитывающая выданные строки."""
+
+    def __init__(self, rows) -> None:
+        self._rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self._rows:
+            self.count += 1
+            yield row
+
+
+def _validate_shard(path: str, start: int, end: int, validator, encoding: str,
+                    delimiter: str) -> Tuple[int, RowSet, bool]:
+    """
+    Проверяет один кусок файла в дочернем процессе.
+
+    :return: число строк в куске, множество локальных номеров невалидных строк
+             и признак того, что в куске есть записи из нескольких строк файла
+    """
+    with open(path, "rb") as file:
+        file.seek(start)
+        text = file.read(end - start).decode(encoding)
+    reader = csv.reader(io.StringIO(text, newline=""), delimiter=delimiter)
+    counter = _RowCounter(reader)
+    invalid = validate_rows(counter, validator)
+    return counter.count, invalid, reader.line_num != counter.count
+
+
+def validate_sharded(path: str, validator, workers: Optional[int] = None, shards_per_worker: int = 4,
+                     encoding: str = ENCODING, delimiter: str = DELIMITER) -> RowSet:
+    """
+    Валидирует файл параллельно в нескольких процессах.
+
+    Результат совпадает с validation.validate_csv: номера строк глобальные и начинаются с 0 после заголовка.
+    Валидатор должен сериализоваться через pickle (например, validation.PatternRowValidator).
+    Если в файле есть ячейки с переводом строки, файл перепроверяется через validate_csv.
+
+    :param path: путь к csv-файлу
+    :param validator: вызываемый объект, возвращающий True для валидной строки
+    :param workers: число процессов, по умолчанию os.cpu_count()
+    :param shards_per_worker: на сколько кусков делить работу каждого процесса для балансировки
+    :param encoding: кодировка файла, совместимая с ASCII
+    :param delimiter: разделитель столбцов
+    :return: множество номеров невалидных строк
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = plan_shards(path, workers * shards_per_worker)
+    invalid = RowSet()
+    offset = 0
+    multiline = False
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_validate_shard, path, start, end, validator, encoding, delimiter)
+                   for start, end in shards]
+        for future in futures:
+            row_count, local_invalid, shard_multiline = future.result()
+            invalid |= local_invalid.shifted(offset)
+            offset += row_count
+            multiline = multiline or shard_multiline
+    if multiline:
+        # Запись с переводом строки внутри ячейки попадает в кусок, который начинается с ее открывающей кавычки,
+        # так что хотя бы один кусок прочитает больше строк, чем выдаст записей. Номера строк тогда неверны.
+        return validate_csv(path, validator, encoding, delimiter)
+    return invalid
+
+
+def checksum_sharded(path: str, validator, workers: Optional[int] = None, **kwargs) -> str:
+    """
+    :param path: путь к csv-файлу
+    :param validator: вызываемый объект, возвращающий True для валидной строки
+    :param workers: число процессов
+    :return: контрольная сумма, совпадающая с однопроцессным расчетом
+    """
+    return calculate_checksum(validate_sharded(path, validator, workers, **kwargs))
@@ -0,0 +1,53 @@
+"""
+Модули лабораторной лежат плоско и импортируют друг друга по имени, поэтому каталог lab_3 добавляется в sys.path.
+"""
+
+import csv
+import io
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generator import VALUE_GENERATORS, distort  # noqa: E402
+
+FIELD_TYPES = ["email", "ip_v4", "date", "occupation", "latitude", "blood_type"]
+
+# Номера строк данных, которые заведомо невалидны по структуре: пустая, короткая и длинная.
+BLANK_ROW, SHORT_ROW, LONG_ROW = 17, 101, 233
+
+
+def _format_row(values, quoting: int, newline: str) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, delimiter=";", quoting=quoting, lineterminator=newline).writerow(values)
+    return buffer.getvalue()
+
+
+@pytest.fixture(params=["\n", "\r\n"], ids=["lf", "crlf"])
+def lab_csv(request, tmp_path):
+    """
+    csv-файл в формате лабораторной: валидные и искаженные значения, ячейки в кавычках и без,
+    а также пустая, короткая и длинная строки.
+    """
+    newline = request.param
+    rng = random.Random(0)
+    lines = [_format_row(FIELD_TYPES, csv.QUOTE_ALL, newline)]
+    for row_number in range(400):
+        values = [VALUE_GENERATORS[field_type](rng) for field_type in FIELD_TYPES]
+        values = [distort(value, field_type, rng) if rng.random() < 0.03 else value
+                  for value, field_type in zip(values, FIELD_TYPES)]
+        if row_number == BLANK_ROW:
+            lines.append(newline)
+        elif row_number == SHORT_ROW:
+            lines.append(_format_row(values[:-1], csv.QUOTE_ALL, newline))
+        elif row_number == LONG_ROW:
+            lines.append(_format_row(values + [values[0]], csv.QUOTE_ALL, newline))
+        else:
+            quoting = csv.QUOTE_MINIMAL if row_number % 3 == 0 else csv.QUOTE_ALL
+            lines.append(_format_row(values, quoting, newline))
+    path = tmp_path / "lab.csv"
+    path.write_bytes("".join(lines).encode("utf-8"))
+    return str(path)
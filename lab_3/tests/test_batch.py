@@ -0,0 +1,69 @@
+import asyncio
+import json
+import os
+import shutil
+
+import pytest
+
+from batch import discover, run_batch, variant_of
+from checksum import calculate_checksum
+from patterns import row_validator
+from validation import read_header, validate_csv
+
+
+def _copy(source, root, name):
+    path = os.path.join(str(root), name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    shutil.copyfile(source, path)
+    return path
+
+
+def _run(paths, output_dir, chunk_rows=50):
+    return asyncio.run(run_batch(paths, str(output_dir), workers=1, max_pending=2, chunk_rows=chunk_rows))
+
+
+def test_variant_of():
+    assert variant_of("data/42.csv") == 42
+    assert variant_of("variant_3_v12.csv") == 12
+    assert variant_of("data/7/input.csv") is None
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 50, 1000])
+def test_result_layout(lab_csv, tmp_path, chunk_rows):
+    root, output_dir = tmp_path / "in", tmp_path / "out"
+    paths = [_copy(lab_csv, root, "3.csv"), _copy(lab_csv, root, "sub/variant_17.csv")]
+    assert discover(str(root)) == sorted(paths)
+    checksum = calculate_checksum(validate_csv(lab_csv, row_validator(read_header(lab_csv))))
+    summaries = _run(discover(str(root)), output_dir, chunk_rows)
+    assert sorted(summary["variant"] for summary in summaries) == [3, 17]
+    for summary in summaries:
+        assert summary["rows"] == 400 and summary["checksum"] == checksum
+        with open(os.path.join(str(output_dir), str(summary["variant"]), "result.json"), encoding="utf-8") as file:
+            assert json.load(file) == {"variant": str(summary["variant"]), "checksum": checksum, "checksum_version": 1}
+
+
+def test_per_file_errors(lab_csv, tmp_path):
+    root, output_dir = tmp_path / "in", tmp_path / "out"
+    good = _copy(lab_csv, root, "1.csv")
+    broken = os.path.join(str(root), "2.csv")
+    with open(broken, "wb") as file:
+        file.write(b'"email"\n"\xff\xfe"\n')
+    unnamed = _copy(lab_csv, root, "input.csv")
+    summaries = _run([good, broken, unnamed], output_dir)
+    # Ошибки попадают в сводки своих файлов и не мешают остальным.
+    assert "error" not in summaries[0]
+    assert summaries[1]["variant"] == 2 and summaries[1]["error"].startswith("UnicodeDecodeError")
+    assert summaries[2]["variant"] is None and "нет номера варианта" in summaries[2]["error"]
+    assert sorted(os.listdir(str(output_dir))) == ["1"]
+
+
+def test_duplicate_variants(lab_csv, tmp_path):
+    root, output_dir = tmp_path / "in", tmp_path / "out"
+    paths = [_copy(lab_csv, root, "a/5.csv"), _copy(lab_csv, root, "4.csv"), _copy(lab_csv, root, "b/variant_5.csv")]
+    summaries = _run(paths, output_dir)
+    assert "error" not in summaries[1]
+    for summary in (summaries[0], summaries[2]):
+        assert summary["variant"] == 5 and summary["error"].startswith("вариант 5 у нескольких файлов")
+        assert paths[0] in summary["error"] and paths[2] in summary["error"]
+    # Результат для повторяющегося варианта не пишется совсем.
+    assert sorted(os.listdir(str(output_dir))) == ["4"]
@@ -0,0 +1,68 @@
+import pytest
+
+import benchmark
+from generator import generate_csv
+from patterns import row_validator
+from validation import read_header, validate_csv
+
+
+def _report(**seconds):
+    return {"engines": {name: {"validate_seconds": value} for name, value in seconds.items()}}
+
+
+def test_find_slowdowns():
+    assert benchmark.find_slowdowns(_report(rows=1.0, columnar=0.9)) == []
+    # Превышение в пределах допуска на шум не считается замедлением.
+    assert benchmark.find_slowdowns(_report(rows=1.0, columnar=1 + benchmark.SLOWDOWN_TOLERANCE / 2)) == []
+    slowdowns = benchmark.find_slowdowns(_report(rows=1.0, columnar=2.0))
+    assert len(slowdowns) == 1 and slowdowns[0].startswith("columnar медленнее rows")
+
+
+def test_find_slowdowns_skipped():
+    report = _report(rows=1.0)
+    report["engines"]["columnar"] = {"skipped": "нет pandas"}
+    assert benchmark.find_slowdowns(report) == []
+    assert benchmark.find_slowdowns(_report(columnar=2.0)) == []
+
+
+def _checksums(**checksums):
+    return {"engines": {name: {"checksum": value, "invalid_rows": 1} for name, value in checksums.items()}}
+
+
+def test_find_mismatches():
+    assert benchmark.find_mismatches(_checksums(rows="a", fused="a", columnar="a")) == []
+    mismatches = benchmark.find_mismatches(_checksums(fused="a", rows="b", columnar="b"))
+    # Эталон - движок rows, даже если он не первый в отчете.
+    assert len(mismatches) == 1 and mismatches[0].startswith("fused расходится с rows")
+    # Без эталона сравнение идет с первым отработавшим движком.
+    assert benchmark.find_mismatches(_checksums(fused="a", columnar="b"))[0].startswith("columnar расходится с fused")
+
+
+def test_find_mismatches_skips_failed():
+    report = _checksums(rows="a", fused="a")
+    report["engines"]["columnar"] = {"skipped": "нет pandas"}
+    report["engines"]["mmap"] = {"error": "OSError: boom"}
+    assert benchmark.find_mismatches(report) == []
+    assert benchmark.find_mismatches({"engines": {"mmap": {"error": "OSError: boom"}}}) == []
+
+
+def test_run_benchmark_survives_failing_engine(tmp_path):
+    path = str(tmp_path / "data.csv")
+    generate_csv(path, 200, seed=0)
+    # Неизвестный движок падает с KeyError в дочернем процессе, остальные при этом замеряются.
+    report = benchmark.run_benchmark(path, 200, ["missing", "rows", "fused"], repeat=1)
+    engines = report["engines"]
+    assert engines["missing"]["error"].startswith("KeyError")
+    assert engines["rows"]["checksum"] == engines["fused"]["checksum"]
+    assert benchmark.find_mismatches(report) == [] and benchmark.find_slowdowns(report) == []
+
+
+@pytest.mark.parametrize("invalid_rate", [0, 0.02, 0.1, 1])
+def test_generator_invalid_rate(tmp_path, invalid_rate):
+    path = str(tmp_path / "data.csv")
+    rows = 2000
+    expected = generate_csv(path, rows, invalid_rate=invalid_rate, seed=1)
+    assert validate_csv(path, row_validator(read_header(path))) == expected
+    # Строка невалидна, если искажена хотя бы одна из 10 ячеек.
+    share = 1 - (1 - invalid_rate) ** 10
+    assert abs(len(expected) / rows - share) < 0.05
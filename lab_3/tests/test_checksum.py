@@ -0,0 +1,105 @@
+import random
+import threading
+
+import pytest
+
+from checksum import CHECKSUM_V2_BLOCK_ROWS, ChecksumAccumulator, MergeableChecksum
+from checksum import calculate_checksum, calculate_checksum_v2
+from rowset import RowSet
+
+
+def _row_numbers(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    # Диапазон меньше числа номеров, поэтому повторы гарантированы.
+    return [rng.randrange(count // 2) for _ in range(count)]
+
+
+def test_calculate_checksum_any_collection():
+    row_numbers = [5, 1, 3, 2]
+    expected = calculate_checksum(list(row_numbers))
+    assert calculate_checksum(tuple(row_numbers)) == expected
+    assert calculate_checksum(set(row_numbers)) == expected
+    assert calculate_checksum(iter(row_numbers)) == expected
+    assert calculate_checksum(RowSet(row_numbers)) == expected
+    # Повторы в кортеже учитываются так же, как в списке.
+    assert calculate_checksum((1, 1, 2)) == calculate_checksum([2, 1, 1])
+
+
+def test_accumulator_empty():
+    with ChecksumAccumulator() as accumulator:
+        assert accumulator.hexdigest() == calculate_checksum([])
+
+
+@pytest.mark.parametrize("run_size", [1, 7, 1000, 1 << 20])
+def test_accumulator_matches_calculate_checksum(run_size):
+    row_numbers = _row_numbers(5000)
+    with ChecksumAccumulator(run_size=run_size, chunk_size=3) as accumulator:
+        accumulator.update(row_numbers)
+        assert len(accumulator) == len(row_numbers)
+        assert accumulator.hexdigest() == calculate_checksum(list(row_numbers))
+        # Повторный вызов не меняет результат.
+        assert accumulator.hexdigest() == calculate_checksum(list(row_numbers))
+
+
+def test_accumulator_keeps_duplicates():
+    with ChecksumAccumulator(run_size=2) as accumulator:
+        accumulator.update([5, 1, 5, 5, 0, 1])
+        assert accumulator.hexdigest() == calculate_checksum([5, 1, 5, 5, 0, 1])
+        assert accumulator.hexdigest() != calculate_checksum([0, 1, 5])
+
+
+def test_accumulator_concurrent_add():
+    row_numbers = _row_numbers(20000, seed=1)
+    with ChecksumAccumulator(run_size=97, chunk_size=11) as accumulator:
+        threads = [threading.Thread(target=lambda part: [accumulator.add(number) for number in part],
+                                    args=(row_numbers[index::8],))
+                   for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert accumulator.hexdigest() == calculate_checksum(list(row_numbers))
+
+
+def test_accumulator_merge():
+    row_numbers = _row_numbers(3000, seed=2)
+    with ChecksumAccumulator(run_size=50) as first, ChecksumAccumulator(run_size=70) as second:
+        first.update(row_numbers[:1000])
+        second.update(row_numbers[1000:])
+        first.merge(second)
+        assert first.hexdigest() == calculate_checksum(list(row_numbers))
+
+
+def _chunked_v2(row_numbers, bounds):
+    """Считает сумму версии 2 так, как это делают воркеры: по кускам [start, end) с закрытием своих блоков."""
+    total = MergeableChecksum()
+    for start, end in zip(bounds, bounds[1:]):
+        part = MergeableChecksum()
+        part.update(number for number in sorted(set(row_numbers)) if start <= number < end)
+        part.seal(end, start)
+        total.merge(part)
+    return total.hexdigest()
+
+
+def test_v2_merge_matches_single_pass():
+    rng = random.Random(3)
+    limit = 5 * CHECKSUM_V2_BLOCK_ROWS
+    row_numbers = [rng.randrange(limit) for _ in range(20000)]
+    row_numbers += list(range(CHECKSUM_V2_BLOCK_ROWS - 10, CHECKSUM_V2_BLOCK_ROWS + 10))
+    expected = calculate_checksum_v2(row_numbers)
+    assert calculate_checksum_v2(RowSet(row_numbers)) == expected
+    assert calculate_checksum_v2(reversed(row_numbers)) == expected
+    for bounds in ([0, limit],
+                   [0, CHECKSUM_V2_BLOCK_ROWS, 3 * CHECKSUM_V2_BLOCK_ROWS, limit],
+                   [0, 12345, CHECKSUM_V2_BLOCK_ROWS + 1, 2 * CHECKSUM_V2_BLOCK_ROWS + 777, limit]):
+        assert _chunked_v2(row_numbers, bounds) == expected
+
+
+def test_v2_merge_rejects_overlapping_sealed_blocks():
+    first, second = MergeableChecksum(), MergeableChecksum()
+    first.update([1, 2, 3])
+    second.update([4])
+    first.seal(CHECKSUM_V2_BLOCK_ROWS)
+    second.seal(CHECKSUM_V2_BLOCK_ROWS)
+    with pytest.raises(ValueError):
+        first.merge(second)
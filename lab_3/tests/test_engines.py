@@ -0,0 +1,78 @@
+"""
+Все движки валидации должны давать тот же результат, что и построчный validation.validate_csv.
+"""
+
+import csv
+
+import pytest
+
+import columnar
+from conftest import BLANK_ROW, FIELD_TYPES, LONG_ROW, SHORT_ROW, _format_row
+from mmap_reader import MmapCsv, validate_mmap
+from patterns import row_validator
+from sharded import validate_sharded
+from validation import read_header, validate_csv
+
+
+@pytest.fixture
+def expected(lab_csv):
+    invalid = validate_csv(lab_csv, row_validator(read_header(lab_csv)))
+    assert {BLANK_ROW, SHORT_ROW, LONG_ROW} <= set(invalid)
+    assert 0 < len(invalid) < 400
+    return invalid
+
+
+@pytest.mark.parametrize("workers, shards_per_worker", [(1, 1), (2, 3), (3, 7)])
+def test_sharded(lab_csv, expected, workers, shards_per_worker):
+    validator = row_validator(read_header(lab_csv))
+    assert validate_sharded(lab_csv, validator, workers, shards_per_worker) == expected
+
+
+@pytest.mark.parametrize("workers, shards_per_worker", [(1, 1), (2, 3), (3, 7)])
+def test_sharded_multiline(lab_csv, workers, shards_per_worker):
+    # Ячейки с переводом строки внутри кавычек: куски, нарезанные по b"\\n", перепроверяются целиком.
+    with open(lab_csv, "rb") as file:
+        lines = file.read().splitlines(keepends=True)
+    newline = "\r\n" if lines[0].endswith(b"\r\n") else "\n"
+    # Многострочных записей много, чтобы границы кусков заведомо попадали внутрь них.
+    for line_number in range(2, len(lines), 3):
+        values = ["multi%sline" % newline] * len(FIELD_TYPES)
+        lines[line_number] = _format_row(values, csv.QUOTE_ALL, newline).encode("utf-8")
+    with open(lab_csv, "wb") as file:
+        file.write(b"".join(lines))
+    validator = row_validator(read_header(lab_csv))
+    expected = validate_csv(lab_csv, validator)
+    assert {1, 148, 298} <= set(expected)
+    assert validate_sharded(lab_csv, validator, workers, shards_per_worker) == expected
+
+
+def test_mmap(lab_csv, expected):
+    assert validate_mmap(lab_csv) == expected
+
+
+def test_mmap_index(lab_csv):
+    with open(lab_csv, "rb") as file:
+        lines = file.read().splitlines()
+    with MmapCsv(lab_csv) as table:
+        assert len(table) == len(lines) - 1
+        assert table.header == read_header(lab_csv)
+        assert [bytes(table.line(row_number)) for row_number in range(len(table))] == lines[1:]
+        assert [bytes(table.buffer[start:end]) for start, end in table.spans()] == lines[1:]
+
+
+@pytest.mark.skipif(columnar.pd is None, reason="нужен pandas")
+@pytest.mark.parametrize("chunk_size", [1, 7, columnar.DEFAULT_CHUNK_SIZE])
+def test_columnar(lab_csv, expected, chunk_size):
+    assert columnar.validate_columnar(lab_csv, chunk_size=chunk_size) == expected
+
+
+@pytest.mark.skipif(columnar.pd is None, reason="нужен pandas")
+@pytest.mark.parametrize("block_size", [3, 64])
+def test_columnar_small_blocks(lab_csv, expected, monkeypatch, block_size):
+    # Строки разрезаются границами блоков при подсчете разделителей, а последняя остается без перевода строки.
+    with open(lab_csv, "rb") as file:
+        content = file.read()
+    with open(lab_csv, "wb") as file:
+        file.write(content.rstrip(b"\r\n"))
+    monkeypatch.setattr(columnar, "_BLOCK_SIZE", block_size)
+    assert columnar.validate_columnar(lab_csv) == expected
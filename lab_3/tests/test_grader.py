@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from grader import grade_file, grade_tree, load_checksums
+
+FIRST, SECOND, THIRD = "a" * 32, "b" * 32, "c" * 32
+
+
+def _write(path, content):
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("content", [
+    "(%s %s %s)" % (FIRST, SECOND, THIRD),
+    "%s\n%s\n%s\n" % (FIRST, SECOND, THIRD),
+    '("%s" "%s" "%s")' % (FIRST, SECOND, THIRD),
+    json.dumps([FIRST, SECOND, THIRD]),
+    json.dumps({"1": FIRST, "2": SECOND, "3": THIRD}),
+])
+def test_load_checksums(tmp_path, content):
+    assert load_checksums(_write(tmp_path / "sums", content)) == {1: FIRST, 2: SECOND, 3: THIRD}
+
+
+def test_load_checksums_keeps_placeholder_positions(tmp_path):
+    # Заглушки занимают позиции в bash-массиве, поэтому сумма остается третьим вариантом.
+    assert load_checksums(_write(tmp_path / "sums", "(x x %s)" % THIRD)) == {1: "x", 2: "x", 3: THIRD}
+
+
+@pytest.mark.parametrize("key", ["first", "01", "0", "-1"])
+def test_load_checksums_rejects_bad_keys(tmp_path, key):
+    with pytest.raises(ValueError, match="не номер варианта"):
+        load_checksums(_write(tmp_path / "sums", json.dumps({key: FIRST})))
+
+
+@pytest.mark.parametrize("variant, status", [
+    (2, "correct"),
+    ("2", "correct"),
+    ("02", "unknown_variant"),
+    (3, "wrong"),
+    (4, "unknown_variant"),
+    (True, "invalid"),
+    (2.0, "invalid"),
+])
+def test_grade_file(tmp_path, variant, status):
+    path = _write(tmp_path / "result.json", json.dumps({"variant": variant, "checksum": SECOND}))
+    entry = grade_file(path, {1: FIRST, 2: SECOND, 3: THIRD})
+    assert entry["status"] == status
+    if status == "wrong":
+        assert entry["expected"] == THIRD
+
+
+def test_grade_tree(tmp_path):
+    for name, result in [("one", {"variant": 1, "checksum": FIRST}), ("two", {"variant": 2, "checksum": FIRST})]:
+        (tmp_path / name).mkdir()
+        _write(tmp_path / name / "result.json", json.dumps(result))
+    (tmp_path / "broken").mkdir()
+    _write(tmp_path / "broken" / "result.json", "{")
+    report = grade_tree(str(tmp_path), {1: FIRST, 2: SECOND}, workers=2)
+    assert report["total"] == 3
+    assert report["summary"] == {"correct": 1, "wrong": 1, "invalid": 1}
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from incremental import index_path, validate_incremental
+from patterns import row_validator
+from semantic import semantic_row_validator
+from validation import read_header, validate_csv
+
+BLOCK_ROWS = 64
+
+
+@pytest.fixture
+def validator(lab_csv):
+    return row_validator(read_header(lab_csv))
+
+
+def _expected(path, validator):
+    return validate_csv(path, validator)
+
+
+def _append(path, text):
+    with open(path, "ab") as file:
+        file.write(text.encode("utf-8"))
+
+
+def test_first_and_repeated_run(lab_csv, validator):
+    invalid, revalidated = validate_incremental(lab_csv, validator, BLOCK_ROWS)
+    assert invalid == _expected(lab_csv, validator)
+    assert revalidated == 7 and os.path.exists(index_path(lab_csv))
+    assert validate_incremental(lab_csv, validator, BLOCK_ROWS) == (invalid, 0)
+
+
+@pytest.mark.parametrize("assume_append", [False, True])
+def test_append(lab_csv, validator, assume_append):
+    validate_incremental(lab_csv, validator, BLOCK_ROWS)
+    with open(lab_csv, "rb") as file:
+        newline = "\r\n" if file.read().endswith(b"\r\n") else "\n"
+    _append(lab_csv, "bad;row" + newline)
+    invalid, revalidated = validate_incremental(lab_csv, validator, BLOCK_ROWS, assume_append=assume_append)
+    assert invalid == _expected(lab_csv, validator)
+    assert 400 in invalid
+    # Перепроверяется только последний блок, в который попала дописанная строка.
+    assert revalidated == 1
+
+
+def test_mid_file_edit(lab_csv, validator):
+    validate_incremental(lab_csv, validator, BLOCK_ROWS)
+    with open(lab_csv, "rb") as file:
+        lines = file.read().splitlines(keepends=True)
+    lines[100] = lines[100].replace(b"@", b"#", 1)
+    with open(lab_csv, "wb") as file:
+        file.write(b"".join(lines))
+    invalid, revalidated = validate_incremental(lab_csv, validator, BLOCK_ROWS)
+    assert invalid == _expected(lab_csv, validator)
+    assert 99 in invalid and revalidated == 1
+
+
+def test_missing_trailing_newline(lab_csv, validator):
+    with open(lab_csv, "rb") as file:
+        content = file.read()
+    with open(lab_csv, "wb") as file:
+        file.write(content.rstrip(b"\r\n"))
+    invalid, _ = validate_incremental(lab_csv, validator, BLOCK_ROWS)
+    assert invalid == _expected(lab_csv, validator)
+    # Дописывание продолжает последнюю строку, а не начинает новую.
+    _append(lab_csv, "x")
+    invalid, revalidated = validate_incremental(lab_csv, validator, BLOCK_ROWS, assume_append=True)
+    assert invalid == _expected(lab_csv, validator)
+    assert 399 in invalid and revalidated == 1
+
+
+def test_stale_sidecar(lab_csv, validator, tmp_path):
+    validate_incremental(lab_csv, validator, BLOCK_ROWS)
+    # Файл заменен другим с тем же заголовком: блоки не совпадают по хешам и перепроверяются.
+    with open(lab_csv, "rb") as file:
+        lines = file.read().splitlines(keepends=True)
+    with open(lab_csv, "wb") as file:
+        file.write(b"".join(lines[:1] + lines[:0:-1]))
+    invalid, revalidated = validate_incremental(lab_csv, validator, BLOCK_ROWS)
+    assert invalid == _expected(lab_csv, validator)
+    assert revalidated > 0
+
+    # Индекс от других правил или другого размера блока не используется.
+    semantic = semantic_row_validator(read_header(lab_csv), check_digits=True)
+    assert validate_incremental(lab_csv, semantic, BLOCK_ROWS)[1] == 7
+    assert validate_incremental(lab_csv, validator, BLOCK_ROWS * 2)[1] == 4
+
+    # Испорченный индекс игнорируется.
+    with open(index_path(lab_csv), "wb") as file:
+        file.write(b"garbage")
+    assert validate_incremental(lab_csv, validator, BLOCK_ROWS)[0] == _expected(lab_csv, validator)
@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from conftest import FIELD_TYPES
+from generator import VALUE_GENERATORS, distort
+from patterns import FIELD_PATTERNS, FusedRowValidator, row_validator
+from validation import PatternRowValidator
+
+
+def _rows(field_types, rng: random.Random, count: int = 2000):
+    rows = [[], [""] * len(field_types), ["\x1f"] * len(field_types)]
+    for _ in range(count):
+        row = [VALUE_GENERATORS[field_type](rng) for field_type in field_types]
+        roll = rng.random()
+        if roll < 0.3:
+            column = rng.randrange(len(row))
+            row[column] = distort(row[column], field_types[column], rng)
+        elif roll < 0.35:
+            row = row[:-1]
+        elif roll < 0.4:
+            row = row + row[:1]
+        elif roll < 0.45:
+            # Склейка двух соседних ячеек через разделитель быстрого пути не должна проходить как две ячейки.
+            row = [row[0] + "\x1f" + row[1]] + row[2:]
+        rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("field_types", [FIELD_TYPES, sorted(FIELD_PATTERNS)], ids=["lab", "all"])
+def test_fused_matches_per_column(field_types):
+    fused = row_validator(field_types)
+    plain = row_validator(field_types, fused=False)
+    assert isinstance(fused, FusedRowValidator) and type(plain) is PatternRowValidator
+    rows = _rows(field_types, random.Random(0))
+    verdicts = [plain(row) for row in rows]
+    # В выборке есть и валидные, и невалидные строки.
+    assert any(verdicts) and not all(verdicts)
+    assert [fused(row) for row in rows] == verdicts
+    assert list(fused.invalid_indices(rows)) == [index for index, verdict in enumerate(verdicts) if not verdict]
+    for row in rows:
+        if len(row) == len(field_types):
+            assert fused.failing_columns(row) == plain.failing_columns(row)
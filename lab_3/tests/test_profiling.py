@@ -0,0 +1,85 @@
+import signal
+import threading
+import time
+
+import pytest
+
+import profiling
+from profiling import MatchTimeout, ProfilingRowValidator
+
+
+def _slow(value: str) -> bool:
+    time.sleep(0.2)
+    return True
+
+
+def _run_in_thread(function):
+    outcome = {}
+    thread = threading.Thread(target=lambda: outcome.update(value=function()))
+    thread.start()
+    thread.join()
+    return outcome["value"]
+
+
+def _capture(validator, row):
+    try:
+        return validator(row)
+    except MatchTimeout as error:
+        return error
+
+
+def test_default_checkers():
+    validator = ProfilingRowValidator(["email", "ip_v4"])
+    assert validator(["a@b.ru", "1.2.3.4"])
+    assert not validator(["a@b.ru", "1.2.3.400"])
+    assert not validator(["a@b.ru"])
+    assert [profile.calls for profile in validator.profiles] == [3, 2]
+    assert [profile.failures for profile in validator.profiles] == [0, 1]
+
+
+@pytest.mark.skipif(not profiling._CAN_INTERRUPT, reason="нужен signal.setitimer")
+def test_interrupted_cell_is_flagged():
+    validator = ProfilingRowValidator(["slow", "fast"], [_slow, lambda value: True], cell_budget=0.02)
+    started = time.perf_counter()
+    assert not validator(["x", "y"])
+    assert time.perf_counter() - started < 0.15
+    assert validator.profiles[0].timeouts == ["x"]
+    assert validator.profiles[1].timeouts == []
+    # Таймер снят, обработчик сигнала восстановлен.
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+    assert signal.getsignal(signal.SIGALRM) is signal.SIG_DFL
+
+
+@pytest.mark.skipif(not profiling._CAN_INTERRUPT, reason="нужен signal.setitimer")
+def test_interrupted_cell_aborts():
+    validator = ProfilingRowValidator(["slow"], [_slow], cell_budget=0.02, on_timeout="abort")
+    with pytest.raises(MatchTimeout) as error:
+        validator(["x"])
+    assert error.value.column == "slow" and error.value.value == "x"
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+
+@pytest.mark.skipif(not profiling._CAN_INTERRUPT, reason="нужен signal.setitimer")
+def test_timer_disarmed_when_checker_fails():
+    def broken(value: str) -> bool:
+        raise ValueError(value)
+
+    validator = ProfilingRowValidator(["broken"], [broken], cell_budget=0.05)
+    with pytest.raises(ValueError):
+        validator(["x"])
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+    # Оставшийся взведенным таймер завершил бы процесс по SIGALRM с обработчиком по умолчанию.
+    time.sleep(0.1)
+
+
+def test_over_budget_cell_is_invalid_without_interruption():
+    # Вне главного потока прервать проверку нельзя: она доходит до конца и возвращает True,
+    # но ячейка все равно невалидна, потому что бюджет превышен.
+    validator = ProfilingRowValidator(["slow"], [_slow], cell_budget=0.01)
+    assert not _run_in_thread(lambda: validator(["x"]))
+    assert validator.profiles[0].timeouts == ["x"]
+    assert validator.profiles[0].failures == 1
+
+    aborting = ProfilingRowValidator(["slow"], [_slow], cell_budget=0.01, on_timeout="abort")
+    assert isinstance(_run_in_thread(lambda: _capture(aborting, ["x"])), MatchTimeout)
+
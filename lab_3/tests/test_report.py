@@ -0,0 +1,69 @@
+import csv
+import json
+
+import pytest
+
+from conftest import LONG_ROW, SHORT_ROW
+from patterns import row_validator
+from profiling import ProfilingRowValidator
+from report import validate_with_report
+from semantic import semantic_row_validator
+from validation import read_header, validate_csv
+from verdict_cache import cached_row_validator
+
+VALIDATORS = {
+    "default": lambda types: None,
+    "fused": row_validator,
+    "plain": lambda types: row_validator(types, fused=False),
+    "cached": cached_row_validator,
+    "semantic": semantic_row_validator,
+}
+
+
+def _tallies(lab_csv):
+    header = read_header(lab_csv)
+    validator = row_validator(header)
+    counts = {name: 0 for name in header}
+    with open(lab_csv, "r", encoding="utf-8", newline="") as file:
+        rows = list(csv.reader(file, delimiter=";"))[1:]
+    for row in rows:
+        if not validator(row):
+            for index in validator.failing_columns(row):
+                counts[header[index]] += 1
+    return counts
+
+
+@pytest.mark.parametrize("name", sorted(VALIDATORS))
+def test_jsonl_report(lab_csv, tmp_path, name):
+    header = read_header(lab_csv)
+    report_path = str(tmp_path / "report.jsonl")
+    invalid = validate_with_report(lab_csv, report_path, validator=VALIDATORS[name](header))
+    assert invalid == validate_csv(lab_csv, row_validator(header))
+
+    with open(report_path, encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert [record["row"] for record in records] == list(invalid)
+    by_row = {record["row"]: record for record in records}
+    assert by_row[SHORT_ROW]["columns"] == [header[-1]]
+    assert len(by_row[LONG_ROW]["raw"]) == len(header) + 1
+
+    with open(report_path + ".summary.json", encoding="utf-8") as file:
+        summary = json.load(file)
+    assert summary["invalid_rows"] == len(invalid)
+    assert summary["errors_by_column"] == _tallies(lab_csv)
+
+
+def test_csv_report(lab_csv, tmp_path):
+    report_path = str(tmp_path / "report.csv")
+    invalid = validate_with_report(lab_csv, report_path, fmt="csv")
+    with open(report_path, encoding="utf-8", newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["row", "column", "value"]
+    assert {int(row[0]) for row in rows[1:]} == set(invalid)
+
+
+def test_validator_without_failing_columns(lab_csv, tmp_path):
+    with pytest.raises(TypeError, match="failing_columns"):
+        validate_with_report(lab_csv, str(tmp_path / "report.jsonl"),
+                             validator=ProfilingRowValidator(read_header(lab_csv)))
+    assert not (tmp_path / "report.jsonl").exists()
@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+import validation
+from patterns import FusedRowValidator, row_validator
+from profiling import ProfilingRowValidator
+from result_cache import ResultCache, ruleset_fingerprint
+from semantic import semantic_row_validator
+from validation import read_header, validate_csv
+from verdict_cache import cached_row_validator
+
+
+class _CountingEngine:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, path, validator):
+        self.calls += 1
+        return validate_csv(path, validator)
+
+
+def test_hit_and_miss(lab_csv, tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    validator = row_validator(read_header(lab_csv))
+    engine = _CountingEngine()
+    first = cache.validate(lab_csv, validator, engine)
+    assert cache.validate(lab_csv, validator, engine) == first
+    assert engine.calls == 1
+    assert first[0] == validate_csv(lab_csv, validator)
+
+    # Другое содержимое файла - промах.
+    with open(lab_csv, "a", encoding="utf-8") as file:
+        file.write("x;x;x;x;x;x\n")
+    invalid, _ = cache.validate(lab_csv, validator, engine)
+    assert engine.calls == 2
+    assert len(invalid) == len(first[0]) + 1
+
+    # Новый объект кэша находит записи на диске.
+    assert ResultCache(str(tmp_path / "cache")).validate(lab_csv, validator, engine)[0] == invalid
+    assert engine.calls == 2
+
+
+def test_invalidation(lab_csv, tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / "cache"))
+    header = read_header(lab_csv)
+    engine = _CountingEngine()
+    cache.validate(lab_csv, row_validator(header), engine)
+
+    # Изменилась регулярка одного столбца.
+    patterns = row_validator(header).patterns
+    patterns[0] = ".*"
+    cache.validate(lab_csv, FusedRowValidator(patterns), engine)
+    assert engine.calls == 2
+
+    # Другой класс валидатора и другие параметры semantic.
+    cache.validate(lab_csv, semantic_row_validator(header), engine)
+    cache.validate(lab_csv, semantic_row_validator(header, check_digits=True), engine)
+    assert engine.calls == 4
+    cache.validate(lab_csv, semantic_row_validator(header), engine)
+    assert engine.calls == 4
+
+    # Изменение кода проверок отмечается увеличением RULESET_VERSION.
+    monkeypatch.setattr(validation, "RULESET_VERSION", validation.RULESET_VERSION + 1)
+    cache.validate(lab_csv, semantic_row_validator(header), engine)
+    assert engine.calls == 5
+
+
+def test_fingerprints(lab_csv):
+    header = read_header(lab_csv)
+    fingerprints = {
+        ruleset_fingerprint(row_validator(header)),
+        ruleset_fingerprint(row_validator(header, fused=False)),
+        ruleset_fingerprint(cached_row_validator(header)),
+        ruleset_fingerprint(semantic_row_validator(header)),
+        ruleset_fingerprint(ProfilingRowValidator(header)),
+        ruleset_fingerprint(ProfilingRowValidator(header, cell_budget=0.01)),
+    }
+    assert len(fingerprints) == 6
+    # Отпечаток не зависит от объекта, только от правил.
+    assert ruleset_fingerprint(row_validator(header)) == ruleset_fingerprint(row_validator(header))
+    assert (ruleset_fingerprint(cached_row_validator(header, memory_budget=1024))
+            == ruleset_fingerprint(cached_row_validator(header)))
+    with pytest.raises(TypeError):
+        ruleset_fingerprint(lambda row: True)
+
+
+def test_index_is_bounded(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_files=3)
+    paths = []
+    for number in range(5):
+        path = tmp_path / ("%d.csv" % number)
+        path.write_text("email\nx%d\n" % number, encoding="utf-8")
+        paths.append(str(path))
+    for path in paths[:3]:
+        cache.content_hash(path)
+    # Обращение к первому файлу делает его недавно использованным, вытесняется второй.
+    cache.content_hash(paths[0])
+    cache.content_hash(paths[3])
+    assert list(cache._hashes) == [os.path.abspath(path) for path in (paths[2], paths[0], paths[3])]
+    cache.content_hash(paths[4])
+    assert len(ResultCache(str(tmp_path / "cache"), max_files=3)._hashes) == 3
@@ -0,0 +1,52 @@
+import pickle
+import random
+
+import pytest
+
+from checksum import calculate_checksum
+from rowset import RowSet
+
+
+def _numbers(seed: int = 0):
+    rng = random.Random(seed)
+    return [rng.randrange(100000) for _ in range(2000)] + [0, 7, 8, 99999]
+
+
+def test_round_trip():
+    numbers = _numbers()
+    rows = RowSet(numbers)
+    assert list(rows) == sorted(set(numbers))
+    assert len(rows) == len(set(numbers))
+    assert all(number in rows for number in numbers)
+    assert -1 not in rows and "1" not in rows
+    assert pickle.loads(pickle.dumps(rows)) == rows
+    assert RowSet(rows) == rows
+
+
+def test_add_discard():
+    rows = RowSet(size_hint=16)
+    rows.add(3)
+    rows.add(3)
+    rows.add(1000)
+    assert list(rows) == [3, 1000] and len(rows) == 2
+    rows.discard(3)
+    rows.discard(4)
+    assert list(rows) == [1000] and len(rows) == 1
+    with pytest.raises(ValueError):
+        rows.add(-1)
+
+
+def test_set_operations():
+    first, second = _numbers(1), _numbers(2)
+    left, right = RowSet(first), RowSet(second)
+    assert list(left | right) == sorted(set(first) | set(second))
+    assert list(left & right) == sorted(set(first) & set(second))
+    assert list(left.shifted(13)) == sorted(number + 13 for number in set(first))
+    left |= right
+    assert list(left) == sorted(set(first) | set(second))
+
+
+def test_checksum_matches_list():
+    numbers = _numbers(3)
+    assert calculate_checksum(RowSet(numbers)) == calculate_checksum(sorted(set(numbers)))
+    assert calculate_checksum(RowSet()) == calculate_checksum([])
@@ -0,0 +1,64 @@
+import pytest
+
+from patterns import row_validator
+from sampling import _wilson, estimate_invalid, exceeds_invalid_rate, first_invalid_rows
+from validation import read_header, validate_csv
+
+
+@pytest.fixture
+def expected(lab_csv):
+    return sorted(validate_csv(lab_csv, row_validator(read_header(lab_csv))))
+
+
+def test_wilson():
+    # Табличные значения интервала Уилсона для 95%.
+    assert _wilson(5, 10, 0.95) == pytest.approx((0.2366, 0.7634), abs=1e-4)
+    assert _wilson(0, 10, 0.95) == pytest.approx((0.0, 0.2775), abs=1e-4)
+    assert _wilson(10, 10, 0.95) == pytest.approx((0.7225, 1.0), abs=1e-4)
+    # Интервал сужается с ростом выборки и расширяется с ростом уровня доверия.
+    low, high = _wilson(10, 100, 0.95)
+    assert low < 0.1 < high
+    assert high - low > _wilson(100, 1000, 0.95)[1] - _wilson(100, 1000, 0.95)[0]
+    assert high - low < _wilson(10, 100, 0.99)[1] - _wilson(10, 100, 0.99)[0]
+    assert _wilson(0, 0, 0.95) == (0.0, 1.0)
+
+
+@pytest.mark.parametrize("limit", [1, 5, 1000])
+def test_first_invalid_rows(lab_csv, expected, limit):
+    assert first_invalid_rows(lab_csv, limit) == expected[:limit]
+    assert first_invalid_rows(lab_csv, limit, row_validator(read_header(lab_csv), fused=False)) == expected[:limit]
+
+
+@pytest.mark.parametrize("explicit_validator", [False, True])
+def test_exceeds_invalid_rate(lab_csv, expected, explicit_validator):
+    validator = row_validator(read_header(lab_csv)) if explicit_validator else None
+    rate = len(expected) / 400
+    for threshold in (0.0, rate / 2, rate, rate * 2, 1.0):
+        assert exceeds_invalid_rate(lab_csv, threshold, validator)[0] == (rate > threshold)
+
+    # Ранний выход: при нулевом пороге хватает первой невалидной строки.
+    assert exceeds_invalid_rate(lab_csv, 0.0, validator) == (True, expected[0] + 1)
+    # При пороге 0.9 ответ известен, как только оставшихся строк не хватит, чтобы его превысить.
+    checked = next(checked for checked in range(1, 401)
+                   if sum(row < checked for row in expected) + 400 - checked <= 360)
+    assert checked < 50 and exceeds_invalid_rate(lab_csv, 0.9, validator) == (False, checked)
+    # Если порог почти достигнут, файл дочитывается до конца.
+    assert exceeds_invalid_rate(lab_csv, rate, validator) == (False, 400)
+
+
+def test_exceeds_invalid_rate_empty(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_bytes(b"")
+    assert exceeds_invalid_rate(str(path), 0.5) == (False, 0)
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_estimate_invalid(lab_csv, expected, use_index):
+    estimate = estimate_invalid(lab_csv, sample_size=200, use_index=use_index)
+    rows = estimate["rows"]
+    assert estimate["sampled_rows"] == 200
+    assert rows["rate_low"] <= len(expected) / 400 <= rows["rate_high"]
+    assert rows["count_low"] <= len(expected) <= rows["count_high"]
+    if use_index:
+        assert estimate["total_rows"] == 400 and estimate["exact_total"]
+    assert estimate_invalid(lab_csv, sample_size=200, use_index=use_index) == estimate
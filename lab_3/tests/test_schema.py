@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from conftest import FIELD_TYPES
+from schema import infer_schema
+
+
+def _write_columns(path, header, columns):
+    lines = [";".join(header)] + [";".join(row) for row in zip(*columns)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def coordinates(tmp_path):
+    # Каждая широта проходит и проверку долготы; рост - проверку обеих, в столбце "mixed" его 97%.
+    rng = random.Random(0)
+    latitude = ["%.6f" % rng.uniform(-90, 90) for _ in range(300)]
+    mixed = ["%.2f" % rng.uniform(0.5, 2.2) if index % 33 else "45.123456" for index in range(300)]
+    return _write_columns(tmp_path / "coordinates.csv", ["coord", "mixed"], [latitude, mixed])
+
+
+def test_infers_lab_header(lab_csv):
+    schema = infer_schema(lab_csv)
+    assert schema.field_types == FIELD_TYPES
+    assert all(confidence > 0.9 for confidence in schema.confidence)
+
+
+def test_ambiguous_coordinates(coordinates):
+    schema = infer_schema(coordinates)
+    assert schema.field_types[0] == "latitude"
+    assert set(schema.ambiguous[0]) == {"latitude", "longitude"}
+    with pytest.raises(ValueError, match="coord"):
+        infer_schema(coordinates, strict=True)
+    # Заголовок разрешает неоднозначность.
+    assert infer_schema(coordinates, header=["longitude", "mixed"]).field_types[0] == "longitude"
+
+
+def test_margin(coordinates):
+    assert infer_schema(coordinates).field_types[1] == "latitude"
+    assert infer_schema(coordinates, margin=0.05).field_types[1] == "height"
+    assert set(infer_schema(coordinates, margin=0).ambiguous[0]) == {"latitude", "longitude"}
+
+
+def test_cache_key_includes_parameters(coordinates, tmp_path):
+    cache_dir = str(tmp_path / "schemas")
+    assert infer_schema(coordinates, cache_dir=cache_dir).field_types[1] == "latitude"
+    assert infer_schema(coordinates, cache_dir=cache_dir, margin=0.05).field_types[1] == "height"
+    with pytest.raises(ValueError):
+        infer_schema(coordinates, cache_dir=cache_dir, strict=True)
+    assert len(list((tmp_path / "schemas").iterdir())) == 2
+
+
+def test_cache_hit(coordinates, tmp_path):
+    cache_dir = tmp_path / "schemas"
+    first = infer_schema(coordinates, cache_dir=str(cache_dir))
+    # Файл с тем же заголовком берется из кэша без новой выборки.
+    other = _write_columns(tmp_path / "other.csv", ["coord", "mixed"], [["x"] * 10, ["y"] * 10])
+    assert infer_schema(other, cache_dir=str(cache_dir)).to_dict() == first.to_dict()
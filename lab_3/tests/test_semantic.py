@@ -0,0 +1,59 @@
+"""
+Семантические проверки должны выносить те же вердикты, что и регулярки из patterns (при выключенных контрольных
+цифрах). Значения - валидные из генератора, искаженные и случайные строки из символов, которые встречаются в типе.
+"""
+
+import random
+
+import pytest
+
+from generator import VALUE_GENERATORS, distort
+from patterns import FIELD_PATTERNS, get_pattern, row_validator
+from semantic import SemanticRowValidator, value_checker
+
+_EDGE_VALUES = [
+    "", "0", "00", "-0", "-", ".", "0.", ".0", "1.", "01", "09", "90", "90.0", "90.000", "90.001", "-90.0", "91",
+    "089.5", "180", "180.0", "180.00001", "-180", "179.999", "181", "0180", "1800", "255.255.255.255",
+    "256.0.0.1", "01.2.3.4", "1.2.3", "1.2.3.4.5", "00:00:00.000000", "23:59:59.999999", "24:00:00.000000",
+    "12:60:00.000000", "12:00:60.000000", "1:00:00.000000", "2000-00-10", "2000-13-10", "2000-12-00",
+    "2000-12-32", "2000-02-31", "0.00", "2.99", "3.00", "2.9", "1.234",
+]
+
+
+def _fuzz_values(field_type: str, rng: random.Random, count: int = 3000):
+    generate = VALUE_GENERATORS[field_type]
+    values = list(_EDGE_VALUES)
+    alphabet = sorted(set("".join(generate(rng) for _ in range(50))) | set("0123456789.-:"))
+    for _ in range(count):
+        value = generate(rng)
+        roll = rng.random()
+        if roll < 0.3:
+            value = distort(value, field_type, rng)
+        elif roll < 0.6:
+            value = "".join(rng.choice(alphabet) for _ in range(rng.randrange(len(value) + 3)))
+        values.append(value)
+    return values
+
+
+@pytest.mark.parametrize("field_type", sorted(FIELD_PATTERNS))
+def test_value_checker_matches_pattern(field_type):
+    rng = random.Random(field_type)
+    regex = get_pattern(field_type)
+    check = value_checker(field_type)
+    mismatches = [value for value in _fuzz_values(field_type, rng)
+                  if check(value) != (regex.fullmatch(value) is not None)]
+    assert mismatches == []
+
+
+def test_row_validator_matches_patterns():
+    rng = random.Random(8)
+    field_types = sorted(FIELD_PATTERNS)
+    semantic, patterns = SemanticRowValidator(field_types), row_validator(field_types)
+    for _ in range(2000):
+        row = [VALUE_GENERATORS[field_type](rng) for field_type in field_types]
+        index = rng.randrange(len(row))
+        if rng.random() < 0.5:
+            row[index] = distort(row[index], field_types[index], rng)
+        assert semantic(row) == patterns(row)
+        assert semantic.failing_columns(row) == patterns.failing_columns(row)
+    assert not semantic(row[:-1]) and not patterns(row[:-1])
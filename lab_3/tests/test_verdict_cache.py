@@ -0,0 +1,65 @@
+import pickle
+import re
+
+from patterns import get_pattern, row_validator
+from validation import read_header, validate_csv
+from verdict_cache import ColumnVerdictCache, cached_row_validator
+
+
+def test_hits_and_misses():
+    cache = ColumnVerdictCache(get_pattern("blood_type"), 1 << 20)
+    verdicts = [cache.check(value) for value in ["A+", "A+", "C+", "A+", "C+"]]
+    assert verdicts == [True, True, False, True, False]
+    assert (cache.hits, cache.misses, len(cache)) == (3, 2, 2)
+    assert cache.stats()["hit_rate"] == 0.6
+
+
+def test_eviction_keeps_budget():
+    cache = ColumnVerdictCache(re.compile(r"\d+"), max_bytes=500, warmup=10 ** 6)
+    for number in range(100):
+        cache.check(str(number))
+    assert 0 < len(cache) < 100
+    assert cache.stats()["bytes"] <= 500
+    # Давно не использованные значения вытеснены, последние остались.
+    assert cache.check("99") and cache.hits == 1
+
+
+def test_auto_disable():
+    cache = ColumnVerdictCache(re.compile(r"\d+"), 1 << 20, warmup=10, min_hit_rate=0.5)
+    for number in range(10):
+        cache.check(str(number))
+    assert not cache.enabled and len(cache) == 0
+    # Отключенный кэш проверяет регуляркой и не считает обращения.
+    assert cache.check("12") and not cache.check("x")
+    assert cache.misses == 10
+
+
+def test_auto_disable_when_warmup_ends_on_hit():
+    cache = ColumnVerdictCache(re.compile(r"\d+"), 1 << 20, warmup=10, min_hit_rate=0.5)
+    for number in range(9):
+        cache.check(str(number))
+    cache.check("0")
+    assert cache.enabled
+    cache.check("100")
+    assert not cache.enabled
+
+
+def test_frequent_values_stay_cached():
+    cache = ColumnVerdictCache(get_pattern("blood_type"), 1 << 20, warmup=10)
+    for _ in range(10):
+        for value in ["A+", "B−", "O+"]:
+            cache.check(value)
+    assert cache.enabled and cache.hit_rate == 0.9
+
+
+def test_validator_matches_patterns(lab_csv):
+    header = read_header(lab_csv)
+    validator = cached_row_validator(header, warmup=50)
+    assert validate_csv(lab_csv, validator) == validate_csv(lab_csv, row_validator(header))
+    enabled = {name: stats["enabled"] for name, stats in zip(header, validator.stats())}
+    assert enabled["blood_type"] and not enabled["email"]
+    # Столбцы с отключенным кэшем проверяются регуляркой напрямую.
+    assert validator._checks[header.index("email")] == validator.caches[header.index("email")].regex.fullmatch
+
+    restored = pickle.loads(pickle.dumps(validator))
+    assert restored.stats()[0]["hits"] == 0 and restored.warmup == 50
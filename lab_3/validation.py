@@ -0,0 +1,129 @@
+"""
+Базовые строительные блоки для валидации csv-файла лабораторной: построчный валидатор и однопроцессный проход.
+
+Однопроцессный проход служит эталоном: все ускоренные движки обязаны давать то же множество невалидных строк,
+а значит и ту же контрольную сумму.
+"""
+
+import csv
+import hashlib
+import json
+import re
+from typing import Iterable, List, Sequence
+
+from rowset import RowSet
+
+DELIMITER = ";"
+ENCODING = "utf-8"
+
+# Версия кода проверок. Ее нужно увеличить при любом изменении логики валидаторов, которое не видно
+# по текстам регулярок и параметрам (например, арифметики semantic): это сбрасывает записи кэшей результатов.
+RULESET_VERSION = 1
+
+
+def rules_fingerprint(validator, rules) -> str:
+    """
+    Отпечаток правил для кэшей результатов (result_cache, incremental).
+
+    :param validator: валидатор строки, в отпечаток входит имя его класса
+    :param rules: JSON-совместимое описание правил: тексты регулярок, типы столбцов, параметры
+    :return: короткий хеш RULESET_VERSION, класса и rules
+    """
+    description = json.dumps([RULESET_VERSION, type(validator).__qualname__, rules], ensure_ascii=False)
+    return hashlib.blake2b(description.encode("utf-8"), digest_size=12).hexdigest()
+
+
+class PatternRowValidator:
+    """
+    Проверяет строку csv целиком: каждая ячейка должна полностью совпасть с регуляркой своего столбца.
+
+    Объект можно передавать в дочерние процессы: при сериализации сохраняются только тексты регулярок.
+    """
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        """
+        :param patterns: регулярные выражения для столбцов в порядке их следования в файле
+        """
+        self.patterns = list(patterns)
+        self._compiled = [re.compile(pattern) for pattern in self.patterns]
+
+    def __getstate__(self):
+        return self.patterns
+
+    def __setstate__(self, patterns) -> None:
+        self.__init__(patterns)
+
+    def fingerprint(self) -> str:
+        """
+        :return: отпечаток правил: класс и тексты регулярок столбцов
+        """
+        return rules_fingerprint(self, self.patterns)
+
+    def __call__(self, row: Sequence[str]) -> bool:
+        """
+        :param row: значения ячеек одной строки
+        :return: True, если строка валидна
+        """
+        if len(row) != len(self._compiled):
+            return False
+        for regex, cell in zip(self._compiled, row):
+            if regex.fullmatch(cell) is None:
+                return False
+        return True
+
+    def failing_columns(self, row: Sequence[str]) -> List[int]:
+        """
+        Поячеечная проверка строки для отчетов об ошибках.
+
+        :param row: значения ячеек одной строки
+        :return: индексы столбцов, значения которых не прошли проверку
+        """
+        failing = [index for index, (regex, cell) in enumerate(zip(self._compiled, row))
+                   if regex.fullmatch(cell) is None]
+        failing.extend(range(len(row), len(self.patterns)))
+        return failing
+
+
+def validate_rows(rows: Iterable[Sequence[str]], validator, first_row: int = 0) -> RowSet:
+    """
+    Прогоняет строки через валидатор и собирает номера невалидных.
+
+    :param rows: строки данных без заголовка
+    :param validator: вызываемый объект, возвращающий True для валидной строки
+    :param first_row: номер, который получит первая из переданных строк
+    :return: множество номеров невалидных строк
+    """
+    invalid = RowSet()
+    for row_number, row in enumerate(rows, first_row):
+        if not validator(row):
+            invalid.add(row_number)
+    return invalid
+
+
+def read_header(path: str, encoding: str = ENCODING, delimiter: str = DELIMITER) -> List[str]:
+    """
+    :param path: путь к csv-файлу
+    :param encoding: кодировка файла
+    :param delimiter: разделитель столбцов
+    :return: названия столбцов из первой строки файла
+    """
+    with open(path, "r", encoding=encoding, newline="") as file:
+        return next(csv.reader(file, delimiter=delimiter), [])
+
+
+def validate_csv(path: str, validator, encoding: str = ENCODING, delimiter: str = DELIMITER) -> RowSet:
+    """
+    Однопроцессная построчная валидация всего файла.
+
+    Нумерация строк соответствует докстрингу calculate_checksum: первая строка после заголовка имеет номер 0.
+
+    :param path: путь к csv-файлу
+    :param validator: вызываемый объект, возвращающий True для валидной строки
+    :param encoding: кодировка файла
+    :param delimiter: разделитель столбцов
+    :return: множество номеров невалидных строк
+    """
+    with open(path, "r", encoding=encoding, newline="") as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        next(reader, None)
+        return validate_rows(reader, validator)
@@ -0,0 +1,167 @@
+"""
+Кэширование вердиктов по ячейкам для столбцов с малым числом различных значений
+(blood_type, http_status_message, occupation, locale_code и т.п.).
+
+У каждого столбца свой ограниченный LRU-кэш "значение -> вердикт" со счетчиками попаданий и промахов.
+Если после разогрева доля попаданий низкая (uuid, inn), кэш столбца отключается и дальше
+значения проверяются регуляркой напрямую, без накладных расходов на кэш.
+"""
+
+import sys
+from collections import OrderedDict
+from typing import Dict, List, Sequence
+
+from patterns import get_pattern
+from validation import PatternRowValidator
+
+
+class ColumnVerdictCache:
+    """
+    Ограниченный LRU-кэш вердиктов одного столбца.
+    """
+
+    def __init__(self, regex, max_bytes: int, warmup: int = 1000, min_hit_rate: float = 0.5) -> None:
+        """
+        :param regex: скомпилированная регулярка столбца
+        :param max_bytes: примерный бюджет памяти на кэш столбца (учитываются размеры строк-ключей)
+        :param warmup: после скольких обращений оценивать долю попаданий
+        :param min_hit_rate: если после разогрева доля попаданий ниже, кэш отключается
+        """
+        self.regex = regex
+        self.max_bytes = max_bytes
+        self.warmup = warmup
+        self.min_hit_rate = min_hit_rate
+        self.hits = 0
+        self.misses = 0
+        self.enabled = max_bytes > 0
+        self._judged = False
+        self._size = 0
+        self._verdicts: "OrderedDict[str, bool]" = OrderedDict()
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля обращений, обслуженных кэшем."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._verdicts)
+
+    def check(self, value: str) -> bool:
+        """
+        :param value: значение ячейки
+        :return: True, если значение полностью совпадает с регуляркой столбца
+        """
+        if not self.enabled:
+            return self.regex.fullmatch(value) is not None
+        verdicts = self._verdicts
+        verdict = verdicts.get(value)
+        if verdict is not None:
+            self.hits += 1
+            verdicts.move_to_end(value)
+            return verdict
+        self.misses += 1
+        verdict = self.regex.fullmatch(value) is not None
+        verdicts[value] = verdict
+        self._size += sys.getsizeof(value)
+        while self._size > self.max_bytes and verdicts:
+            evicted, _ = verdicts.popitem(last=False)
+            self._size -= sys.getsizeof(evicted)
+        # Доля попаданий оценивается один раз, на первом промахе после разогрева: попадания ее только повышают.
+        if not self._judged and self.hits + self.misses >= self.warmup:
+            self._judged = True
+            if self.hit_rate < self.min_hit_rate:
+                self.disable()
+        return verdict
+
+    def disable(self) -> None:
+        """Отключает кэш и освобождает занятую им память."""
+        self.enabled = False
+        self._verdicts.clear()
+        self._size = 0
+
+    def stats(self) -> Dict[str, object]:
+        """
+        :return: счетчики попаданий и промахов, доля попаданий, размер и состояние кэша
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "entries": len(self._verdicts),
+            "bytes": self._size,
+            "enabled": self.enabled,
+        }
+
+
+class CachedRowValidator(PatternRowValidator):
+    """
+    Построчный валидатор, проверяющий ячейки через кэши вердиктов своих столбцов.
+
+    Общий бюджет памяти делится между столбцами поровну. Совместим с validation.validate_csv;
+    при передаче в дочерний процесс кэши создаются заново.
+    """
+
+    def __init__(self, patterns: Sequence[str], memory_budget: int = 16 * 1024 * 1024,
+                 warmup: int = 1000, min_hit_rate: float = 0.5) -> None:
+        """
+        :param patterns: регулярные выражения для столбцов в порядке их следования в файле
+        :param memory_budget: примерный бюджет памяти в байтах на все кэши вместе
+        :param warmup: после скольких обращений к столбцу оценивать долю попаданий
+        :param min_hit_rate: минимальная доля попаданий, при которой кэш столбца остается включенным
+        """
+        if warmup <= 0:
+            raise ValueError("warmup должен быть положительным")
+        super().__init__(patterns)
+        self.memory_budget = memory_budget
+        self.warmup = warmup
+        self.min_hit_rate = min_hit_rate
+        per_column = memory_budget // max(1, len(self.patterns))
+        self.caches: List[ColumnVerdictCache] = [ColumnVerdictCache(regex, per_column, warmup, min_hit_rate)
+                                                 for regex in self._compiled]
+        self._rows = 0
+        self._refresh_checks()
+
+    def _refresh_checks(self) -> None:
+        # Столбцы с отключенным кэшем проверяются регуляркой напрямую, без вызова check.
+        self._checks = [cache.check if cache.enabled else cache.regex.fullmatch for cache in self.caches]
+
+    def __getstate__(self):
+        return self.patterns, self.memory_budget, self.warmup, self.min_hit_rate
+
+    def __setstate__(self, state) -> None:
+        self.__init__(*state)
+
+    def __call__(self, row: Sequence[str]) -> bool:
+        """
+        :param row: значения ячеек одной строки
+        :return: True, если строка валидна
+        """
+        self._rows += 1
+        if self._rows % self.warmup == 0:
+            self._refresh_checks()
+        if len(row) != len(self._checks):
+            return False
+        for check, cell in zip(self._checks, row):
+            if not check(cell):
+                return False
+        return True
+
+    def stats(self) -> List[Dict[str, object]]:
+        """
+        :return: статистика кэша по каждому столбцу
+        """
+        return [cache.stats() for cache in self.caches]
+
+
+def cached_row_validator(field_types: Sequence[str], memory_budget: int = 16 * 1024 * 1024,
+                         **kwargs) -> CachedRowValidator:
+    """
+    Собирает кэширующий валидатор по списку типов столбцов.
+
+    :param field_types: названия типов полей в порядке столбцов
+    :param memory_budget: примерный бюджет памяти в байтах на все кэши вместе
+    :return: валидатор строки
+    """
+    patterns = [get_pattern(field_type).pattern for field_type in field_types]
+    return CachedRowValidator(patterns, memory_budget, **kwargs)